@@ -1,9 +1,22 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Header, Response, Depends, Query
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from fastapi.encoders import jsonable_encoder
+from typing import Optional, Any, Literal, List
+from pathlib import Path
+import json
+import os
 import uvicorn
 from src.services.candidate_evaluator import CandidateEvaluator
-from src.models.response_models import FitEvaluationResponse
+from src.services.cascade_ranker import CascadeRanker, CASCADE_TOP_K
+from src.models.response_models import FitEvaluationResponse, FitNarrative, RankingResponse, EvaluationPage
+from src.models.request_models import EvaluationOptions, NarrativeRequest
+from src.services.metrics import registry, StageTimer
+from src.services.profiler import RequestProfiler, ProfilerBusy, PROFILE_MODES, PROFILE_DIR
+from src.services.upload_handler import UploadError, UploadLimitMiddleware, MAX_UPLOAD_BYTES
+from src.services.result_store import RESULT_STORE, RESULT_STORE_MAX_PAGE
+from src.services.admission_control import (
+    AdmissionMiddleware, EVALUATION_ADMISSION, NARRATIVE_ADMISSION, RANKING_ADMISSION
+)
 import logging
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -13,6 +26,14 @@ from fastapi.responses import FileResponse
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Two uploads plus multipart framing and form fields
+MAX_REQUEST_BYTES = 2 * MAX_UPLOAD_BYTES + 64 * 1024
+MAX_RANKING_FILES = int(os.getenv("MAX_RANKING_FILES", "500"))
+# Total for a ranking request, well below MAX_RANKING_FILES full-size uploads
+MAX_RANKING_REQUEST_BYTES = int(os.getenv("MAX_RANKING_REQUEST_BYTES", str(256 * 1024 * 1024)))
+# Debugging switch only: lets any client profile its requests and download the artefacts
+ALLOW_REQUEST_PROFILING = os.getenv("ALLOW_REQUEST_PROFILING", "false").lower() in ("1", "true", "yes")
+
 app = FastAPI(
     title="AI Candidate Fit Evaluator",
     description="An AI assistant that evaluates how well a candidate's resume matches a job description",
@@ -25,16 +46,64 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Shed load before uploads are read: bounded concurrency and wait queue per pool
+app.add_middleware(
+    AdmissionMiddleware,
+    controllers={
+        "/evaluate-fit": EVALUATION_ADMISSION,
+        "/evaluate-fit/stream": EVALUATION_ADMISSION,
+        "/rank-candidates": RANKING_ADMISSION,
+        "/fit-narrative": NARRATIVE_ADMISSION,
+    },
+)
+# Reject oversized bodies as they stream in, before the form parser spools them
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_request_bytes=MAX_REQUEST_BYTES,
+    path_limits={"/rank-candidates": MAX_RANKING_REQUEST_BYTES},
+    max_file_bytes=MAX_UPLOAD_BYTES,
+)
+
 
 @app.get("/")
 async def root():
     return {"message": "AI Candidate Fit Evaluator API", "status": "running"}
 
+def evaluation_options(
+    include_timings: bool = Form(False, description="Attach per-stage timings, critical path and token usage"),
+    early_exit: bool = Form(False, description="Stop and return Poor Fit once a mandatory requirement clearly fails"),
+    knockout_confidence: float = Form(0.8, ge=0.0, le=1.0, description="Confidence needed for a failed must-have to count as a knockout"),
+    scoring_mode: Literal["llm", "local"] = Form("llm", description="'llm' summary call or deterministic 'local' scoring"),
+    include_narrative: bool = Form(False, description="With local scoring, also fetch the LLM explanation and recommendations"),
+    use_cache: bool = Form(True, description="Reuse requirement verdicts and profiles memoised for the same resume"),
+    priority: Literal["interactive", "batch"] = Form("interactive", description="Rate-limit queue class; 'batch' yields to interactive requests"),
+    max_llm_calls: Optional[int] = Form(None, ge=0, description="LLM call budget for the evaluation (0 = unlimited, default EVALUATION_MAX_LLM_CALLS)"),
+    max_prompt_tokens: Optional[int] = Form(None, ge=0, description="Prompt token budget for the evaluation (0 = unlimited)"),
+    max_seconds: Optional[float] = Form(None, ge=0, description="Wall time budget from the start of the evaluation, parsing and extraction included; requirements unfinished when it runs out are skipped (0 = unlimited)"),
+) -> EvaluationOptions:
+    """Collect the optional evaluation settings shared by the evaluation endpoints"""
+    return EvaluationOptions(
+        include_timings=include_timings,
+        early_exit=early_exit,
+        knockout_confidence=knockout_confidence,
+        scoring_mode=scoring_mode,
+        include_narrative=include_narrative,
+        use_cache=use_cache,
+        priority=priority,
+        max_llm_calls=max_llm_calls,
+        max_prompt_tokens=max_prompt_tokens,
+        max_seconds=max_seconds,
+    )
+
 @app.post("/evaluate-fit", response_model=FitEvaluationResponse)
 async def evaluate_candidate_fit(
+    response: Response,
     resume_file: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
     job_description_file: UploadFile = File(..., description="Job description file (PDF, DOCX, or TXT)"),
-    candidate_name: Optional[str] = Form(None, description="Candidate name (optional)")
+    candidate_name: Optional[str] = Form(None, description="Candidate name (optional)"),
+    job_id: Optional[str] = Form(None, description="Job identifier the result is stored under (default: hash of the job description)"),
+    options: EvaluationOptions = Depends(evaluation_options),
+    x_profile: Optional[str] = Header(None, description="Profile this request: 'sample' or 'cprofile'")
 ):
     """
     Evaluate how well a candidate's resume matches a job description.
@@ -43,6 +112,10 @@ async def evaluate_candidate_fit(
         resume_file: The candidate's resume (PDF or DOCX)
         job_description_file: The job description (PDF, DOCX, or TXT)
         candidate_name: Optional candidate name for reference
+        job_id: Optional job identifier for the result store
+        options: Optional evaluation settings (see EvaluationOptions)
+        x_profile: Optional X-Profile header; when set the evaluation is
+            profiled and the artefact name is returned in X-Profile-Artifact
     
     Returns:
         FitEvaluationResponse: Structured evaluation results
@@ -57,27 +130,210 @@ async def evaluate_candidate_fit(
         if not job_description_file.filename.lower().endswith(('.pdf', '.docx', '.txt')):
             raise HTTPException(status_code=400, detail="Job description must be PDF, DOCX, or TXT")
         
+        profiler = None
+        if x_profile:
+            if not ALLOW_REQUEST_PROFILING:
+                raise HTTPException(status_code=403, detail="Request profiling is disabled")
+            if x_profile not in PROFILE_MODES:
+                raise HTTPException(status_code=400, detail=f"X-Profile must be one of: {', '.join(PROFILE_MODES)}")
+            profiler = RequestProfiler(x_profile)
+        
         # Initialize evaluator
         evaluator = CandidateEvaluator()
         
         # Perform evaluation
-        result = await evaluator.evaluate_fit(
-            resume_file=resume_file,
-            job_description_file=job_description_file,
-            candidate_name=candidate_name
-        )
+        if profiler:
+            try:
+                profiler.start()
+            except ProfilerBusy as e:
+                raise HTTPException(status_code=409, detail=str(e))
+        try:
+            result = await evaluator.evaluate_fit(
+                resume_file=resume_file,
+                job_description_file=job_description_file,
+                candidate_name=candidate_name,
+                options=options,
+                job_id=job_id
+            )
+        finally:
+            if profiler:
+                profiler.stop()
+                artifact = profiler.save(evaluator.document_hash)
+                response.headers["X-Profile-Artifact"] = artifact.name
+        
+        if evaluator.document_hash:
+            response.headers["X-Document-Hash"] = evaluator.document_hash
         
         logger.info(f"Evaluation completed for candidate: {candidate_name or 'Unknown'}")
         return result
         
+    except HTTPException:
+        raise
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         logger.error(f"Error during evaluation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
 
+def _sse_event(event: str, payload: Any) -> str:
+    """Format a single Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(payload))}\n\n"
+
+@app.post("/evaluate-fit/stream")
+async def evaluate_candidate_fit_stream(
+    resume_file: UploadFile = File(..., description="Resume file (PDF or DOCX)"),
+    job_description_file: UploadFile = File(..., description="Job description file (PDF, DOCX, or TXT)"),
+    candidate_name: Optional[str] = Form(None, description="Candidate name (optional)"),
+    job_id: Optional[str] = Form(None, description="Job identifier the result is stored under (default: hash of the job description)"),
+    options: EvaluationOptions = Depends(evaluation_options)
+):
+    """
+    Streaming variant of /evaluate-fit using Server-Sent Events.
+    
+    Emits ``parsed``, ``profile``, ``requirements``, one ``requirement_match``
+    per requirement, ``summary`` and a final ``result`` event carrying the full
+    FitEvaluationResponse. Failures after the stream has started are reported
+    as an ``error`` event.
+    """
+    if not resume_file.filename.lower().endswith(('.pdf', '.docx')):
+        raise HTTPException(status_code=400, detail="Resume must be PDF or DOCX")
+    
+    if not job_description_file.filename.lower().endswith(('.pdf', '.docx', '.txt')):
+        raise HTTPException(status_code=400, detail="Job description must be PDF, DOCX, or TXT")
+    
+    evaluator = CandidateEvaluator()
+    stage_timer = StageTimer()
+    
+    # Parse before streaming so the uploads are consumed while still open
+    try:
+        resume_text, job_description_text = await evaluator.parse_documents(
+            resume_file, job_description_file, stage_timer=stage_timer
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error during parsing: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Evaluation failed: {str(e)}")
+    
+    async def event_stream():
+        try:
+            async for event, payload in evaluator.evaluate_stream(
+                resume_text, job_description_text, candidate_name,
+                stage_timer=stage_timer, options=options, job_id=job_id
+            ):
+                yield _sse_event(event, payload)
+            logger.info(f"Streaming evaluation completed for candidate: {candidate_name or 'Unknown'}")
+        except Exception as e:
+            logger.error(f"Error during streaming evaluation: {str(e)}")
+            yield _sse_event("error", {"detail": f"Evaluation failed: {str(e)}"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/rank-candidates", response_model=RankingResponse)
+async def rank_candidates(
+    resume_files: List[UploadFile] = File(..., description="Applicant resumes (PDF or DOCX)"),
+    job_description_file: UploadFile = File(..., description="Job description file (PDF, DOCX, or TXT)"),
+    top_k: int = Form(CASCADE_TOP_K, ge=0, description="How many of the best-covered resumes get the full LLM evaluation"),
+    job_id: Optional[str] = Form(None, description="Job identifier the result is stored under (default: hash of the job description)"),
+    options: EvaluationOptions = Depends(evaluation_options)
+):
+    """
+    Rank many applicants for one job in two stages: every resume is scored
+    from embedding coverage of the job requirements, then only the
+    ``top_k`` best are fully evaluated (at batch priority). Returns every
+    applicant, best first, with stage-1 scores for those not shortlisted.
+    """
+    if len(resume_files) > MAX_RANKING_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_RANKING_FILES} resumes can be ranked at once")
+    
+    for resume_file in resume_files:
+        if not resume_file.filename.lower().endswith(('.pdf', '.docx')):
+            raise HTTPException(status_code=400, detail=f"Resume must be PDF or DOCX: {resume_file.filename}")
+    
+    if not job_description_file.filename.lower().endswith(('.pdf', '.docx', '.txt')):
+        raise HTTPException(status_code=400, detail="Job description must be PDF, DOCX, or TXT")
+    
+    try:
+        ranker = CascadeRanker()
+        return await ranker.rank(
+            [(resume_file.filename, resume_file) for resume_file in resume_files],
+            job_description_file,
+            top_k=top_k,
+            options=options,
+            job_id=job_id
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error during ranking: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Ranking failed: {str(e)}")
+
+@app.post("/fit-narrative", response_model=FitNarrative)
+async def fit_narrative(request: NarrativeRequest):
+    """
+    Lazily generate the LLM narrative for an evaluation scored with
+    scoring_mode=local. Send back the ``candidate_profile`` and
+    ``requirement_matches`` of that response; nothing is re-evaluated.
+    """
+    try:
+        evaluator = CandidateEvaluator()
+        return await evaluator.generate_narrative(request.candidate_profile, request.requirement_matches)
+    except Exception as e:
+        logger.error(f"Error generating narrative: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Narrative generation failed: {str(e)}")
+
+@app.get("/evaluations", response_model=EvaluationPage)
+async def list_evaluations(
+    job_id: Optional[str] = None,
+    candidate_name: Optional[str] = None,
+    min_fit_percentage: Optional[float] = None,
+    sort: Literal["fit", "recent"] = "fit",
+    limit: int = Query(20, ge=1, le=RESULT_STORE_MAX_PAGE),
+    offset: int = Query(0, ge=0),
+    latest_only: bool = Query(True, description="Only the latest evaluation of each resume for a job")
+):
+    """
+    Page through stored evaluations, best fit first (``sort=fit``) or most
+    recent first. Filter by ``job_id`` for the top candidates of a job.
+    Served from the result store; nothing is re-evaluated.
+    """
+    return await RESULT_STORE.list_evaluations(job_id, candidate_name, min_fit_percentage, sort, limit, offset,
+                                               latest_only)
+
+@app.get("/evaluations/{evaluation_id}", response_model=FitEvaluationResponse)
+async def get_evaluation(evaluation_id: str):
+    """A stored evaluation in full"""
+    evaluation = await RESULT_STORE.get_evaluation(evaluation_id)
+    if evaluation is None:
+        raise HTTPException(status_code=404, detail="Evaluation not found")
+    return evaluation
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage, LLM, embedding, search and parsing latencies and counters"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles/{artifact_name}")
+async def download_profile(artifact_name: str):
+    """Download a profile artefact written by an X-Profile request"""
+    path = PROFILE_DIR / Path(artifact_name).name
+    if not ALLOW_REQUEST_PROFILING or not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=path.name)
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "AI Candidate Fit Evaluator"}
+    """Health check endpoint, with in-flight and queued request counts"""
+    return {
+        "status": "healthy",
+        "service": "AI Candidate Fit Evaluator",
+        "admission": {pool.name: pool.stats() for pool in (EVALUATION_ADMISSION, RANKING_ADMISSION,
+                                                                 NARRATIVE_ADMISSION)}
+    }
 
 app.mount("/ui", StaticFiles(directory="static", html=True), name="static")
 
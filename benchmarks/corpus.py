@@ -0,0 +1,122 @@
+"""
+Synthetic resume / job description corpus for benchmarks.
+
+Generates DOCX (via python-docx), minimal text PDFs (hand-written PDF
+objects, no extra dependency) and TXT files with realistic CV structure, so
+benchmarks can run without any private documents.
+"""
+
+import random
+from pathlib import Path
+from typing import List
+
+from docx import Document
+
+SKILLS = [
+    "Python", "FastAPI", "Django", "PostgreSQL", "Docker", "Kubernetes", "AWS", "Azure",
+    "Machine Learning", "PyTorch", "TensorFlow", "NLP", "LLMs", "FAISS", "Redis", "Kafka",
+    "React", "TypeScript", "CI/CD", "Terraform", "Spark", "Airflow", "Go", "Java"
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+DEGREES = ["Master's in Computer Science", "Bachelor's in Software Engineering", "PhD in Machine Learning"]
+LANGUAGES = ["English", "French", "Arabic", "German", "Spanish"]
+
+
+def resume_sections(seed: int, experience_entries: int = 4) -> List[List[str]]:
+    """Build resume content as a list of sections, each a list of lines (first line is the heading)"""
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, 8)
+    experience = ["Experience"]
+    for i in range(experience_entries):
+        company = rng.choice(COMPANIES)
+        start = 2010 + i * 2
+        experience.append(f"Software Engineer at {company} ({start}-{start + 2})")
+        experience.append(
+            f"Built and operated {rng.choice(skills)} services with {rng.choice(skills)}, "
+            f"improving latency by {rng.randint(10, 60)}% for {rng.randint(2, 50)}k users."
+        )
+    return [
+        [f"Candidate {seed}", f"candidate{seed}@example.com"],
+        ["Summary", f"Engineer with {rng.randint(2, 15)} years of experience in {', '.join(skills[:3])}."],
+        experience,
+        ["Education", rng.choice(DEGREES)],
+        ["Skills", ", ".join(skills)],
+        ["Languages", ", ".join(rng.sample(LANGUAGES, 2))],
+    ]
+
+
+def job_description_text(seed: int = 0) -> str:
+    """A job description with a handful of concrete requirements"""
+    rng = random.Random(seed)
+    skills = rng.sample(SKILLS, 6)
+    lines = ["Senior Backend Engineer", "Requirements:"]
+    lines += [f"- {rng.randint(2, 5)}+ years of professional experience with {skill}" for skill in skills[:4]]
+    lines += [f"- Familiarity with {skills[4]} is a plus", f"- Experience deploying {skills[5]} in production",
+              "- Master's degree in Computer Science or equivalent", "- Fluent English"]
+    return "\n".join(lines)
+
+
+def write_docx(path: Path, sections: List[List[str]], table_rows: int = 0):
+    """Write sections as paragraphs, optionally followed by a skills table"""
+    document = Document()
+    for section in sections:
+        for line in section:
+            document.add_paragraph(line)
+    if table_rows:
+        table = document.add_table(rows=table_rows, cols=3)
+        for r, row in enumerate(table.rows):
+            row.cells[0].text = SKILLS[r % len(SKILLS)]
+            row.cells[1].text = f"{r % 10 + 1} years"
+            row.cells[2].text = "Production use across multiple projects"
+    document.save(str(path))
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, lines: List[str], lines_per_page: int = 45):
+    """Write a minimal multi-page text PDF using the standard Helvetica font"""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        content = "BT /F1 10 Tf 50 800 Td 14 TL " + " ".join(f"({_pdf_escape(l)}) '" for l in page_lines) + " ET"
+        objects.append(f"<< /Length {len(content.encode('latin-1', 'replace'))} >>\nstream\n{content}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace")
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    Path(path).write_bytes(bytes(output))
+
+
+def generate_corpus(directory: Path, count: int = 20, experience_entries: int = 4) -> List[Path]:
+    """Generate ``count`` resumes alternating between DOCX and PDF, plus job_description.txt"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for seed in range(count):
+        sections = resume_sections(seed, experience_entries)
+        if seed % 2 == 0:
+            path = directory / f"resume_{seed:03d}.docx"
+            write_docx(path, sections)
+        else:
+            path = directory / f"resume_{seed:03d}.pdf"
+            write_pdf(path, [line for section in sections for line in section])
+        paths.append(path)
+    (directory / "job_description.txt").write_text(job_description_text(), encoding="utf-8")
+    return paths
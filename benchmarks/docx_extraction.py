@@ -0,0 +1,102 @@
+"""
+DOCX text extraction benchmark: streaming XML extractor vs python-docx.
+
+Generates large synthetic resumes (long experience sections plus a big
+skills table) or uses your own DOCX files, extracts each one repeatedly
+with both extractors and reports time per document, throughput, peak
+memory and whether both produced the same words.
+
+Examples:
+
+    # Synthetic resumes with 50 experience entries and 0 / 500 / 5000 table rows
+    python -m benchmarks.docx_extraction
+
+    # Your own documents
+    python -m benchmarks.docx_extraction --corpus ./samples --repeat 20
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.services.document_parser import DocumentParser  # noqa: E402
+from src.services.docx_extractor import extract_docx_text  # noqa: E402
+
+from .corpus import resume_sections, write_docx  # noqa: E402
+
+EXTRACTORS: Dict[str, Callable[[io.BytesIO], str]] = {
+    "python-docx": DocumentParser._extract_docx_text_python_docx,
+    "streaming": extract_docx_text,
+}
+
+
+def generate_documents(directory: Path, experience_entries: int, table_rows: List[int]) -> List[Path]:
+    paths = []
+    for rows in table_rows:
+        path = directory / f"resume_{experience_entries}x_{rows}rows.docx"
+        write_docx(path, resume_sections(rows, experience_entries), table_rows=rows)
+        paths.append(path)
+    return paths
+
+
+def measure(extract: Callable[[io.BytesIO], str], data: bytes, repeat: int) -> Dict[str, float]:
+    """Median seconds per extraction and peak traced memory of one extraction"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(io.BytesIO(data))
+        durations.append(time.perf_counter() - start)
+    tracemalloc.start()
+    extract(io.BytesIO(data))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": statistics.median(durations), "peak_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare DOCX text extractors")
+    parser.add_argument("--corpus", type=Path, help="Directory of DOCX files; synthetic if omitted")
+    parser.add_argument("--experience-entries", type=int, default=50, help="Experience entries per synthetic resume")
+    parser.add_argument("--table-rows", type=int, nargs="+", default=[0, 500, 5000],
+                        help="Skills table sizes of the synthetic resumes")
+    parser.add_argument("--repeat", type=int, default=5, help="Extractions per document and extractor")
+    args = parser.parse_args()
+
+    if args.corpus:
+        paths = sorted(args.corpus.glob("*.docx"))
+    else:
+        directory = Path(tempfile.mkdtemp(prefix="docx-bench-"))
+        paths = generate_documents(directory, args.experience_entries, args.table_rows)
+        print(f"Generated synthetic resumes in {directory}")
+    if not paths:
+        raise SystemExit("No DOCX files to benchmark")
+
+    print(f"\n{'document':<34}{'size':>9}{'python-docx':>14}{'streaming':>12}{'speedup':>9}"
+          f"{'peak MB':>16}{'same words':>12}")
+    speedups = []
+    for path in paths:
+        data = path.read_bytes()
+        results = {name: measure(extract, data, args.repeat) for name, extract in EXTRACTORS.items()}
+        words = {name: sorted(DocumentParser._clean_text(extract(io.BytesIO(data))).split())
+                 for name, extract in EXTRACTORS.items()}
+        slow, fast = results["python-docx"], results["streaming"]
+        speedup = slow["seconds"] / fast["seconds"] if fast["seconds"] else float("inf")
+        speedups.append(speedup)
+        peak = f"{slow['peak_bytes'] / 2**20:.1f} / {fast['peak_bytes'] / 2**20:.1f}"
+        print(f"{path.name[:33]:<34}{len(data) / 1024:>7.0f}KB{slow['seconds'] * 1000:>12.1f}ms"
+              f"{fast['seconds'] * 1000:>10.1f}ms{speedup:>8.1f}x{peak:>16}"
+              f"{str(words['python-docx'] == words['streaming']):>12}")
+    print(f"\nMedian speedup: {statistics.median(speedups):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
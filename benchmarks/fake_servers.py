@@ -0,0 +1,271 @@
+"""
+Local stand-ins for the Groq chat completions API and the Azure OpenAI
+embeddings API, with configurable latency and token throughput.
+
+Point the application at them with:
+
+    GROQ_BASE_URL=http://127.0.0.1:9001
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:9002
+
+Run standalone:
+
+    python -m benchmarks.fake_servers --llm-port 9001 --embedding-port 9002 --llm-latency 0.8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+@dataclass
+class LatencyProfile:
+    """Simulated upstream latency: base + uniform jitter + generation time, plus occasional stragglers"""
+    base: float = 0.5
+    jitter: float = 0.2
+    tokens_per_second: float = 0.0  # 0 disables generation-time simulation
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    slow_rate: float = 0.0  # Fraction of requests that straggle
+    slow_delay: float = 0.0  # Extra seconds added to a straggler
+    requests_per_minute: float = 0.0  # Enforced RPM limit (429 + Retry-After beyond it); 0 disables
+
+    def delay(self, completion_tokens: int = 0) -> float:
+        generation = completion_tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        straggle = self.slow_delay if self.slow_rate and random.random() < self.slow_rate else 0.0
+        return max(0.0, self.base + random.uniform(0, self.jitter) + generation + straggle)
+
+
+MANDATORY_HINTS = re.compile(r"\b(must|required|degree|authori[sz]ation|certifi\w+)\b", re.I)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _stable_fraction(text: str) -> float:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+def _section(prompt: str, label: str) -> str:
+    match = re.search(rf"{label}:\s*(.*?)(?:\n\s*\n|\Z)", prompt, re.S)
+    return match.group(1).strip() if match else ""
+
+
+def _fake_completion(system_prompt: str, prompt: str) -> Dict[str, Any]:
+    """Produce a plausible JSON payload for each prompt the LLMService sends"""
+    system_prompt = system_prompt.lower()
+    if "requirements extractor" in system_prompt:
+        description = _section(prompt, "Job Description")
+        requirements = [
+            part.strip(" -•")
+            for part in re.split(r"(?<=[.;])\s+|\s+-\s+|\n", description)
+            if len(part.strip(" -•")) > 15
+        ]
+        return {"requirements": [
+            {"requirement": text, "mandatory": bool(MANDATORY_HINTS.search(text))}
+            for text in requirements[:12] or ["Relevant professional experience"]
+        ]}
+    if "resume parser" in system_prompt:
+        return {
+            "education": ["Master's in Computer Science"],
+            "skills": ["Python", "FastAPI", "Docker"],
+            "experience": ["Software Engineer"],
+            "certifications": [],
+            "languages": ["English"],
+        }
+    if "key 'evaluations'" in system_prompt:
+        evaluations = []
+        for number, requirement in re.findall(r"Requirement (\d+): (.*)", prompt):
+            score = _stable_fraction(requirement.strip())
+            evaluations.append({
+                "requirement": int(number),
+                "match": score > 0.4,
+                "confidence": round(0.5 + score / 2, 2),
+                "explanation": f"Simulated batched verdict for '{requirement.strip()[:60]}'.",
+            })
+        return {"evaluations": evaluations}
+    if "requirement evaluator" in system_prompt:
+        requirement = _section(prompt, "Job Requirement")
+        score = _stable_fraction(requirement)
+        return {
+            "match": score > 0.4,
+            "confidence": round(0.5 + score / 2, 2),
+            "explanation": f"Simulated verdict for '{requirement[:60]}'.",
+        }
+    return {
+        "fit_score": "Moderate Fit",
+        "fit_percentage": 62.5,
+        "explanation": "Simulated overall evaluation.",
+        "strengths": ["Relevant technical stack"],
+        "weaknesses": ["Limited leadership experience"],
+        "recommendations": ["Probe system design depth in interview"],
+    }
+
+
+class _RateLimit:
+    """Token bucket holding one second of a requests-per-minute budget, like a provider's limiter"""
+
+    def __init__(self, requests_per_minute: float):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1.0, self.rate)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def retry_after(self) -> float:
+        """0 if the request is admitted, else seconds until it would be"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.level >= 1:
+            self.level -= 1
+            return 0.0
+        return (1 - self.level) / self.rate
+
+
+def create_llm_app(profile: LatencyProfile, model_delays: Optional[Dict[str, float]] = None) -> FastAPI:
+    """Groq/OpenAI-compatible chat completions server"""
+    app = FastAPI(title="Fake Groq")
+    model_delays = model_delays or {}
+    app.state.requests = 0
+    app.state.rate_limited = 0
+    rate_limit = _RateLimit(profile.requests_per_minute)
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        retry_after = rate_limit.retry_after()
+        if retry_after:
+            app.state.rate_limited += 1
+            return JSONResponse(status_code=429,
+                                headers={"retry-after": str(math.ceil(retry_after)),
+                                         "retry-after-ms": str(int(retry_after * 1000))},
+                                content={"error": {"message": "Rate limit reached (RPM)", "type": "rate_limit"}})
+        if profile.rate_limit_rate and random.random() < profile.rate_limit_rate:
+            return JSONResponse(status_code=429, headers={"retry-after": "1"},
+                                content={"error": {"message": "Rate limit reached", "type": "rate_limit"}})
+        if profile.error_rate and random.random() < profile.error_rate:
+            return JSONResponse(status_code=500, content={"error": {"message": "Injected failure"}})
+
+        messages: List[Dict[str, str]] = body.get("messages", [])
+        system_prompt = next((m["content"] for m in messages if m["role"] == "system"), "")
+        prompt = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        content = json.dumps(_fake_completion(system_prompt, prompt))
+        prompt_tokens = sum(_estimate_tokens(m["content"]) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+
+        await asyncio.sleep(profile.delay(completion_tokens) + model_delays.get(body.get("model"), 0.0))
+        return {
+            "id": f"chatcmpl-{app.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    # Groq SDK path and plain OpenAI-compatible path
+    app.post("/openai/v1/chat/completions")(chat_completions)
+    app.post("/v1/chat/completions")(chat_completions)
+    return app
+
+
+def _fake_embedding(text: str, dimensions: int) -> List[float]:
+    """Deterministic unit vector; texts sharing words get correlated vectors"""
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for word in re.findall(r"\w+", text.lower()):
+        seed = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16)
+        vector += np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).tolist()
+
+
+def create_embedding_app(profile: LatencyProfile, default_dimensions: int = 3072) -> FastAPI:
+    """Azure OpenAI-compatible embeddings server"""
+    app = FastAPI(title="Fake Azure OpenAI")
+    app.state.requests = 0
+
+    async def embeddings(request: Request, deployment: str = ""):
+        body = await request.json()
+        app.state.requests += 1
+        if profile.rate_limit_rate and random.random() < profile.rate_limit_rate:
+            return JSONResponse(status_code=429, headers={"retry-after": "1"},
+                                content={"error": {"message": "Rate limit reached", "code": "429"}})
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        dimensions = body.get("dimensions") or default_dimensions
+
+        await asyncio.sleep(profile.delay())
+        tokens = sum(_estimate_tokens(text) for text in inputs)
+        return {
+            "object": "list",
+            "model": body.get("model", deployment),
+            "data": [{"object": "embedding", "index": i, "embedding": _fake_embedding(text, dimensions)}
+                     for i, text in enumerate(inputs)],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    app.post("/openai/deployments/{deployment}/embeddings")(embeddings)
+    app.post("/v1/embeddings")(embeddings)
+    return app
+
+
+async def serve(app: FastAPI, port: int, host: str = "127.0.0.1") -> uvicorn.Server:
+    """Start ``app`` in the running event loop and wait until it accepts connections"""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    server.serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server
+
+
+async def stop(server: uvicorn.Server):
+    """Gracefully stop a server started with :func:`serve`"""
+    server.should_exit = True
+    await server.serve_task
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fake Groq and Azure OpenAI servers for benchmarking")
+    parser.add_argument("--llm-port", type=int, default=9001)
+    parser.add_argument("--embedding-port", type=int, default=9002)
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Base LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.2, help="Uniform LLM latency jitter in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Simulated generation throughput")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of LLM requests failing with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--llm-rpm", type=float, default=0.0, help="Enforced LLM requests-per-minute limit")
+    parser.add_argument("--llm-slow-rate", type=float, default=0.0, help="Fraction of LLM requests that straggle")
+    parser.add_argument("--llm-slow-delay", type=float, default=5.0, help="Extra latency of a straggler (s)")
+    parser.add_argument("--embedding-latency", type=float, default=0.1)
+    parser.add_argument("--embedding-jitter", type=float, default=0.05)
+    args = parser.parse_args()
+
+    llm_profile = LatencyProfile(args.llm_latency, args.llm_jitter, args.tokens_per_second,
+                                 args.llm_error_rate, args.rate_limit_rate,
+                                 args.llm_slow_rate, args.llm_slow_delay, args.llm_rpm)
+    embedding_profile = LatencyProfile(args.embedding_latency, args.embedding_jitter,
+                                       rate_limit_rate=args.rate_limit_rate)
+    await serve(create_llm_app(llm_profile), args.llm_port)
+    await serve(create_embedding_app(embedding_profile), args.embedding_port)
+    print(f"Fake Groq on :{args.llm_port}, fake Azure OpenAI on :{args.embedding_port} (Ctrl+C to stop)")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
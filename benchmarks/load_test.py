@@ -0,0 +1,263 @@
+"""
+End-to-end load benchmark for the evaluation API.
+
+Starts fake Groq / Azure OpenAI servers (see fake_servers.py) in-process,
+launches ``app.py`` under uvicorn in a subprocess pointed at them, then
+drives concurrent ``/evaluate-fit`` requests from a corpus of resumes and
+reports throughput, p50/p95/p99 latency and the per-stage breakdown
+returned with ``include_timings``.
+
+Examples:
+
+    # Synthetic corpus, 50 evaluations, 10 in flight
+    python -m benchmarks.load_test --requests 50 --concurrency 10
+
+    # Tail latency with 5% straggling LLM calls, hedging off vs on
+    python -m benchmarks.load_test --llm-slow-rate 0.05 --app-env LLM_HEDGE_ENABLED=false
+    python -m benchmarks.load_test --llm-slow-rate 0.05
+
+    # Provider limited to 600 RPM: unpaced vs paced by the app's scheduler
+    python -m benchmarks.load_test --llm-rpm 600 --concurrency 10
+    python -m benchmarks.load_test --llm-rpm 600 --concurrency 10 --app-env GROQ_REQUESTS_PER_MINUTE=570
+
+    # Your own resumes; fail if p95 or throughput regress >20% vs a baseline
+    python -m benchmarks.load_test --corpus ./samples --job-description ./samples/jd.pdf \\
+        --output run.json --baseline baseline.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .corpus import generate_corpus
+from .fake_servers import LatencyProfile, create_embedding_app, create_llm_app, serve, stop
+
+ROOT = Path(__file__).resolve().parent.parent
+RESUME_EXTENSIONS = (".pdf", ".docx")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "mean": statistics.fmean(latencies) if latencies else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies, default=0.0),
+    }
+
+
+def start_app(port: int, llm_port: int, embedding_port: int, extra_env: Optional[Dict[str, str]] = None) -> subprocess.Popen:
+    """Launch the API under uvicorn, wired to the fake upstreams"""
+    env = dict(os.environ)
+    env.update({
+        "GROQ_BASE_URL": f"http://127.0.0.1:{llm_port}",
+        "CROQ_API_KEY": "benchmark",
+        "GROQ_API_KEY": "benchmark",
+        "AZURE_OPENAI_ENDPOINT": f"http://127.0.0.1:{embedding_port}",
+        "azure_openai_api_key": "benchmark",
+        "RESULT_STORE_PATH": "",  # Keep synthetic evaluations out of the real result store
+    })
+    env.update(extra_env or {})
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not become healthy in time")
+
+
+async def run_load(client: httpx.AsyncClient, resumes: List[Path], job_description: Path,
+                   total_requests: int, concurrency: int, priority: str = "interactive",
+                   use_cache: bool = False) -> Dict[str, Any]:
+    """
+    Fire ``total_requests`` evaluations with at most ``concurrency`` in
+    flight. Resumes repeat once the corpus runs out, so the result cache is
+    off unless ``use_cache``: otherwise repeats would measure cache hits
+    rather than the pipeline.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    jd_bytes = job_description.read_bytes()
+    latencies: List[float] = []
+    stage_timings: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async def one(i: int):
+        resume = resumes[i % len(resumes)]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/evaluate-fit",
+                    files={
+                        "resume_file": (resume.name, resume.read_bytes()),
+                        "job_description_file": (job_description.name, jd_bytes),
+                    },
+                    data={"candidate_name": resume.stem, "include_timings": "true", "priority": priority,
+                          "use_cache": "true" if use_cache else "false"},
+                )
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                return
+            elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+            return
+        latencies.append(elapsed)
+        for stage, duration in (response.json().get("timings") or {}).items():
+            stage_timings.setdefault(stage, []).append(duration)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total_requests)))
+    wall_time = time.perf_counter() - wall_start
+
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "use_cache": use_cache,
+        "succeeded": len(latencies),
+        "errors": errors,
+        "wall_time": wall_time,
+        "throughput_rps": len(latencies) / wall_time if wall_time else 0.0,
+        "latency": summarize(latencies),
+        "stages": {stage: summarize(values) for stage, values in stage_timings.items()},
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    latency = report["latency"]
+    print("\n" + "=" * 60)
+    print("LOAD BENCHMARK")
+    print("=" * 60)
+    print(f"Requests: {report['succeeded']}/{report['requests']} ok, concurrency {report['concurrency']}")
+    if report["errors"]:
+        print(f"Errors: {report['errors']}")
+    if report.get("upstream_rate_limited"):
+        print(f"Upstream 429s: {report['upstream_rate_limited']}")
+    print(f"Wall time: {report['wall_time']:.2f}s | Throughput: {report['throughput_rps']:.2f} req/s")
+    print(f"Latency  p50 {latency['p50']:.2f}s  p95 {latency['p95']:.2f}s  "
+          f"p99 {latency['p99']:.2f}s  max {latency['max']:.2f}s")
+    if report["stages"]:
+        print(f"\n{'stage':<24}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}")
+        for stage, stats in sorted(report["stages"].items(), key=lambda item: item[1]["mean"], reverse=True):
+            print(f"{stage:<24}{stats['mean']:>9.3f}{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['p99']:>9.3f}")
+
+
+def check_regression(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Compare against a previous report; returns human-readable regressions"""
+    problems = []
+    for pct in ("p50", "p95", "p99"):
+        before, after = baseline["latency"][pct], report["latency"][pct]
+        if before and after > before * (1 + tolerance):
+            problems.append(f"latency {pct} {before:.3f}s -> {after:.3f}s")
+    before, after = baseline["throughput_rps"], report["throughput_rps"]
+    if before and after < before * (1 - tolerance):
+        problems.append(f"throughput {before:.2f} -> {after:.2f} req/s")
+    return problems
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="End-to-end load benchmark with fake LLM/embedding upstreams")
+    parser.add_argument("--corpus", type=Path, help="Directory of resumes (PDF/DOCX); synthetic if omitted")
+    parser.add_argument("--job-description", type=Path, help="Job description file (defaults to corpus/job_description.txt)")
+    parser.add_argument("--requests", type=int, default=20, help="Total evaluations to run")
+    parser.add_argument("--concurrency", type=int, default=5, help="Evaluations in flight")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Fake LLM base latency (s)")
+    parser.add_argument("--llm-jitter", type=float, default=0.1, help="Fake LLM latency jitter (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="Fake LLM generation throughput")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of fake LLM requests failing with 500")
+    parser.add_argument("--llm-rpm", type=float, default=0.0, help="Enforced fake LLM requests-per-minute limit")
+    parser.add_argument("--llm-slow-rate", type=float, default=0.0, help="Fraction of fake LLM requests that straggle")
+    parser.add_argument("--llm-slow-delay", type=float, default=5.0, help="Extra latency of a straggler (s)")
+    parser.add_argument("--embedding-latency", type=float, default=0.05, help="Fake embedding latency (s)")
+    parser.add_argument("--priority", choices=["interactive", "batch"], default="interactive",
+                        help="Rate-limit queue class sent with each evaluation")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Let repeated resumes reuse memoised profiles and verdicts (off: every request runs the full pipeline)")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--llm-port", type=int, default=9001)
+    parser.add_argument("--embedding-port", type=int, default=9002)
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the API process (repeatable), e.g. LLM_HEDGE_ENABLED=false")
+    parser.add_argument("--output", "-o", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Previous JSON report to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed relative regression vs baseline")
+    args = parser.parse_args()
+
+    corpus = args.corpus
+    if corpus is None:
+        corpus = Path(tempfile.mkdtemp(prefix="fit-bench-"))
+        generate_corpus(corpus, count=max(4, min(args.requests, 20)))
+        print(f"Generated synthetic corpus in {corpus}")
+    resumes = sorted(p for p in corpus.iterdir() if p.suffix.lower() in RESUME_EXTENSIONS)
+    job_description = args.job_description or corpus / "job_description.txt"
+    if not resumes or not job_description.exists():
+        raise SystemExit("Corpus needs PDF/DOCX resumes and a job description")
+
+    fake_servers = [
+        await serve(create_llm_app(LatencyProfile(args.llm_latency, args.llm_jitter, args.tokens_per_second,
+                                                  error_rate=args.llm_error_rate, slow_rate=args.llm_slow_rate,
+                                                  slow_delay=args.llm_slow_delay,
+                                                  requests_per_minute=args.llm_rpm)),
+                    args.llm_port),
+        await serve(create_embedding_app(LatencyProfile(args.embedding_latency, args.embedding_latency / 2)),
+                    args.embedding_port),
+    ]
+    app_env = dict(item.split("=", 1) for item in args.app_env)
+    app_process = start_app(args.app_port, args.llm_port, args.embedding_port, app_env)
+
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.app_port}", timeout=600) as client:
+            await wait_until_healthy(client)
+            report = await run_load(client, resumes, job_description, args.requests, args.concurrency,
+                                    args.priority, args.use_cache)
+        report["upstream_rate_limited"] = fake_servers[0].config.app.state.rate_limited
+    finally:
+        app_process.terminate()
+        app_process.wait(timeout=10)
+        for server in fake_servers:
+            await stop(server)
+
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\n💾 Report saved to: {args.output}")
+    if args.baseline:
+        problems = check_regression(report, json.loads(args.baseline.read_text()), args.max_regression)
+        if problems:
+            print("\n❌ Regressions vs baseline: " + "; ".join(problems))
+            sys.exit(1)
+        print("\n✅ No regressions vs baseline")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
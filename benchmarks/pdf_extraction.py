@@ -0,0 +1,107 @@
+"""
+PDF text extraction benchmark: PDFium text layer vs pdfplumber.
+
+Generates synthetic multi-page resumes or uses your own PDFs, extracts
+each one repeatedly with both engines, and reports pages per second and
+the speedup. Output equivalence is shown as the overlap of the cleaned
+word multisets (1.0 = the same words, in any order), plus whether the
+fast text passes the usability check that triggers the pdfplumber
+fallback.
+
+Examples:
+
+    # Synthetic resumes of 1, 10 and 50 pages
+    python -m benchmarks.pdf_extraction
+
+    # Your own documents
+    python -m benchmarks.pdf_extraction --corpus ./samples --repeat 3
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.services.document_parser import DocumentParser  # noqa: E402
+from src.services.pdf_extractor import extract_pdf_text, pdfium_available, text_is_usable  # noqa: E402
+
+from .corpus import resume_sections, write_pdf  # noqa: E402
+
+ENGINES: Dict[str, Callable[[io.BytesIO], str]] = {
+    "pdfplumber": DocumentParser._extract_pdf_text_pdfplumber,
+    "pdfium": lambda file: extract_pdf_text(file)[0],
+}
+
+
+def generate_documents(directory: Path, pages: List[int]) -> List[Path]:
+    paths = []
+    for page_count in pages:
+        # 45 lines per page: 12 lines of other sections, two lines per experience entry
+        sections = resume_sections(page_count, experience_entries=(45 * page_count - 12) // 2)
+        path = directory / f"resume_{page_count}p.pdf"
+        write_pdf(path, [line for section in sections for line in section])
+        paths.append(path)
+    return paths
+
+
+def measure(extract: Callable[[io.BytesIO], str], data: bytes, repeat: int) -> float:
+    """Median seconds per extraction"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract(io.BytesIO(data))
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def word_overlap(fast: str, reference: str) -> float:
+    """Dice overlap of the word multisets of two cleaned texts"""
+    fast_words = Counter(DocumentParser._clean_text(fast).split())
+    reference_words = Counter(DocumentParser._clean_text(reference).split())
+    total = sum(fast_words.values()) + sum(reference_words.values())
+    return 2 * sum((fast_words & reference_words).values()) / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF text extraction engines")
+    parser.add_argument("--corpus", type=Path, help="Directory of PDF files; synthetic if omitted")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50], help="Synthetic resume lengths")
+    parser.add_argument("--repeat", type=int, default=5, help="Extractions per document and engine")
+    args = parser.parse_args()
+
+    if not pdfium_available():
+        raise SystemExit("pypdfium2 is not installed")
+    if args.corpus:
+        paths = sorted(args.corpus.glob("*.pdf"))
+    else:
+        directory = Path(tempfile.mkdtemp(prefix="pdf-bench-"))
+        paths = generate_documents(directory, args.pages)
+        print(f"Generated synthetic resumes in {directory}")
+    if not paths:
+        raise SystemExit("No PDF files to benchmark")
+
+    print(f"\n{'document':<34}{'pages':>6}{'pdfplumber':>14}{'pdfium':>12}{'speedup':>9}{'overlap':>9}{'usable':>8}")
+    speedups = []
+    for path in paths:
+        data = path.read_bytes()
+        text, page_count = extract_pdf_text(io.BytesIO(data))
+        reference = ENGINES["pdfplumber"](io.BytesIO(data))
+        seconds = {name: measure(extract, data, args.repeat) for name, extract in ENGINES.items()}
+        speedup = seconds["pdfplumber"] / seconds["pdfium"] if seconds["pdfium"] else float("inf")
+        speedups.append(speedup)
+        print(f"{path.name[:33]:<34}{page_count:>6}{page_count / seconds['pdfplumber']:>9.1f} p/s"
+              f"{page_count / seconds['pdfium']:>7.0f} p/s{speedup:>8.1f}x"
+              f"{word_overlap(text, reference):>9.3f}{str(text_is_usable(text, page_count)):>8}")
+    print(f"\nMedian speedup: {statistics.median(speedups):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Worst-case TextChunker benchmark: line-scan section detection vs the
+previous regex.
+
+The previous detector ran ``(?:\\n|^)\\s*([\\w\\s]+)\\s*\\n`` over the whole
+document. Its overlapping whitespace groups backtrack polynomially on
+whitespace runs that ``_clean_text`` does not collapse (no-break spaces,
+alternating ``\\r``/space), so a malformed CV could stall a worker for
+minutes. Each adversarial input is chunked at growing sizes with both
+detectors. The previous one stops growing once a run exceeds
+``--legacy-limit`` seconds.
+
+Examples:
+
+    python -m benchmarks.text_chunking
+
+    # Larger inputs, and give the previous detector more rope
+    python -m benchmarks.text_chunking --sizes 1000 10000 100000 --legacy-limit 10
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.services.text_chunker import TextChunker  # noqa: E402
+
+from .corpus import resume_sections  # noqa: E402
+
+LEGACY_HEADINGS = [
+    "experience", "work experience", "professional experience",
+    "education", "formation académique", "formation",
+    "skills", "compétences techniques", "compétences",
+    "projects", "projets", "publications",
+    "languages", "langues", "certifications",
+    "interests", "centres d'intérêt", "summary",
+    "rèsumè", "objective", "connaissances"
+]
+
+
+class LegacyTextChunker(TextChunker):
+    """TextChunker with the previous regex section detector"""
+
+    def _split_into_sections(self, text: str) -> List[str]:
+        pattern = r'(?:\n|^)\s*([\w\s]+)\s*\n'
+        sections = []
+        last_idx = 0
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            header = match.group(1).strip().lower()
+            if header in LEGACY_HEADINGS:
+                if match.start() > last_idx:
+                    sections.append(text[last_idx:match.start()])
+                sections.append(match.group().strip() + '\n')
+                last_idx = match.end()
+        if last_idx < len(text):
+            sections.append(text[last_idx:])
+        return sections
+
+
+def realistic(size: int) -> str:
+    """A well-formed CV with about ``size`` characters"""
+    text = ""
+    seed = 0
+    while len(text) < size:
+        text += "\n\n".join("\n".join(section) for section in resume_sections(seed, experience_entries=8)) + "\n\n"
+        seed += 1
+    return text[:size]
+
+
+# Inputs that survive _clean_text with long uncollapsed whitespace runs
+INPUTS: Dict[str, Callable[[int], str]] = {
+    "realistic": realistic,
+    "nbsp_run": lambda size: "Summary\n" + "\u00a0" * size + ".",
+    "cr_space_run": lambda size: "Experience\n" + "\r " * (size // 2) + "end.",
+    "long_line": lambda size: "word " * (size // 5) + "end.",
+    "heading_like_lines": lambda size: "Skills\n" * (size // 7) + "x.",
+}
+
+
+def measure(chunker: TextChunker, text: str) -> float:
+    start = time.perf_counter()
+    chunker.chunk_text(text)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worst-case TextChunker section detection")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000, 100000],
+                        help="Input sizes in characters")
+    parser.add_argument("--inputs", nargs="+", choices=list(INPUTS), default=list(INPUTS))
+    parser.add_argument("--legacy-limit", type=float, default=1.0,
+                        help="Stop timing the previous detector on an input once a run takes longer")
+    args = parser.parse_args()
+
+    linear, legacy = TextChunker(), LegacyTextChunker()
+    print(f"{'input':<20}{'chars':>9}{'regex':>12}{'line scan':>12}{'speedup':>10}")
+    for name in args.inputs:
+        legacy_stopped = False
+        for size in sorted(args.sizes):
+            text = INPUTS[name](size)
+            fast = measure(linear, text)
+            if legacy_stopped:
+                slow_column, speedup_column = "skipped", "-"
+            else:
+                slow = measure(legacy, text)
+                legacy_stopped = slow > args.legacy_limit
+                slow_column = f"{slow * 1000:.1f}ms"
+                speedup_column = f"{slow / fast:.0f}x" if fast else "-"
+            print(f"{name:<20}{len(text):>9}{slow_column:>12}{fast * 1000:>10.2f}ms{speedup_column:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Recall vs memory of the VectorStore index types.
+
+Builds every combination of index type (flat, fp16, sq8, pq) and
+embedding dimension (truncated from the full vectors) over one pool,
+and measures recall@k against exact search on the full-dimension flat
+index. Also reports bytes per vector, the projected size of a larger
+pool, build time and query latency.
+
+Synthetic vectors are clustered. Their variance decays across
+dimensions, so truncation behaves roughly like it does on text-embedding-3
+vectors. For real numbers, pass an (n, d) float32 .npy of stored
+embeddings; the last --queries rows are used as queries.
+
+Examples:
+
+    # 20k synthetic 3072-d vectors, projected to a 300k-chunk pool
+    python -m benchmarks.vector_index
+
+    # Real embeddings, only the compressed types at 1024 and 384 dimensions
+    python -m benchmarks.vector_index --embeddings pool.npy --index-types sq8 pq --dimensions 1024 384
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# The module creates its embedding client on import; no requests are made here
+os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://127.0.0.1")
+os.environ.setdefault("azure_openai_api_key", "unused")
+
+from src.services.vector_store import INDEX_TYPES, TRAINED_INDEX_TYPES, create_index, truncate_embeddings  # noqa: E402
+
+MAX_TRAINING_VECTORS = 20000
+
+
+def synthetic_vectors(count: int, dimension: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """Unit vectors around random cluster centres, with variance decaying over the dimensions"""
+    rng = np.random.default_rng(seed)
+    scale = (1.0 / np.sqrt(1.0 + np.arange(dimension) / 64.0)).astype('float32')
+    centres = rng.standard_normal((clusters, dimension), dtype=np.float32) * scale
+    vectors = centres[rng.integers(0, clusters, count)]
+    vectors += 0.6 * rng.standard_normal((count, dimension), dtype=np.float32) * scale
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def evaluate(index_type: str, dimension: int, pool: np.ndarray, queries: np.ndarray,
+             truth: np.ndarray, k: int, projected_pool: int) -> Dict[str, float]:
+    pool = truncate_embeddings(pool, dimension)
+    queries = truncate_embeddings(queries, dimension)
+    index = create_index(index_type, dimension)
+
+    start = time.perf_counter()
+    if index_type in TRAINED_INDEX_TYPES:
+        index.train(pool[:MAX_TRAINING_VECTORS])
+    index.add(pool)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    query_time = (time.perf_counter() - start) / len(queries)
+
+    return {
+        "bytes_per_vector": index.code_size,
+        "projected_mib": index.code_size * projected_pool / 2**20,
+        "build_seconds": build_time,
+        "query_ms": query_time * 1000,
+        "recall": recall_at_k(found, truth),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs memory of VectorStore index types")
+    parser.add_argument("--embeddings", type=Path, help="(n, d) float32 .npy of real embeddings; synthetic if omitted")
+    parser.add_argument("--vectors", type=int, default=20000, help="Synthetic pool size")
+    parser.add_argument("--dimension", type=int, default=3072, help="Synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Recall@k")
+    parser.add_argument("--index-types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--dimensions", type=int, nargs="+", help="Truncated dimensions to try (default: full, 1024, 384)")
+    parser.add_argument("--pool-size", type=int, default=300000, help="Pool size for the projected memory column")
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = np.ascontiguousarray(np.load(args.embeddings), dtype='float32')
+        faiss.normalize_L2(vectors)
+        pool, queries = vectors[:-args.queries], vectors[-args.queries:]
+    else:
+        vectors = synthetic_vectors(args.vectors + args.queries, args.dimension)
+        pool, queries = vectors[:args.vectors], vectors[args.vectors:]
+    full_dimension = pool.shape[1]
+    dimensions: List[int] = args.dimensions or sorted({full_dimension, min(1024, full_dimension),
+                                                      min(384, full_dimension)}, reverse=True)
+
+    # Ground truth: exact search over the full vectors
+    exact = faiss.IndexFlatIP(full_dimension)
+    exact.add(pool)
+    _, truth = exact.search(queries, args.k)
+
+    print(f"Pool: {len(pool)} x {full_dimension}-d, {len(queries)} queries, recall@{args.k} vs flat/{full_dimension}")
+    print(f"\n{'index':<8}{'dims':>6}{'bytes/vec':>11}{f'MiB @ {args.pool_size:,}':>18}"
+          f"{'build s':>9}{'query ms':>10}{'recall':>8}")
+    for dimension in dimensions:
+        for index_type in args.index_types:
+            try:
+                result = evaluate(index_type, dimension, pool, queries, truth, args.k, args.pool_size)
+            except ValueError as e:  # PQ subquantizers that don't divide the dimension
+                print(f"{index_type:<8}{dimension:>6}  skipped: {e}")
+                continue
+            print(f"{index_type:<8}{dimension:>6}{result['bytes_per_vector']:>11}{result['projected_mib']:>18,.0f}"
+                  f"{result['build_seconds']:>9.2f}{result['query_ms']:>10.2f}{result['recall']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
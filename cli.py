@@ -14,21 +14,30 @@ from typing import Optional
 sys.path.append(str(Path(__file__).parent / "src"))
 
 from src.services.candidate_evaluator import CandidateEvaluator
+from src.services.profiler import RequestProfiler, PROFILE_MODES
+from src.services.result_store import RESULT_STORE
 from src.models.response_models import FitEvaluationResponse
+from src.models.request_models import EvaluationOptions
 import json
 
 class MockUploadFile:
-    """Mock UploadFile for CLI usage"""
+    """Mock UploadFile for CLI usage, backed by the open file so it is never read whole"""
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.filename = os.path.basename(file_path)
+        self.file = open(file_path, 'rb')
     
-    async def read(self):
-        with open(self.file_path, 'rb') as f:
-            return f.read()
+    async def read(self, size: int = -1):
+        return self.file.read(size)
+    
+    def close(self):
+        self.file.close()
 
 async def evaluate_candidate_cli(resume_path: str, job_description_path: str, 
-                               candidate_name: Optional[str] = None) -> FitEvaluationResponse:
+                               candidate_name: Optional[str] = None,
+                               options: Optional[EvaluationOptions] = None,
+                               profile_mode: Optional[str] = None,
+                               job_id: Optional[str] = None) -> FitEvaluationResponse:
     """Evaluate candidate fit using CLI"""
     
     # Validate file paths
@@ -45,12 +54,27 @@ async def evaluate_candidate_cli(resume_path: str, job_description_path: str,
     # Initialize evaluator
     evaluator = CandidateEvaluator()
     
+    # Profile only when requested
+    profiler = RequestProfiler(profile_mode) if profile_mode else None
+    if profiler:
+        profiler.start()
+    
     # Perform evaluation
-    result = await evaluator.evaluate_fit(
-        resume_file=resume_file,
-        job_description_file=job_description_file,
-        candidate_name=candidate_name
-    )
+    try:
+        result = await evaluator.evaluate_fit(
+            resume_file=resume_file,
+            job_description_file=job_description_file,
+            candidate_name=candidate_name,
+            options=options,
+            job_id=job_id
+        )
+    finally:
+        resume_file.close()
+        job_description_file.close()
+        if profiler:
+            profiler.stop()
+            artifact = profiler.save(evaluator.document_hash)
+            print(f"🔬 Profile ({profile_mode}) saved to: {artifact}", file=sys.stderr)
     
     return result
 
@@ -76,11 +100,20 @@ def print_evaluation_results(evaluation: FitEvaluationResponse):
     
     # Requirement matches
     print(f"\n📋 REQUIREMENT MATCHES:")
-    for i, req in enumerate(evaluation.comparison_matrix.requirements, 1):
-        status = "✅" if req.match else "❌"
-        print(f"   {i}. {status} {req.requirement[:50]}...")
-        print(f"      Confidence: {req.confidence:.2f}")
-        print(f"      Explanation: {req.explanation[:100]}...")
+    for i, req in enumerate(evaluation.comparison_matrix, 1):
+        status = "✅" if req["match"] else "❌"
+        must_have = " [must-have]" if req.get("mandatory") else ""
+        print(f"   {i}. {status} {req['requirement'][:50]}...{must_have}")
+    
+    # Knockouts
+    if evaluation.failed_knockouts:
+        print(f"\n⛔ FAILED KNOCKOUTS:")
+        for knockout in evaluation.failed_knockouts:
+            print(f"   • {knockout}")
+    if evaluation.early_terminated:
+        print(f"   Stopped early; {len(evaluation.skipped_requirements)} requirements not evaluated")
+    for degradation in evaluation.degradations:
+        print(f"   ⚠️  {degradation}")
     
     # Strengths and weaknesses
     if evaluation.strengths:
@@ -103,6 +136,16 @@ def print_evaluation_results(evaluation: FitEvaluationResponse):
     print(f"\n📝 EXPLANATION:")
     print(f"   {evaluation.explanation}")
     
+    # Timing breakdown
+    if evaluation.timings:
+        print(f"\n⏱️  STAGE TIMINGS:")
+        for stage, duration in sorted(evaluation.timings.items(), key=lambda item: item[1], reverse=True):
+            print(f"   {stage:<24} {duration:8.3f}s")
+    if evaluation.token_usage:
+        usage = evaluation.token_usage
+        print(f"   LLM calls: {usage.get('calls', 0)} | prompt tokens: {usage.get('prompt_tokens', 0)} "
+              f"| completion tokens: {usage.get('completion_tokens', 0)}")
+    
     print("\n" + "="*60)
 
 def save_results_to_json(evaluation: FitEvaluationResponse, output_path: str):
@@ -116,8 +159,31 @@ async def main():
     parser.add_argument("resume", help="Path to resume file (PDF or DOCX)")
     parser.add_argument("job_description", help="Path to job description file (PDF, DOCX, or TXT)")
     parser.add_argument("--candidate-name", "-n", help="Candidate name (optional)")
+    parser.add_argument("--job-id", help="Job identifier the result is stored under (default: hash of the job description)")
     parser.add_argument("--output", "-o", help="Output JSON file path (optional)")
     parser.add_argument("--json-only", action="store_true", help="Output only JSON (no formatted text)")
+    parser.add_argument("--timings", action="store_true", help="Include per-stage timings and token usage")
+    parser.add_argument("--early-exit", action="store_true",
+                        help="Stop as soon as a mandatory requirement fails with high confidence")
+    parser.add_argument("--knockout-confidence", type=float, default=0.8,
+                        help="Confidence needed for a failed must-have to count as a knockout (default 0.8)")
+    parser.add_argument("--scoring", choices=["llm", "local"], default="llm",
+                        help="Summarize with the LLM or with the deterministic local scorer (default llm)")
+    parser.add_argument("--narrative", action="store_true",
+                        help="With --scoring local, still fetch the LLM explanation and recommendations")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-evaluate every requirement instead of reusing memoised verdicts")
+    parser.add_argument("--priority", choices=["interactive", "batch"], default="interactive",
+                        help="Rate-limit queue class (default interactive)")
+    parser.add_argument("--max-llm-calls", type=int,
+                        help="LLM call budget; the evaluation degrades to fit (0 = unlimited)")
+    parser.add_argument("--max-prompt-tokens", type=int,
+                        help="Prompt token budget (0 = unlimited)")
+    parser.add_argument("--max-seconds", type=float,
+                        help="Wall time budget from the start of the evaluation, parsing and extraction included; "
+                             "unfinished requirements are skipped (0 = unlimited)")
+    parser.add_argument("--profile", nargs="?", const="sample", choices=PROFILE_MODES,
+                        help="Profile the evaluation (default mode: sample); artefacts go to PROFILE_DIR or ./profiles")
     
     args = parser.parse_args()
     
@@ -134,8 +200,23 @@ async def main():
         result = await evaluate_candidate_cli(
             resume_path=args.resume,
             job_description_path=args.job_description,
-            candidate_name=args.candidate_name
+            candidate_name=args.candidate_name,
+            options=EvaluationOptions(
+                include_timings=args.timings,
+                early_exit=args.early_exit,
+                knockout_confidence=args.knockout_confidence,
+                scoring_mode=args.scoring,
+                include_narrative=args.narrative,
+                use_cache=not args.no_cache,
+                priority=args.priority,
+                max_llm_calls=args.max_llm_calls,
+                max_prompt_tokens=args.max_prompt_tokens,
+                max_seconds=args.max_seconds,
+            ),
+            profile_mode=args.profile,
+            job_id=args.job_id
         )
+        RESULT_STORE.flush()  # The write runs in the background; finish it before exiting
         
         # Output results
         if args.json_only:
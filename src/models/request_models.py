@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+from .response_models import CandidateProfile, RequirementMatch
+
+class EvaluationOptions(BaseModel):
+    """Per-request evaluation settings"""
+    include_timings: bool = False  # Attach per-stage timings, critical path and token usage
+    early_exit: bool = False  # Stop once a mandatory requirement fails with high confidence
+    knockout_confidence: float = 0.8  # Minimum confidence for a failed must-have to end the evaluation
+    scoring_mode: Literal["llm", "local"] = "llm"  # Summary by LLM or by the deterministic FitScorer
+    include_narrative: bool = False  # With local scoring, still ask the LLM for explanation/recommendations
+    use_cache: bool = True  # Reuse verdicts/profiles memoised for the same resume, model and prompt
+    priority: Literal["interactive", "batch"] = "interactive"  # Queue class for the shared rate limiters
+    # Per-evaluation budgets; None uses the EVALUATION_MAX_* defaults, 0 is unlimited
+    max_llm_calls: Optional[int] = None
+    max_prompt_tokens: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+class NarrativeRequest(BaseModel):
+    """Inputs for generating the LLM narrative of an existing evaluation"""
+    candidate_profile: CandidateProfile
+    requirement_matches: List[RequirementMatch]
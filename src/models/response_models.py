@@ -15,6 +15,8 @@ class RequirementMatch(BaseModel):
     match: bool
     confidence: float
     explanation: str
+    mandatory: bool = False  # Must-have (knockout) vs nice-to-have
+    cached: bool = False  # Reused from an earlier evaluation of the same resume
 
 class ComparisonMatrix(BaseModel):
     """Matrix of requirement matches"""
@@ -23,12 +25,74 @@ class ComparisonMatrix(BaseModel):
 
 class FitEvaluationResponse(BaseModel):
     """Complete fit evaluation response"""
+    evaluation_id: Optional[str] = None  # Key in the result store, when it is enabled
+    job_id: Optional[str] = None  # Caller's job id, or a hash of the job description text
     fit_score: str  # "Strong Fit", "Moderate Fit", "Weak Fit", "Poor Fit"
     fit_percentage: float
     candidate_profile: CandidateProfile
-    comparison_matrix: List[Dict[str, Any]]  # List of {requirement, match}
+    comparison_matrix: List[Dict[str, Any]]  # List of {requirement, match, mandatory}
     explanation: str
     strengths: List[str]
     weaknesses: List[str]
     recommendations: List[str]
-    processing_time: float 
\ No newline at end of file
+    requirement_matches: List[RequirementMatch] = []  # Per-requirement verdicts with confidence
+    scoring_mode: str = "llm"  # How the summary fields were produced: "llm" or "local"
+    failed_knockouts: List[str] = []  # Mandatory requirements confidently not met
+    skipped_requirements: List[str] = []  # Not evaluated: early exit, dropped to fit a budget, or timed out
+    early_terminated: bool = False
+    degradations: List[str] = []  # What was cut or simplified to stay within the evaluation budget
+    processing_time: float
+    timings: Optional[Dict[str, float]] = None  # Per-stage durations in seconds
+    critical_path: Optional[List[str]] = None  # Stages that determined total wall time
+    token_usage: Optional[Dict[str, int]] = None  # LLM calls and prompt/completion tokens
+    cache_stats: Optional[Dict[str, int]] = None  # Verdict/profile cache hits and misses
+
+class FitNarrative(BaseModel):
+    """LLM-written narrative for an evaluation scored locally"""
+    explanation: str
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+    recommendations: List[str] = []
+
+class RankedCandidate(BaseModel):
+    """One applicant in a cascade ranking"""
+    name: str
+    rank: int
+    stage: str  # "evaluated" (full LLM evaluation), "prefilter" (coverage only) or "failed"
+    coverage_score: float = 0.0  # Stage-1 embedding coverage of the requirements, 0-100
+    requirement_coverage: List[float] = []  # Per requirement, in RankingResponse.requirements order
+    fit_score: Optional[str] = None  # From the full evaluation (shortlisted candidates only)
+    fit_percentage: Optional[float] = None
+    evaluation: Optional[FitEvaluationResponse] = None
+    error: Optional[str] = None  # Why the resume could not be parsed or evaluated
+
+class RankingResponse(BaseModel):
+    """Applicants ranked against one job description"""
+    job_id: Optional[str] = None  # Shortlisted evaluations are stored under this job id
+    requirements: List[str]
+    mandatory: List[bool]
+    candidates: List[RankedCandidate]  # Best first
+    total_candidates: int
+    shortlist_size: int  # Candidates that got the full evaluation
+    processing_time: float
+    llm_calls: int  # Across requirement extraction and every full evaluation
+    timings: Optional[Dict[str, float]] = None  # Seconds per ranking stage
+
+class StoredEvaluation(BaseModel):
+    """Summary row of an evaluation in the result store"""
+    evaluation_id: str
+    job_id: str
+    candidate_name: Optional[str] = None
+    resume_hash: str
+    fit_score: str
+    fit_percentage: float
+    scoring_mode: str
+    early_terminated: bool
+    created_at: float  # Unix time
+
+class EvaluationPage(BaseModel):
+    """One page of stored evaluations"""
+    total: int  # Matching evaluations across all pages
+    limit: int
+    offset: int
+    items: List[StoredEvaluation]
@@ -0,0 +1,169 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+import logging
+
+from starlette.responses import JSONResponse
+
+from .metrics import ADMISSION_DECISIONS, ADMISSION_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the limit
+MAX_CONCURRENT_EVALUATIONS = int(os.getenv("MAX_CONCURRENT_EVALUATIONS", "8"))
+MAX_QUEUED_EVALUATIONS = int(os.getenv("MAX_QUEUED_EVALUATIONS", "16"))
+MAX_CONCURRENT_RANKINGS = int(os.getenv("MAX_CONCURRENT_RANKINGS", "2"))
+MAX_QUEUED_RANKINGS = int(os.getenv("MAX_QUEUED_RANKINGS", "4"))
+MAX_CONCURRENT_NARRATIVES = int(os.getenv("MAX_CONCURRENT_NARRATIVES", "4"))
+MAX_QUEUED_NARRATIVES = int(os.getenv("MAX_QUEUED_NARRATIVES", "8"))
+MAX_QUEUE_WAIT_SECONDS = float(os.getenv("MAX_QUEUE_WAIT_SECONDS", "10"))
+SERVICE_TIME_SMOOTHING = 0.2  # Weight of the latest request in the service time average
+
+
+class AdmissionRejected(Exception):
+    """A request was shed; ``retry_after`` is the suggested wait in whole seconds"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionController:
+    """
+    Bounded concurrency with a bounded FIFO wait queue for one pool of
+    endpoints.
+
+    Up to ``max_in_flight`` requests run at once and up to ``max_queued``
+    wait for a slot. A request is rejected straight away when the queue is
+    full or when its expected wait (queue position times the smoothed
+    service time, divided by the slots) is over ``max_queue_wait``, and
+    after ``max_queue_wait`` seconds if it is still queued. Rejections
+    carry a Retry-After estimate, so under a spike some requests are
+    refused quickly instead of all of them timing out.
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queued: int,
+                 max_queue_wait: float = MAX_QUEUE_WAIT_SECONDS):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.max_queue_wait = max_queue_wait
+        self.in_flight = 0
+        self.service_time: Optional[float] = None  # Smoothed seconds per request, once one has finished
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for future in self._waiters if not future.done())
+
+    def expected_wait(self, position: int) -> float:
+        """Seconds until the request at queue ``position`` (1 = next) gets a slot"""
+        if not self.service_time:
+            return 0.0
+        return self.service_time * position / self.max_in_flight
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "service_time_seconds": round(self.service_time, 3) if self.service_time else None,
+        }
+
+    def _reject(self, reason: str, retry_after: float):
+        ADMISSION_DECISIONS.inc(pool=self.name, outcome=f"rejected_{reason}")
+        raise AdmissionRejected(
+            f"Server busy: {self.in_flight} {self.name} in progress and {self.queued} queued", retry_after
+        )
+
+    async def acquire(self):
+        """Take a slot, queueing for one if needed, or raise AdmissionRejected"""
+        if self.max_in_flight <= 0 or (self.in_flight < self.max_in_flight and not self.queued):
+            self.in_flight += 1
+            ADMISSION_DECISIONS.inc(pool=self.name, outcome="admitted")
+            return
+
+        position = self.queued + 1
+        if position > self.max_queued:
+            self._reject("queue_full", self.expected_wait(position) or 1)
+        if self.max_queue_wait and self.expected_wait(position) > self.max_queue_wait:
+            self._reject("queue_wait", self.expected_wait(position))
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        ADMISSION_DECISIONS.inc(pool=self.name, outcome="queued")
+        start = time.monotonic()
+        try:
+            await asyncio.wait((future,), timeout=self.max_queue_wait or None)
+        except asyncio.CancelledError:
+            # Client went away; hand on a slot that was passed to us meanwhile
+            if future.done():
+                self.release()
+            else:
+                future.cancel()
+            raise
+        if not future.done():
+            future.cancel()
+            self._reject("timeout", self.expected_wait(self.queued + 1) or self.max_queue_wait)
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - start, pool=self.name)
+
+    def release(self, duration: Optional[float] = None):
+        """Free a slot, passing it to the oldest live waiter; ``duration`` updates the service time"""
+        if duration is not None:
+            self.service_time = duration if self.service_time is None else (
+                SERVICE_TIME_SMOOTHING * duration + (1 - SERVICE_TIME_SMOOTHING) * self.service_time
+            )
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():  # Skip waiters that timed out or were cancelled
+                future.set_result(None)  # The slot moves over; in_flight is unchanged
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - start)
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware admitting requests to ``controllers`` (path -> pool)
+    before their body is read. The slot is held until the response,
+    including a streamed one, has been sent. Rejections are ``503`` with
+    a ``Retry-After`` header.
+    """
+
+    def __init__(self, app, controllers: Dict[str, AdmissionController]):
+        self.app = app
+        self.controllers = controllers
+
+    async def __call__(self, scope, receive, send):
+        controller = self.controllers.get(scope["path"]) if scope["type"] == "http" else None
+        if controller is None or scope.get("method") != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with controller.slot():
+                await self.app(scope, receive, send)
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected {scope['path']}: {e}")
+            response = JSONResponse(status_code=503, content={"detail": str(e)},
+                                    headers={"Retry-After": str(e.retry_after)})
+            await response(scope, receive, send)
+
+
+EVALUATION_ADMISSION = AdmissionController("evaluations", MAX_CONCURRENT_EVALUATIONS, MAX_QUEUED_EVALUATIONS)
+RANKING_ADMISSION = AdmissionController("rankings", MAX_CONCURRENT_RANKINGS, MAX_QUEUED_RANKINGS)
+# One LLM call per request; kept apart so it doesn't skew the evaluations' service time
+NARRATIVE_ADMISSION = AdmissionController("narratives", MAX_CONCURRENT_NARRATIVES, MAX_QUEUED_NARRATIVES)
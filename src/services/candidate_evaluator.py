@@ -1,139 +1,700 @@
+import os
+import re
 import time
-from typing import List, Dict, Any, Optional
+import asyncio
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple, Union, Callable
 from fastapi import UploadFile
+import numpy as np
 import logging
 
 from .document_parser import DocumentParser
 from .text_chunker import TextChunker
 from .vector_store import VectorStore
-from .llm_service import LLMService
+from .llm_service import (
+    LLMService,
+    ANSWERED_BY,
+    JOB_REQUIREMENTS_PROMPT_VERSION,
+    PROFILE_PROMPT_VERSION,
+    REQUIREMENT_PROMPT_VERSION
+)
+from .metrics import StageTimer
+from .pipeline import PipelineScheduler, Stage
+from .fit_scorer import FitScorer
+from .upload_handler import UploadError
+from .result_cache import RESULT_CACHE, ResultCache, normalize_requirement
+from .result_store import RESULT_STORE
+from .evaluation_budget import BudgetExceeded, EvaluationBudget, MATCH_BATCH_MAX, REQUIREMENT_MERGE_SIMILARITY
+from .prompt_compactor import (
+    RETRIEVAL_CANDIDATES,
+    RETRIEVAL_MAX_CHUNKS,
+    RETRIEVAL_MIN_SIMILARITY,
+    RETRIEVAL_DIVERSITY
+)
+from ..models.request_models import EvaluationOptions
 from ..models.response_models import (
     FitEvaluationResponse, 
     CandidateProfile, 
     RequirementMatch, 
-    ComparisonMatrix
+    ComparisonMatrix,
+    FitNarrative
 )
 
 logger = logging.getLogger(__name__)
 
+DocumentSource = Union[UploadFile, str]
+MANDATORY_HINTS = re.compile(r"\b(must|required|mandatory|essential)\b", re.IGNORECASE)
+EventCallback = Callable[[Tuple[str, Any]], None]
+
 class CandidateEvaluator:
     """Main service for candidate fit evaluation"""
     
-    def __init__(self):
+    def __init__(self, max_parallel_matches: Optional[int] = None):
         self.document_parser = DocumentParser()
         self.text_chunker = TextChunker()
         self.vector_store = VectorStore()
         self.llm_service = LLMService()
+        self.fit_scorer = FitScorer()
+        self.max_parallel_matches = max_parallel_matches or int(os.getenv("MAX_PARALLEL_REQUIREMENT_MATCHES", "5"))
+        self.document_hash = None  # Set once documents are parsed
+    
+    async def parse_documents(self, resume_file: UploadFile, job_description_file: UploadFile,
+                              stage_timer: Optional[StageTimer] = None) -> Tuple[str, str]:
+        """Parse the resume and job description uploads concurrently into plain text"""
+        stage_timer = stage_timer or StageTimer()
+        
+        async def parse(stage: str, file: UploadFile) -> str:
+            with stage_timer.stage(stage):
+                return await self.document_parser.parse_document(file)
+        
+        resume_text, job_description_text = await asyncio.gather(
+            parse("parse_resume", resume_file),
+            parse("parse_job_description", job_description_file)
+        )
+        
+        logger.info("Documents parsed successfully")
+        return resume_text, job_description_text
     
     async def evaluate_fit(self, resume_file: UploadFile, job_description_file: UploadFile, 
-                          candidate_name: Optional[str] = None) -> FitEvaluationResponse:
+                          candidate_name: Optional[str] = None,
+                          options: Optional[EvaluationOptions] = None,
+                          job_id: Optional[str] = None) -> FitEvaluationResponse:
         """Main evaluation method"""
-        start_time = time.time()
-        
         try:
             logger.info(f"Starting evaluation for candidate: {candidate_name or 'Unknown'}")
             
-            # Step 1: Parse documents
-            resume_text = await self.document_parser.parse_document(resume_file)
-            job_description_text = await self.document_parser.parse_document(job_description_file)
+            result = None
+            async for event, payload in self.evaluate_stream(
+                resume_file, job_description_file, candidate_name, options=options, job_id=job_id
+            ):
+                if event == "result":
+                    result = payload
             
-            logger.info("Documents parsed successfully")
+            return result
             
-            # Step 2: Extract candidate profile
-            candidate_profile_dict = await self.llm_service.extract_candidate_profile(resume_text)
+        except UploadError:
+            raise  # Rejected upload, not an evaluation failure
+        except Exception as e:
+            logger.error(f"Error during evaluation: {str(e)}")
+            raise Exception(f"Evaluation failed: {str(e)}")
+    
+    async def evaluate_stream(self, resume: DocumentSource, job_description: DocumentSource,
+                              candidate_name: Optional[str] = None,
+                              start_time: Optional[float] = None,
+                              stage_timer: Optional[StageTimer] = None,
+                              options: Optional[EvaluationOptions] = None,
+                              job_requirements: Optional[List[Dict[str, Any]]] = None,
+                              job_id: Optional[str] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Run the evaluation pipeline, yielding ``(event, payload)`` pairs as
+        stages complete. ``resume`` and ``job_description`` are uploads or
+        already-parsed text. ``job_requirements`` (``{"requirement",
+        "mandatory"}`` dicts) skips requirement extraction, so candidates
+        ranked against one job share one extraction.
+        
+        The result is queued for the result store under ``job_id``
+        (default: a hash of the job description text) and ``candidate_name``.
+        
+        The pipeline is a DAG (see ``_build_pipeline``) so independent stages
+        overlap and events arrive in completion order: ``parsed``,
+        ``profile`` and ``requirements`` (any order), one
+        ``requirement_match`` per requirement, ``summary`` and finally
+        ``result`` carrying the complete FitEvaluationResponse.
+        
+        Stage durations are recorded on ``stage_timer`` (and the /metrics
+        histograms); with ``options.include_timings`` they are also attached
+        to the response together with the critical path and LLM token usage.
+        """
+        options = options or EvaluationOptions()
+        include_timings = options.include_timings
+        self.llm_service.priority = self.vector_store.priority = options.priority
+        start_time = start_time or time.time()
+        stage_timer = stage_timer or StageTimer()
+        events: asyncio.Queue = asyncio.Queue()
+        cache_stats = {"verdict_hits": 0, "verdict_misses": 0, "profile_hits": 0, "profile_misses": 0,
+                       "requirements_hits": 0, "requirements_misses": 0}
+        # Request limits override the EVALUATION_MAX_* defaults
+        budget = EvaluationBudget(**{
+            limit: getattr(options, limit) for limit in ("max_llm_calls", "max_prompt_tokens", "max_seconds")
+            if getattr(options, limit) is not None
+        })
+        # Profile and requirement extraction always run; matching and the summary get what is left
+        budget.set_aside(1 + (job_requirements is None))
+        self.llm_service.budget = budget
+        
+        scheduler = PipelineScheduler(
+            self._build_pipeline(resume, job_description, stage_timer, events.put_nowait, options, cache_stats,
+                                 budget, job_requirements),
+            stage_timer
+        )
+        run = asyncio.create_task(scheduler.run())
+        run.add_done_callback(lambda _: events.put_nowait(None))
+        
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            results = run.result()  # Re-raises the first stage failure
+        finally:
+            if not run.done():
+                run.cancel()
+        
+        matching = results["match_requirements"]
+        requirement_matches: List[RequirementMatch] = matching["matches"]
+        summary = results["summarize"]
+        
+        # Create comparison matrix as a list of dicts
+        comparison_matrix = [
+            {"requirement": match.requirement, "match": match.match, "mandatory": match.mandatory}
+            for match in requirement_matches
+        ]
+        
+        # Calculate processing time
+        processing_time = time.time() - start_time
+        stage_timer.record("total", processing_time)
+        
+        # Create final response
+        response = FitEvaluationResponse(
+            **summary,
+            job_id=job_id or self.document_parser.content_hash(results["parse_job_description"]),
+            candidate_profile=results["extract_profile"],
+            comparison_matrix=comparison_matrix,
+            requirement_matches=requirement_matches,
+            scoring_mode=options.scoring_mode,
+            failed_knockouts=matching["failed_knockouts"],
+            skipped_requirements=matching["skipped"],
+            early_terminated=matching["terminated"],
+            degradations=budget.degradations,
+            processing_time=processing_time,
+            timings=stage_timer.breakdown() if include_timings else None,
+            critical_path=scheduler.critical_path() if include_timings else None,
+            token_usage={**self.llm_service.usage, **self.llm_service.compactor.report()} if include_timings else None,
+            cache_stats=cache_stats if options.use_cache else None
+        )
+        # Written by the store's background thread; the response doesn't wait for it
+        response.evaluation_id = RESULT_STORE.save(
+            response.job_id, self.document_parser.content_hash(results["parse_resume"]), candidate_name,
+            response.dict()
+        )
+        
+        logger.info(f"Evaluation completed in {processing_time:.2f} seconds "
+                    f"(critical path: {' -> '.join(scheduler.critical_path())}; "
+                    f"~{self.llm_service.compactor.total_saved} prompt tokens saved by compaction)")
+        yield "result", response
+    
+    def _build_pipeline(self, resume: DocumentSource, job_description: DocumentSource,
+                        stage_timer: StageTimer, emit: EventCallback,
+                        options: EvaluationOptions, cache_stats: Dict[str, int],
+                        budget: EvaluationBudget,
+                        job_requirements: Optional[List[Dict[str, Any]]] = None) -> List[Stage]:
+        """
+        Express the evaluation as a stage DAG (``options`` controls the
+        knockout-first behaviour of ``match_requirements`` and caching;
+        cache hits and misses are counted into ``cache_stats``; matching and
+        the summary degrade to fit ``budget``):
+        
+            parse_resume -> extract_profile, chunk_resume
+            chunk_resume -> embed_resume
+            parse_job_description -> extract_requirements -> embed_requirements
+            embed_resume + embed_requirements -> match_requirements
+            match_requirements + extract_profile -> summarize
+        
+        Profile extraction and resume embedding therefore run while the job
+        requirements are still being extracted.
+        """
+        async def parse(source: DocumentSource) -> str:
+            if isinstance(source, str):
+                return source
+            return await self.document_parser.parse_document(source)
+        
+        async def parse_resume(deps):
+            return await parse(resume)
+        
+        async def parse_job_description(deps):
+            return await parse(job_description)
+        
+        async def documents_parsed(deps):
+            resume_text = deps["parse_resume"]
+            job_description_text = deps["parse_job_description"]
+            self.document_hash = self.document_parser.content_hash(resume_text, job_description_text)
+            logger.info(f"Documents parsed (hash {self.document_hash})")
+            emit(("parsed", {
+                "resume_characters": len(resume_text),
+                "job_description_characters": len(job_description_text),
+                "document_hash": self.document_hash
+            }))
+        
+        def answered_by(result: Dict[str, Any]) -> str:
+            """Model that produced a fresh LLM result (a fallback route may have answered)"""
+            return result.pop(ANSWERED_BY, None) or self.llm_service.groq_model
+        
+        async def extract_profile(deps):
+            resume_text = deps["parse_resume"]
+            resume_hash = self.document_parser.content_hash(resume_text)
+            cache_key = ResultCache.key("profile", resume_hash, self.llm_service.groq_model, PROFILE_PROMPT_VERSION)
+            candidate_profile_dict = RESULT_CACHE.get(cache_key) if options.use_cache else None
+            cache_stats["profile_misses" if candidate_profile_dict is None else "profile_hits"] += 1
+            if candidate_profile_dict is not None:
+                budget.set_aside(-1)  # No extraction call needed
+            if candidate_profile_dict is None:
+                candidate_profile_dict = await self.llm_service.extract_candidate_profile(resume_text)
+                if not isinstance(candidate_profile_dict, dict):
+                    raise Exception(f"Failed to extract candidate profile: {candidate_profile_dict}")
+                RESULT_CACHE.set(ResultCache.key("profile", resume_hash, answered_by(candidate_profile_dict),
+                                                 PROFILE_PROMPT_VERSION), candidate_profile_dict)
             candidate_profile = CandidateProfile(**candidate_profile_dict)
-            
             logger.info("Candidate profile extracted")
-            
-            # Step 3: Extract job requirements
-            job_requirements_dict = await self.llm_service.extract_job_requirements(job_description_text)
-            if (
-                isinstance(job_requirements_dict, dict)
-                and 'requirements' in job_requirements_dict
-                and isinstance(job_requirements_dict['requirements'], list)
-                and len(job_requirements_dict['requirements']) > 0
-            ):
-                job_requirements = job_requirements_dict['requirements']
-            else:
-                job_requirements = job_requirements_dict
-
-            if not isinstance(job_requirements, list) or len(job_requirements) == 0:
-                logger.warning(f"Empty or invalid job requirements provided: {job_requirements}")
+            emit(("profile", candidate_profile))
+            return candidate_profile
+        
+        async def extract_requirements(deps):
+            if job_requirements is not None:
+                requirements = job_requirements
             else:
-                logger.info(f"Extracted {len(job_requirements)} job requirements")
-            
-            # Step 4: Chunk resume text
-            resume_chunks = self.text_chunker.chunk_text(resume_text)
-            
-            # Step 5: Add to vector store
-            self.vector_store.clear_collections()  # Clear previous data
-            self.vector_store.add_resume_chunks(resume_chunks)
-            self.vector_store.add_job_requirements(job_requirements)
-            
-            logger.info("Documents added to vector store")
-            
-            # Step 6: Evaluate each requirement
-            requirement_matches = []
-            for requirement in job_requirements:
-                # Find relevant resume chunks for this requirement
-                similar_chunks = self.vector_store.find_similar_chunks(requirement, n_results=3)
-                resume_chunks_for_requirement = [chunk['document'] for chunk in similar_chunks]
-                
-                # Evaluate the match
-                match_result = await self.llm_service.evaluate_requirement_match(
-                    requirement, resume_chunks_for_requirement
-                )
-                
+                # Memoised like profiles, so every candidate scored against a job sees the same requirement texts
+                job_hash = self.document_parser.content_hash(deps["parse_job_description"])
+                cache_key = ResultCache.key("requirements", job_hash, self.llm_service.groq_model,
+                                            JOB_REQUIREMENTS_PROMPT_VERSION)
+                requirements = RESULT_CACHE.get(cache_key) if options.use_cache else None
+                cache_stats["requirements_misses" if requirements is None else "requirements_hits"] += 1
+                if requirements is not None:
+                    budget.set_aside(-1)  # No extraction call needed
+                else:
+                    job_requirements_dict = await self.llm_service.extract_job_requirements(
+                        deps["parse_job_description"]
+                    )
+                    model = answered_by(job_requirements_dict) if isinstance(job_requirements_dict, dict) else None
+                    requirements = self._normalize_requirements(job_requirements_dict)
+                    if requirements:
+                        RESULT_CACHE.set(ResultCache.key("requirements", job_hash, model,
+                                                         JOB_REQUIREMENTS_PROMPT_VERSION), requirements)
+            emit(("requirements", {
+                "requirements": [requirement["requirement"] for requirement in requirements],
+                "mandatory": [requirement["mandatory"] for requirement in requirements]
+            }))
+            return requirements
+        
+        async def chunk_resume(deps):
+            return self.text_chunker.chunk_text(deps["parse_resume"])
+        
+        async def embed_resume(deps):
+            chunks = deps["chunk_resume"]
+            if not chunks:
+                logger.warning("Empty resume chunks provided")
+                return
+            embeddings = await self.vector_store.aembed_texts(chunks, "resume_chunks")
+            self.vector_store.add_embeddings(chunks, embeddings, "resume")
+        
+        async def embed_requirements(deps):
+            texts = [requirement["requirement"] for requirement in deps["extract_requirements"]]
+            if not texts:
+                return []
+            embeddings = await self.vector_store.aembed_texts(texts, "job_requirements")
+            self.vector_store.add_embeddings(texts, embeddings, "job")
+            return embeddings
+        
+        async def match_requirements(deps):
+            requirements = deps["extract_requirements"]
+            requirement_embeddings = deps["embed_requirements"]
+            semaphore = asyncio.Semaphore(self.max_parallel_matches)
+            knocked_out = asyncio.Event()
+            matches: Dict[int, RequirementMatch] = {}
+            over_token_budget: List[int] = []
+            
+            resume_hash = self.document_parser.content_hash(deps["parse_resume"])
+            # Retrieval settings shape the prompt context, so they are part of the version
+            verdict_version = (f"{REQUIREMENT_PROMPT_VERSION}:{RETRIEVAL_CANDIDATES}:{RETRIEVAL_MAX_CHUNKS}:"
+                               f"{RETRIEVAL_MIN_SIMILARITY}:{RETRIEVAL_DIVERSITY}")
+            
+            def cache_key(index: int, batched: bool = False, model: Optional[str] = None) -> str:
+                # Batched verdicts come from a different prompt, so they are kept apart from single ones
+                return ResultCache.key("verdict", normalize_requirement(requirements[index]["requirement"]),
+                                       resume_hash, model or self.llm_service.groq_model,
+                                       verdict_version + (":batch" if batched else ""))
+            
+            def record(index: int, match_result: Dict[str, Any], cached: bool):
                 requirement_match = RequirementMatch(
-                    requirement=requirement,
+                    requirement=requirements[index]["requirement"],
                     match=match_result.get('match', False),
                     confidence=match_result.get('confidence', 0.0),
-                    explanation=match_result.get('explanation', 'No explanation available')
+                    explanation=match_result.get('explanation', 'No explanation available'),
+                    mandatory=requirements[index]["mandatory"],
+                    cached=cached
                 )
-                requirement_matches.append(requirement_match)
+                matches[index] = requirement_match
+                if options.early_exit and self._is_failed_knockout(requirement_match, options):
+                    knocked_out.set()
+                emit(("requirement_match", {"index": index, "total": len(requirements), "match": requirement_match}))
             
-            logger.info("Requirement matches evaluated")
+            def retrieve(index: int) -> List[str]:
+                """Relevant, non-redundant resume chunks for one requirement"""
+                text = requirements[index]["requirement"]
+                with stage_timer.stage("retrieve_chunks"):
+                    candidates = self.vector_store.find_similar_chunks(
+                        text, n_results=RETRIEVAL_CANDIDATES, query_embedding=requirement_embeddings[index]
+                    )
+                    selected = self.vector_store.select_diverse(
+                        requirement_embeddings[index], candidates,
+                        max_results=RETRIEVAL_MAX_CHUNKS,
+                        min_similarity=RETRIEVAL_MIN_SIMILARITY,
+                        diversity=RETRIEVAL_DIVERSITY
+                    )
+                return self.llm_service.compactor.context(
+                    "evaluate_requirement",
+                    baseline=[chunk['document'] for chunk in candidates[:3]],
+                    selected=[(chunk['id'], chunk['document']) for chunk in selected]
+                )
             
-            # Step 7: Generate overall evaluation
-            evaluation_result = await self.llm_service.generate_fit_evaluation(
-                job_requirements, 
-                [match.dict() for match in requirement_matches], 
-                candidate_profile_dict
-            )
+            async def match_group(group: List[int]):
+                # Don't spend further LLM calls once a knockout has failed
+                if knocked_out.is_set():
+                    return
+                async with semaphore:
+                    if knocked_out.is_set():
+                        return
+                    model = None
+                    if len(group) == 1:
+                        text = requirements[group[0]]["requirement"]
+                        result = await self.llm_service.evaluate_requirement_match(text, retrieve(group[0]))
+                        if isinstance(result, dict):
+                            model = answered_by(result)
+                        results = [result] if isinstance(result, dict) else result
+                    else:
+                        result = await self.llm_service.evaluate_requirements_batch([
+                            {"requirement": requirements[index]["requirement"], "resume_chunks": retrieve(index)}
+                            for index in group
+                        ])
+                        if isinstance(result, dict):
+                            model = answered_by(result)
+                        results = self._unpack_batch(result, len(group)) if isinstance(result, dict) else result
+                if isinstance(results, BudgetExceeded):
+                    over_token_budget.extend(group)
+                    return
+                if not isinstance(results, list):
+                    raise Exception(f"Failed to evaluate requirement(s) "
+                                    f"{'; '.join(requirements[index]['requirement'] for index in group)}: {results}")
+                for index, match_result in zip(group, results):
+                    RESULT_CACHE.set(cache_key(index, batched=len(group) > 1, model=model), match_result)
+                    record(index, match_result, cached=False)
             
-            # Step 8: Calculate overall match percentage
-            matched_requirements = sum(1 for match in requirement_matches if match.match)
-            total_requirements = len(requirement_matches)
-            overall_match_percentage = (matched_requirements / total_requirements * 100) if total_requirements > 0 else 0
+            def cached_verdict(index: int) -> Optional[Dict[str, Any]]:
+                """The memoised single-requirement verdict, else one from a batched call"""
+                if not options.use_cache:
+                    return None
+                match_result = RESULT_CACHE.get(cache_key(index))
+                return match_result if match_result is not None else RESULT_CACHE.get(cache_key(index, batched=True))
             
-            # Step 9: Create comparison matrix as a list of dicts
-            comparison_matrix = [
-                {"requirement": match.requirement, "match": match.match}
-                for match in requirement_matches
-            ]
+            # Memoised verdicts cost nothing; only the rest is planned against the budget
+            pending = []
+            for index in range(len(requirements)):
+                match_result = cached_verdict(index)
+                cache_stats["verdict_hits" if match_result is not None else "verdict_misses"] += 1
+                if match_result is None:
+                    pending.append(index)
+                elif not knocked_out.is_set() or requirements[index]["mandatory"]:
+                    record(index, match_result, cached=True)
+            
+            groups, merged = self._plan_matching(pending, requirements, requirement_embeddings, options, budget)
+            
+            # Knockout-first: must-haves are evaluated before nice-to-haves
+            for phase_mandatory in (True, False):
+                phase = [group for group in groups if requirements[group[0]]["mandatory"] == phase_mandatory]
+                if knocked_out.is_set() or not phase:
+                    continue
+                try:
+                    await asyncio.wait_for(asyncio.gather(*(match_group(group) for group in phase)),
+                                           timeout=budget.remaining_seconds)
+                except asyncio.TimeoutError:
+                    budget.degrade(f"Stopped matching requirements at the {budget.max_seconds:g}s time budget")
+                    break
             
-            # Step 10: Calculate processing time
-            processing_time = time.time() - start_time
-            
-            # Step 11: Create final response
-            response = FitEvaluationResponse(
-                fit_score=evaluation_result.get('fit_score', 'Unknown'),
-                fit_percentage=evaluation_result.get('fit_percentage', overall_match_percentage),
-                candidate_profile=candidate_profile,
-                comparison_matrix=comparison_matrix,
-                explanation=evaluation_result.get('explanation', 'Evaluation completed'),
-                strengths=evaluation_result.get('strengths', []),
-                weaknesses=evaluation_result.get('weaknesses', []),
-                recommendations=evaluation_result.get('recommendations', []),
-                processing_time=processing_time
+            if over_token_budget:
+                budget.degrade(f"Dropped {len(over_token_budget)} requirement(s) over the "
+                               f"{budget.max_prompt_tokens} prompt token budget")
+            # Near-duplicates share the verdict of the requirement they were merged into
+            for duplicate, kept in merged.items():
+                if kept in matches:
+                    record(duplicate, matches[kept].dict(), cached=matches[kept].cached)
+            
+            ordered_matches = [matches[index] for index in sorted(matches)]
+            failed_knockouts = [
+                match.requirement for match in ordered_matches if self._is_failed_knockout(match, options)
+            ]
+            unevaluated = [r for i, r in enumerate(requirements) if i not in matches]
+            skipped = [r["requirement"] for r in unevaluated]
+            if knocked_out.is_set():
+                logger.info(f"Knockout failed ({'; '.join(failed_knockouts)}); "
+                            f"skipped {len(skipped)} remaining requirements")
+            else:
+                logger.info("Requirement matches evaluated")
+            return {
+                "matches": ordered_matches,
+                "failed_knockouts": failed_knockouts,
+                "skipped": skipped,
+                "skipped_mandatory": [r["mandatory"] for r in unevaluated],  # Parallel to "skipped"
+                "terminated": knocked_out.is_set()
+            }
+        
+        def score_locally(matching: Dict[str, Any]) -> Dict[str, Any]:
+            # Requirements that were never evaluated count as unmet
+            return self.fit_scorer.score(
+                matching["matches"], matching["failed_knockouts"],
+                unevaluated=len(matching["skipped"]), unevaluated_mandatory=sum(matching["skipped_mandatory"])
+            )
+        
+        async def llm_summary(matching: Dict[str, Any],
+                              candidate_profile: CandidateProfile) -> Optional[Dict[str, Any]]:
+            """The LLM fit evaluation, or None when the budget has no room for it"""
+            if not budget.llm_summary:
+                return None  # Given up while planning; already reported
+            if budget.expired:
+                budget.degrade("Skipped the LLM summary: time budget exhausted")
+                return None
+            requirement_matches = matching["matches"]
+            # Dropped requirements are shown as unmet so they still weigh on the verdict
+            unevaluated = [
+                {"match": False, "mandatory": mandatory, "explanation": "Not evaluated"}
+                for mandatory in matching["skipped_mandatory"]
+            ]
+            evaluation_result = await self.llm_service.generate_fit_evaluation(
+                [match.requirement for match in requirement_matches] + matching["skipped"],
+                [match.dict() for match in requirement_matches] + unevaluated,
+                candidate_profile.dict()
             )
+            if isinstance(evaluation_result, BudgetExceeded):
+                budget.degrade(f"Skipped the LLM summary: {evaluation_result}")
+                return None
+            if not isinstance(evaluation_result, dict):
+                raise Exception(f"Failed to generate fit evaluation: {evaluation_result}")
+            return evaluation_result
+        
+        async def summarize(deps):
+            matching = deps["match_requirements"]
+            requirement_matches = matching["matches"]
             
-            logger.info(f"Evaluation completed in {processing_time:.2f} seconds")
-            return response
+            if matching["terminated"]:
+                # Early exit: no summary LLM call for a candidate who failed a must-have
+                evaluation_result = score_locally(matching)
+                evaluation_result['explanation'] = (
+                    "Evaluation stopped early: the candidate does not meet mandatory "
+                    f"requirement(s): {'; '.join(matching['failed_knockouts'])}."
+                )
+            elif options.scoring_mode == "local":
+                evaluation_result = score_locally(matching)
+                if options.include_narrative:
+                    narrative = await llm_summary(matching, deps["extract_profile"])
+                    if narrative:
+                        evaluation_result['explanation'] = narrative.get('explanation', evaluation_result['explanation'])
+                        evaluation_result['recommendations'] = narrative.get('recommendations', [])
+            else:
+                evaluation_result = await llm_summary(matching, deps["extract_profile"])
+                if evaluation_result is None:
+                    # Degraded: deterministic scoring instead of the summary call
+                    evaluation_result = score_locally(matching)
             
-        except Exception as e:
-            logger.error(f"Error during evaluation: {str(e)}")
-            raise Exception(f"Evaluation failed: {str(e)}")
+            # Fallback percentage (skipped requirements count as unmet)
+            matched_requirements = sum(1 for match in requirement_matches if match.match)
+            total_requirements = len(requirement_matches) + len(matching["skipped"])
+            overall_match_percentage = (matched_requirements / total_requirements * 100) if total_requirements > 0 else 0
+            
+            summary = {
+                "fit_score": evaluation_result.get('fit_score', 'Unknown'),
+                "fit_percentage": evaluation_result.get('fit_percentage', overall_match_percentage),
+                "explanation": evaluation_result.get('explanation', 'Evaluation completed'),
+                "strengths": evaluation_result.get('strengths', []),
+                "weaknesses": evaluation_result.get('weaknesses', []),
+                "recommendations": evaluation_result.get('recommendations', [])
+            }
+            emit(("summary", summary))
+            return summary
+        
+        # Each evaluation starts from an empty store
+        self.vector_store.clear_collections()
+        
+        return [
+            Stage("parse_resume", parse_resume),
+            Stage("parse_job_description", parse_job_description),
+            Stage("documents_parsed", documents_parsed, ("parse_resume", "parse_job_description")),
+            Stage("extract_profile", extract_profile, ("parse_resume",)),
+            Stage("extract_requirements", extract_requirements, ("parse_job_description",)),
+            Stage("chunk_resume", chunk_resume, ("parse_resume",)),
+            Stage("embed_resume", embed_resume, ("chunk_resume",)),
+            Stage("embed_requirements", embed_requirements, ("extract_requirements",)),
+            Stage("match_requirements", match_requirements,
+                  ("parse_resume", "extract_requirements", "embed_requirements", "embed_resume")),
+            Stage("summarize", summarize, ("match_requirements", "extract_profile")),
+        ]
+    
+    async def generate_narrative(self, candidate_profile: CandidateProfile,
+                                 requirement_matches: List[RequirementMatch]) -> FitNarrative:
+        """Ask the LLM for the written explanation of already-scored matches"""
+        evaluation_result = await self.llm_service.generate_fit_evaluation(
+            [match.requirement for match in requirement_matches],
+            [match.dict() for match in requirement_matches],
+            candidate_profile.dict()
+        )
+        if not isinstance(evaluation_result, dict):
+            raise Exception(f"Failed to generate fit narrative: {evaluation_result}")
+        return FitNarrative(
+            explanation=evaluation_result.get('explanation', 'Evaluation completed'),
+            strengths=evaluation_result.get('strengths', []),
+            weaknesses=evaluation_result.get('weaknesses', []),
+            recommendations=evaluation_result.get('recommendations', [])
+        )
+    
+    def _plan_matching(self, pending: List[int], requirements: List[Dict[str, Any]],
+                       requirement_embeddings: Any, options: EvaluationOptions,
+                       budget: EvaluationBudget) -> Tuple[List[List[int]], Dict[int, int]]:
+        """
+        Group the uncached requirement indexes ``pending`` into LLM calls
+        that fit the remaining call budget. Returns the groups (mandatory
+        first) and a ``{duplicate: kept}`` map of merged requirements.
+        
+        Degrades one step at a time until the plan fits: local scoring
+        instead of the summary call, merging near-duplicate requirements,
+        batching several requirements per call (up to MATCH_BATCH_MAX), and
+        finally dropping trailing nice-to-haves, then must-haves.
+        """
+        pending = sorted(pending, key=lambda index: not requirements[index]["mandatory"])
+        groups = [[index] for index in pending]
+        merged: Dict[int, int] = {}
+        available = budget.remaining_calls
+        if available is None or not pending:
+            return groups, merged
+        
+        summary_calls = 1 if options.scoring_mode == "llm" or options.include_narrative else 0
+        if summary_calls and len(groups) + summary_calls > available:
+            budget.llm_summary = False
+            budget.degrade(f"Scored locally instead of the LLM summary to stay within "
+                           f"{budget.max_llm_calls} LLM calls")
+            summary_calls = 0
+        available -= summary_calls
+        if len(groups) <= available:
+            return groups, merged
+        if available == 0:
+            dropped_mandatory = sum(requirements[index]["mandatory"] for index in pending)
+            budget.degrade(f"Skipped {len(pending)} requirement(s) ({dropped_mandatory} mandatory): extraction "
+                           f"used the {budget.max_llm_calls} LLM call budget")
+            return [], merged
+        
+        # Near-duplicates ("Python", "Python programming") keep the first, must-haves first
+        vectors = np.asarray([requirement_embeddings[index] for index in pending], dtype='float32')
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        similarities = vectors @ vectors.T
+        kept_positions: List[int] = []
+        for position, index in enumerate(pending):
+            duplicate_of = next((kept for kept in kept_positions
+                                 if similarities[position, kept] >= REQUIREMENT_MERGE_SIMILARITY), None)
+            if duplicate_of is None:
+                kept_positions.append(position)
+            else:
+                merged[index] = pending[duplicate_of]
+        kept = [pending[position] for position in kept_positions]
+        if merged:
+            budget.degrade(f"Merged {len(merged)} near-duplicate requirement(s) into the requirement they repeat")
+        
+        mandatory = [index for index in kept if requirements[index]["mandatory"]]
+        optional = [index for index in kept if not requirements[index]["mandatory"]]
+        
+        def batched(size: int, parts: Tuple[List[int], ...]) -> List[List[int]]:
+            return [part[start:start + size] for part in parts for start in range(0, len(part), size)]
+        
+        # Must-haves and nice-to-haves get separate calls so knockouts still run first,
+        # unless only shared calls fit
+        for parts in ((mandatory, optional), (mandatory + optional,)):
+            size = 1
+            while len(batched(size, parts)) > available and size < MATCH_BATCH_MAX:
+                size += 1
+            groups = batched(size, parts)
+            if len(groups) <= available:
+                break
+        largest = max(len(group) for group in groups)
+        if largest > 1:
+            budget.degrade(f"Evaluated up to {largest} requirements per LLM call")
+        
+        if len(groups) > available:
+            dropped = [index for group in groups[available:] for index in group]
+            groups = groups[:available]
+            dropped_mandatory = sum(requirements[index]["mandatory"] for index in dropped)
+            budget.degrade(f"Skipped {len(dropped)} requirement(s) ({dropped_mandatory} mandatory) "
+                           f"beyond the {budget.max_llm_calls} LLM call budget")
+        return groups, merged
+    
+    @staticmethod
+    def _unpack_batch(result: Dict[str, Any], count: int) -> Union[List[Dict[str, Any]], Exception]:
+        """Per-requirement verdicts of a batched evaluation, in request order"""
+        evaluations = result.get('evaluations')
+        if not isinstance(evaluations, list) or len(evaluations) != count:
+            return Exception(f"expected {count} evaluations, got {result}")
+        # Prefer the numbers the model echoed back; fall back to position
+        by_number = {evaluation.get('requirement'): evaluation for evaluation in evaluations
+                     if isinstance(evaluation, dict)}
+        if sorted(by_number, key=str) == sorted(range(1, count + 1), key=str):
+            return [by_number[number] for number in range(1, count + 1)]
+        return evaluations
+    
+    @staticmethod
+    def _is_failed_knockout(match: RequirementMatch, options: EvaluationOptions) -> bool:
+        """A must-have the candidate confidently does not meet"""
+        return match.mandatory and not match.match and match.confidence >= options.knockout_confidence
+    
+    @staticmethod
+    def _normalize_requirements(job_requirements_dict: Any) -> List[Dict[str, Any]]:
+        """
+        Unwrap the LLM's ``{"requirements": [...]}`` payload into
+        ``{"requirement": str, "mandatory": bool}`` dicts. Plain strings are
+        accepted too and classified by wording ("must", "required", ...).
+        """
+        if (
+            isinstance(job_requirements_dict, dict)
+            and 'requirements' in job_requirements_dict
+            and isinstance(job_requirements_dict['requirements'], list)
+            and len(job_requirements_dict['requirements']) > 0
+        ):
+            job_requirements = job_requirements_dict['requirements']
+        else:
+            job_requirements = job_requirements_dict
+        
+        if isinstance(job_requirements, (str, Exception)):
+            raise Exception(f"Failed to extract job requirements: {job_requirements}")
+        if not isinstance(job_requirements, list) or len(job_requirements) == 0:
+            logger.warning(f"Empty or invalid job requirements provided: {job_requirements}")
+            return []
+        
+        normalized = []
+        for requirement in job_requirements:
+            if isinstance(requirement, dict):
+                text = str(requirement.get('requirement') or requirement.get('text') or '').strip()
+                mandatory = requirement.get('mandatory')
+            else:
+                text, mandatory = str(requirement).strip(), None
+            if not text:
+                continue
+            if not isinstance(mandatory, bool):
+                mandatory = bool(MANDATORY_HINTS.search(text))
+            normalized.append({"requirement": text, "mandatory": mandatory})
+        
+        logger.info(f"Extracted {len(normalized)} job requirements "
+                    f"({sum(r['mandatory'] for r in normalized)} mandatory)")
+        return normalized
     
     async def get_evaluation_summary(self, evaluation: FitEvaluationResponse) -> Dict[str, Any]:
         """Get a summary of the evaluation results"""
@@ -0,0 +1,233 @@
+import os
+import time
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .candidate_evaluator import CandidateEvaluator, DocumentSource
+from .document_parser import DocumentParser
+from .text_chunker import TextChunker
+from .vector_store import VectorStore
+from .llm_service import LLMService
+from .metrics import StageTimer
+from .fit_scorer import FitScorer
+from ..models.request_models import EvaluationOptions
+from ..models.response_models import RankedCandidate, RankingResponse
+
+logger = logging.getLogger(__name__)
+
+CASCADE_TOP_K = int(os.getenv("CASCADE_TOP_K", "10"))
+CASCADE_PARALLEL_EVALUATIONS = int(os.getenv("CASCADE_PARALLEL_EVALUATIONS", "4"))
+CASCADE_PARALLEL_PARSES = int(os.getenv("CASCADE_PARALLEL_PARSES", "8"))
+CASCADE_EMBEDDING_BATCH = int(os.getenv("CASCADE_EMBEDDING_BATCH", "256"))  # Inputs per embeddings request
+# Best-chunk similarity mapped to coverage: none at or below the floor, full at or above the ceiling
+CASCADE_SIMILARITY_FLOOR = float(os.getenv("CASCADE_SIMILARITY_FLOOR", "0.2"))
+CASCADE_SIMILARITY_CEILING = float(os.getenv("CASCADE_SIMILARITY_CEILING", "0.6"))
+
+
+def requirement_coverage(requirement_embeddings: np.ndarray, chunk_embeddings: np.ndarray,
+                         chunk_counts: Sequence[int], floor: float = CASCADE_SIMILARITY_FLOOR,
+                         ceiling: float = CASCADE_SIMILARITY_CEILING) -> np.ndarray:
+    """
+    (applicants, requirements) matrix of how well each resume covers each
+    requirement: the best chunk similarity rescaled to 0..1 between
+    ``floor`` and ``ceiling``. One matrix product over the whole pool;
+    ``chunk_embeddings`` holds each applicant's chunks contiguously,
+    ``chunk_counts[i]`` of them.
+    """
+    counts = np.asarray(chunk_counts, dtype=np.int64)
+    coverage = np.zeros((len(counts), len(requirement_embeddings)), dtype='float32')
+    has_chunks = counts > 0
+    if not has_chunks.any() or not len(requirement_embeddings):
+        return coverage
+
+    similarities = chunk_embeddings @ requirement_embeddings.T  # (chunks, requirements)
+    starts = (np.cumsum(counts) - counts)[has_chunks]
+    best = np.maximum.reduceat(similarities, starts, axis=0)  # Max over each applicant's chunks
+    coverage[has_chunks] = np.clip((best - floor) / (ceiling - floor), 0.0, 1.0)
+    return coverage
+
+
+class CascadeRanker:
+    """
+    Two-stage ranking of many applicants against one job description.
+
+    Stage 1 scores every resume from embedding coverage of the job
+    requirements: requirements are extracted once, every resume is chunked
+    and embedded in batches, and coverage is computed for the whole pool at
+    once (see ``requirement_coverage``). No LLM calls per applicant.
+
+    Stage 2 runs the full evaluation pipeline only for the ``top_k`` best
+    covered applicants, reusing the extracted requirements. The LLM bill
+    therefore depends on ``top_k``, not on the number of applicants.
+    """
+
+    def __init__(self, top_k: int = CASCADE_TOP_K,
+                 max_parallel_evaluations: int = CASCADE_PARALLEL_EVALUATIONS,
+                 floor: float = CASCADE_SIMILARITY_FLOOR,
+                 ceiling: float = CASCADE_SIMILARITY_CEILING):
+        self.top_k = top_k
+        self.max_parallel_evaluations = max_parallel_evaluations
+        self.floor = floor
+        self.ceiling = ceiling
+        self.document_parser = DocumentParser()
+        self.text_chunker = TextChunker()
+        self.vector_store = VectorStore()
+        self.llm_service = LLMService()
+        # Same must-have / nice-to-have weighting as the local fit score
+        self.fit_scorer = FitScorer()
+
+    async def rank(self, resumes: Sequence[Tuple[str, DocumentSource]], job_description: DocumentSource,
+                   top_k: Optional[int] = None, options: Optional[EvaluationOptions] = None,
+                   job_id: Optional[str] = None) -> RankingResponse:
+        """
+        Rank ``(name, resume)`` pairs (uploads or parsed text). Resumes that
+        fail to parse are listed last with their error. ``options`` apply to
+        the full evaluations, which always queue at batch priority and are
+        stored under ``job_id`` (default: a hash of the job description).
+        """
+        start_time = time.time()
+        top_k = self.top_k if top_k is None else top_k
+        options = (options or EvaluationOptions()).copy(update={"priority": "batch"})
+        self.llm_service.priority = self.vector_store.priority = options.priority
+        stage_timer = StageTimer()
+
+        with stage_timer.stage("rank_parse"):
+            job_description_text, resume_texts, errors = await self._parse_all(resumes, job_description)
+        job_id = job_id or self.document_parser.content_hash(job_description_text)
+
+        with stage_timer.stage("rank_extract_requirements"):
+            requirements = CandidateEvaluator._normalize_requirements(
+                await self.llm_service.extract_job_requirements(job_description_text)
+            )
+        if not requirements:
+            raise Exception("No job requirements could be extracted from the job description")
+
+        with stage_timer.stage("rank_prefilter"):
+            coverage = await self._coverage(requirements, resume_texts)
+            weights = np.array([self.fit_scorer.mandatory_weight if r["mandatory"] else self.fit_scorer.optional_weight
+                                for r in requirements], dtype='float32')
+            scores = coverage @ weights / weights.sum() * 100
+
+        parsed = [i for i, text in enumerate(resume_texts) if text is not None]
+        shortlist = sorted(parsed, key=lambda i: -scores[i])[:max(0, top_k)]
+
+        with stage_timer.stage("rank_evaluate_shortlist"):
+            evaluations, llm_calls = await self._evaluate_shortlist(
+                shortlist, resumes, resume_texts, job_description_text, requirements, options, errors, job_id
+            )
+
+        candidates = []
+        for i, (name, _) in enumerate(resumes):
+            evaluation = evaluations.get(i)
+            if resume_texts[i] is None:
+                stage = "failed"
+            else:
+                # A shortlisted resume whose evaluation failed keeps its coverage rank
+                stage = "evaluated" if evaluation is not None else "prefilter"
+            candidates.append(RankedCandidate(
+                name=name,
+                rank=0,
+                stage=stage,
+                coverage_score=round(float(scores[i]), 2),
+                requirement_coverage=[round(float(value), 3) for value in coverage[i]],
+                fit_score=evaluation.fit_score if evaluation else None,
+                fit_percentage=evaluation.fit_percentage if evaluation else None,
+                evaluation=evaluation,
+                error=errors.get(i)
+            ))
+
+        # Evaluated shortlist by fit, then the rest by coverage, failures last
+        stage_order = {"evaluated": 0, "prefilter": 1, "failed": 2}
+        candidates.sort(key=lambda c: (stage_order[c.stage], -(c.fit_percentage or 0.0), -c.coverage_score))
+        for rank, candidate in enumerate(candidates, 1):
+            candidate.rank = rank
+
+        processing_time = time.time() - start_time
+        stage_timer.record("rank_total", processing_time)
+        logger.info(f"Ranked {len(resumes)} candidates in {processing_time:.2f} seconds "
+                    f"({len(evaluations)} fully evaluated, {llm_calls} LLM calls)")
+        return RankingResponse(
+            job_id=job_id,
+            requirements=[r["requirement"] for r in requirements],
+            mandatory=[r["mandatory"] for r in requirements],
+            candidates=candidates,
+            total_candidates=len(resumes),
+            shortlist_size=len(evaluations),
+            processing_time=processing_time,
+            llm_calls=llm_calls,
+            timings=stage_timer.breakdown() if options.include_timings else None
+        )
+
+    async def _parse_all(self, resumes: Sequence[Tuple[str, DocumentSource]], job_description: DocumentSource
+                         ) -> Tuple[str, List[Optional[str]], Dict[int, str]]:
+        """Parse the job description and every resume; unparseable resumes are recorded in errors"""
+        semaphore = asyncio.Semaphore(CASCADE_PARALLEL_PARSES)
+        errors: Dict[int, str] = {}
+
+        async def parse(source: DocumentSource) -> str:
+            if isinstance(source, str):
+                return source
+            async with semaphore:
+                return await self.document_parser.parse_document(source)
+
+        async def parse_resume(index: int, source: DocumentSource) -> Optional[str]:
+            try:
+                return await parse(source)
+            except Exception as e:
+                logger.warning(f"Could not parse resume {resumes[index][0]}: {str(e)}")
+                errors[index] = f"Parsing failed: {str(e)}"
+                return None
+
+        job_description_text, *resume_texts = await asyncio.gather(
+            parse(job_description),
+            *(parse_resume(i, source) for i, (_, source) in enumerate(resumes))
+        )
+        return job_description_text, resume_texts, errors
+
+    async def _coverage(self, requirements: List[Dict[str, Any]], resume_texts: List[Optional[str]]) -> np.ndarray:
+        """Embed the requirements and all resume chunks in batches, then score coverage for the pool"""
+        chunks_per_resume = [self.text_chunker.chunk_text(text) if text else [] for text in resume_texts]
+        all_chunks = [chunk for chunks in chunks_per_resume for chunk in chunks]
+        batches = [all_chunks[i:i + CASCADE_EMBEDDING_BATCH]
+                   for i in range(0, len(all_chunks), CASCADE_EMBEDDING_BATCH)]
+
+        requirement_embeddings, *chunk_batches = await asyncio.gather(
+            self.vector_store.aembed_texts([r["requirement"] for r in requirements], "job_requirements"),
+            *(self.vector_store.aembed_texts(batch, "cascade_chunks") for batch in batches)
+        )
+        chunk_embeddings = (np.vstack(chunk_batches) if chunk_batches
+                            else np.zeros((0, self.vector_store.dimension), dtype='float32'))
+        return requirement_coverage(requirement_embeddings, chunk_embeddings,
+                                    [len(chunks) for chunks in chunks_per_resume], self.floor, self.ceiling)
+
+    async def _evaluate_shortlist(self, shortlist: List[int], resumes: Sequence[Tuple[str, DocumentSource]],
+                                  resume_texts: List[Optional[str]], job_description_text: str,
+                                  requirements: List[Dict[str, Any]], options: EvaluationOptions,
+                                  errors: Dict[int, str], job_id: str) -> Tuple[Dict[int, Any], int]:
+        """Full evaluation of the shortlisted resumes; failures are recorded in errors"""
+        semaphore = asyncio.Semaphore(self.max_parallel_evaluations)
+        evaluations: Dict[int, Any] = {}
+        evaluators = {index: CandidateEvaluator() for index in shortlist}
+
+        async def evaluate(index: int):
+            name = resumes[index][0]
+            async with semaphore:
+                try:
+                    async for event, payload in evaluators[index].evaluate_stream(
+                        resume_texts[index], job_description_text, name,
+                        options=options, job_requirements=requirements, job_id=job_id
+                    ):
+                        if event == "result":
+                            evaluations[index] = payload
+                except Exception as e:
+                    logger.error(f"Full evaluation failed for {name}: {str(e)}")
+                    errors[index] = f"Evaluation failed: {str(e)}"
+
+        await asyncio.gather(*(evaluate(index) for index in shortlist))
+        llm_calls = self.llm_service.usage["calls"] + sum(
+            evaluator.llm_service.usage["calls"] for evaluator in evaluators.values()
+        )
+        return evaluations, llm_calls
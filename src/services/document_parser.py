@@ -1,63 +1,114 @@
 import pdfplumber
 from docx import Document
 from fastapi import UploadFile
-import io
 import re
-from typing import List, Dict, Any
+import hashlib
+import asyncio
+from typing import List, Dict, Any, BinaryIO
 import logging
 
+from .metrics import DOCUMENT_PARSE_DURATION, DOCUMENT_BYTES, DOCUMENT_PARSE_FALLBACKS
+from .upload_handler import spool_upload
+from .docx_extractor import extract_docx_text
+from .pdf_extractor import PDF_ENGINE, extract_pdf_text, pdfium_available, text_is_usable
+
 logger = logging.getLogger(__name__)
 
 class DocumentParser:
     """Service for parsing PDF and DOCX documents"""
     
     @staticmethod
-    async def parse_pdf(file: UploadFile) -> str:
-        """Parse PDF file and extract text"""
+    async def parse_pdf(file: BinaryIO) -> str:
+        """Parse a PDF file object and extract text"""
         try:
-            content = await file.read()
-            
-            text = ""
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            return DocumentParser._clean_text(text)
+            # Extraction is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(DocumentParser._extract_pdf_text, file)
         except Exception as e:
             logger.error(f"Error parsing PDF: {str(e)}")
             raise Exception(f"Failed to parse PDF: {str(e)}")
     
     @staticmethod
-    async def parse_docx(file: UploadFile) -> str:
-        """Parse DOCX file and extract text"""
+    async def parse_docx(file: BinaryIO) -> str:
+        """Parse a DOCX file object and extract text"""
         try:
-            content = await file.read()
-            doc = Document(io.BytesIO(content))
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
-            
-            return DocumentParser._clean_text(text)
+            return await asyncio.to_thread(DocumentParser._extract_docx_text, file)
         except Exception as e:
             logger.error(f"Error parsing DOCX: {str(e)}")
             raise Exception(f"Failed to parse DOCX: {str(e)}")
     
     @staticmethod
-    async def parse_txt(file: UploadFile) -> str:
-        """Parse plain text file"""
+    def _extract_pdf_text(file: BinaryIO) -> str:
+        """
+        Extract and clean text from a PDF file object with PDFium (see
+        ``extract_pdf_text``); pdfplumber is used if that fails or the text
+        looks unusable, or if PDF_ENGINE=pdfplumber
+        """
+        if PDF_ENGINE == "pdfium" and pdfium_available():
+            try:
+                text, page_count = extract_pdf_text(file)
+                if text_is_usable(text, page_count):
+                    return DocumentParser._clean_text(text)
+                reason = f"too little readable text ({len(text)} characters, {page_count} pages)"
+            except Exception as e:
+                reason = str(e)
+            logger.warning(f"Fast PDF extraction failed, falling back to pdfplumber: {reason}")
+            DOCUMENT_PARSE_FALLBACKS.inc(file_type="pdf")
+            file.seek(0)
+        
+        return DocumentParser._clean_text(DocumentParser._extract_pdf_text_pdfplumber(file))
+    
+    @staticmethod
+    def _extract_pdf_text_pdfplumber(file: BinaryIO) -> str:
+        """Page text through pdfplumber's character-level layout analysis"""
+        text = ""
+        with pdfplumber.open(file) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                if page_text:
+                    text += page_text + "\n"
+                page.close()  # Release the page's cached layout objects
+        
+        return text
+    
+    @staticmethod
+    def _extract_docx_text(file: BinaryIO) -> str:
+        """
+        Extract and clean text from a DOCX file object by streaming its XML
+        (see ``extract_docx_text``); python-docx is only used if that fails
+        """
         try:
-            content = await file.read()
-            text = content.decode('utf-8')
+            text = extract_docx_text(file)
+        except Exception as e:
+            logger.warning(f"Fast DOCX extraction failed, falling back to python-docx: {str(e)}")
+            DOCUMENT_PARSE_FALLBACKS.inc(file_type="docx")
+            file.seek(0)
+            text = DocumentParser._extract_docx_text_python_docx(file)
+        
+        return DocumentParser._clean_text(text)
+    
+    @staticmethod
+    def _extract_docx_text_python_docx(file: BinaryIO) -> str:
+        """Paragraphs, then tables, through the python-docx object model"""
+        doc = Document(file)
+        parts = [paragraph.text + "\n" for paragraph in doc.paragraphs]
+        
+        # Extract text from tables, one line per row; a merged cell appears once per grid position, keep the first
+        for table in doc.tables:
+            seen = set()
+            for row in table.rows:
+                for cell in row.cells:
+                    if cell._tc not in seen:
+                        seen.add(cell._tc)
+                        parts.append(" ".join(paragraph.text for paragraph in cell.paragraphs) + " ")
+                parts.append("\n")
+        
+        return "".join(parts)
+    
+    @staticmethod
+    async def parse_txt(file: BinaryIO) -> str:
+        """Parse a plain text file object"""
+        try:
+            text = (await asyncio.to_thread(file.read)).decode('utf-8')
             return DocumentParser._clean_text(text)
         except Exception as e:
             logger.error(f"Error parsing TXT: {str(e)}")
@@ -65,34 +116,48 @@ class DocumentParser:
     
     @staticmethod
     def _clean_text(text: str) -> str:
-        """Clean and normalize extracted text"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        """
+        Clean and normalize extracted text, keeping line breaks: the
+        chunker finds CV section headings line by line
+        """
+        # Normalize line breaks
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
         
         # Remove special characters but keep important punctuation
         text = re.sub(r'[^\w\s\.\,\;\:\!\?\-\(\)]', '', text)
         
-        # Normalize line breaks
-        text = text.replace('\n', ' ').replace('\r', ' ')
-        
-        # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
+        # Collapse whitespace within lines, then trim lines and blank-line runs
+        text = re.sub(r'[^\S\n]+', ' ', text)
+        text = re.sub(r' ?\n ?', '\n', text)
+        text = re.sub(r'\n{3,}', '\n\n', text)
         
         return text.strip()
     
+    @staticmethod
+    def content_hash(*texts: str) -> str:
+        """Short stable hash identifying parsed document content"""
+        digest = hashlib.sha256("\x00".join(texts).encode("utf-8")).hexdigest()
+        return digest[:16]
+    
     @staticmethod
     async def parse_document(file: UploadFile) -> str:
-        """Parse document based on file extension"""
-        filename = file.filename.lower()
-        
-        if filename.endswith('.pdf'):
-            return await DocumentParser.parse_pdf(file)
-        elif filename.endswith('.docx'):
-            return await DocumentParser.parse_docx(file)
-        elif filename.endswith('.txt'):
-            return await DocumentParser.parse_txt(file)
-        else:
-            raise Exception(f"Unsupported file type: {filename}")
+        """
+        Validate and parse an upload based on its extension. Raises
+        UploadError (UnsupportedFileType / UploadTooLarge) for files
+        rejected before parsing.
+        """
+        upload = await spool_upload(file)
+        try:
+            DOCUMENT_BYTES.inc(upload.size, file_type=upload.file_type)
+            parse = {
+                "pdf": DocumentParser.parse_pdf,
+                "docx": DocumentParser.parse_docx,
+                "txt": DocumentParser.parse_txt,
+            }[upload.file_type]
+            with DOCUMENT_PARSE_DURATION.time(file_type=upload.file_type):
+                return await parse(upload.file)
+        finally:
+            upload.close()
 
 # Test runner
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, List
+
+DOCUMENT_PART = "word/document.xml"
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_TEXT = W + "t"
+_TAB = W + "tab"  # A tab character inside a run; also a tab-stop definition under w:pPr/w:tabs
+_RUN = W + "r"
+_LINE_ENDS = {W + "p", W + "br", W + "cr", W + "tr"}  # Paragraphs, line breaks and table rows
+_CELL = W + "tc"
+_NO_BREAK_HYPHEN = W + "noBreakHyphen"
+_CLEARED = {W + "p", W + "tr", W + "tbl"}  # Released once emitted so memory stays flat on long documents
+
+
+def extract_docx_text(file: BinaryIO) -> str:
+    """
+    Text of a DOCX body in document order, streamed from
+    ``word/document.xml`` with an incremental XML parser instead of
+    building the python-docx object model.
+
+    Each table row comes out on one line, in place rather than after all
+    paragraphs: line ends inside a cell (its paragraphs, breaks and any
+    nested table) become spaces, so cells are separated by spaces and rows
+    by newlines, as with python-docx. Each cell's XML is read once, so text
+    of merged cells is not repeated per spanned column or row (python-docx
+    ``row.cells`` returns a merged cell once per grid position).
+    ``mc:Fallback`` content, the legacy duplicate of text boxes and shapes,
+    is skipped, and so are paragraph tab-stop definitions (``w:tab`` outside
+    a run). Raises on anything that is not a readable DOCX package.
+    """
+    parts: List[str] = []
+    fallback_depth = 0
+    run_depth = 0
+    cell_depth = 0
+    with zipfile.ZipFile(file) as archive, archive.open(DOCUMENT_PART) as document:
+        for event, element in ET.iterparse(document, events=("start", "end")):
+            tag = element.tag
+            if tag == MC_FALLBACK:
+                fallback_depth += 1 if event == "start" else -1
+                continue
+            if tag == _RUN:
+                run_depth += 1 if event == "start" else -1
+            elif tag == _CELL:
+                cell_depth += 1 if event == "start" else -1
+            if event == "start" or fallback_depth:
+                continue
+
+            if tag == _TEXT:
+                if element.text:
+                    parts.append(element.text)
+            elif tag in _LINE_ENDS:
+                parts.append(" " if cell_depth else "\n")
+            elif tag == _TAB and run_depth:
+                parts.append("\t")
+            elif tag == _NO_BREAK_HYPHEN:
+                parts.append("-")
+
+            if tag in _CLEARED:
+                element.clear()
+    return "".join(parts)
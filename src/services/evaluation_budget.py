@@ -0,0 +1,90 @@
+import os
+import time
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Defaults for requests that don't set their own; 0 means unlimited
+EVALUATION_MAX_LLM_CALLS = int(os.getenv("EVALUATION_MAX_LLM_CALLS", "0"))
+EVALUATION_MAX_PROMPT_TOKENS = int(os.getenv("EVALUATION_MAX_PROMPT_TOKENS", "0"))
+EVALUATION_MAX_SECONDS = float(os.getenv("EVALUATION_MAX_SECONDS", "0"))
+# Degradation settings
+REQUIREMENT_MERGE_SIMILARITY = float(os.getenv("REQUIREMENT_MERGE_SIMILARITY", "0.92"))
+MATCH_BATCH_MAX = int(os.getenv("MATCH_BATCH_MAX", "8"))  # Requirements per batched matching call
+
+
+class BudgetExceeded(Exception):
+    """An LLM call would exceed the evaluation's call or prompt token budget"""
+
+
+class EvaluationBudget:
+    """
+    LLM call, prompt token and wall time limits for one evaluation
+    (``0`` = unlimited).
+
+    LLMService reserves every upstream request against the budget (hedges
+    and failovers included) and raises BudgetExceeded when a call does
+    not fit. Required calls (profile and
+    requirement extraction) are never refused: the evaluator sets them
+    aside up front, they count against the limits when made, and only
+    what is left is planned for requirement matching and the summary.
+    Each degradation applied is recorded so the response can report it.
+    """
+
+    def __init__(self, max_llm_calls: int = EVALUATION_MAX_LLM_CALLS,
+                 max_prompt_tokens: int = EVALUATION_MAX_PROMPT_TOKENS,
+                 max_seconds: float = EVALUATION_MAX_SECONDS):
+        self.max_llm_calls = max_llm_calls
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_seconds = max_seconds
+        self.started = time.monotonic()
+        self.calls = 0
+        self.set_aside_calls = 0  # Required calls not made yet
+        self.prompt_tokens = 0
+        self.llm_summary = True  # Cleared when the summary call is given up to save calls
+        self.degradations: List[str] = []
+
+    @property
+    def remaining_calls(self) -> Optional[int]:
+        if not self.max_llm_calls:
+            return None
+        return max(0, self.max_llm_calls - self.calls - self.set_aside_calls)
+
+    @property
+    def remaining_seconds(self) -> Optional[float]:
+        return max(0.0, self.started + self.max_seconds - time.monotonic()) if self.max_seconds else None
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining_seconds == 0.0
+
+    def set_aside(self, calls: int):
+        """Keep ``calls`` required calls out of ``remaining_calls`` until they are made (negative returns them)"""
+        self.set_aside_calls = max(0, self.set_aside_calls + calls)
+
+    def reserve(self, prompt_tokens: int, operation: str, required: bool = False):
+        """
+        Account for one LLM call with an estimated ``prompt_tokens``, or
+        raise BudgetExceeded. ``required`` calls always go ahead.
+        """
+        if required:
+            self.set_aside(-1)
+        elif self.max_llm_calls and self.calls + self.set_aside_calls >= self.max_llm_calls:
+            raise BudgetExceeded(f"LLM call budget of {self.max_llm_calls} exhausted before {operation}")
+        elif self.max_prompt_tokens and self.prompt_tokens + prompt_tokens > self.max_prompt_tokens:
+            raise BudgetExceeded(f"Prompt token budget of {self.max_prompt_tokens} exhausted before {operation}")
+        self.charge(prompt_tokens)
+
+    def charge(self, prompt_tokens: int):
+        """Count a call that goes ahead regardless of the limits (a required call's failover)"""
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+
+    def settle(self, reserved: int, used: int):
+        """Replace a call's estimated prompt tokens with the real count"""
+        self.prompt_tokens += used - reserved
+
+    def degrade(self, description: str):
+        logger.info(f"Degraded evaluation: {description}")
+        self.degradations.append(description)
@@ -0,0 +1,102 @@
+from typing import List, Dict, Any, Sequence, Tuple
+import logging
+
+from ..models.response_models import RequirementMatch
+
+logger = logging.getLogger(__name__)
+
+# Lower bounds (inclusive) of each bucket, best first; anything below is "Poor Fit"
+DEFAULT_THRESHOLDS: Tuple[Tuple[str, float], ...] = (
+    ("Strong Fit", 80.0),
+    ("Moderate Fit", 60.0),
+    ("Weak Fit", 40.0),
+)
+
+
+class FitScorer:
+    """
+    Deterministic local replacement for the LLM summary step.
+
+    Each requirement contributes its importance weight (must-haves weigh
+    more) times the probability that it is met, read from the match
+    verdict: ``confidence`` for a match, ``1 - confidence`` for a miss. The
+    same matches therefore always produce the same percentage and bucket.
+    """
+
+    def __init__(self, mandatory_weight: float = 2.0, optional_weight: float = 1.0,
+                 thresholds: Sequence[Tuple[str, float]] = DEFAULT_THRESHOLDS,
+                 max_items: int = 5):
+        self.mandatory_weight = mandatory_weight
+        self.optional_weight = optional_weight
+        self.thresholds = sorted(thresholds, key=lambda bucket: bucket[1], reverse=True)
+        self.max_items = max_items
+
+    def weight(self, match: RequirementMatch) -> float:
+        return self.mandatory_weight if match.mandatory else self.optional_weight
+
+    @staticmethod
+    def met_probability(match: RequirementMatch) -> float:
+        confidence = min(max(match.confidence, 0.0), 1.0)
+        return confidence if match.match else 1.0 - confidence
+
+    def bucket(self, percentage: float) -> str:
+        for name, lower_bound in self.thresholds:
+            if percentage >= lower_bound:
+                return name
+        return "Poor Fit"
+
+    def score(self, matches: List[RequirementMatch], failed_knockouts: Sequence[str] = (),
+              unevaluated: int = 0, unevaluated_mandatory: int = 0) -> Dict[str, Any]:
+        """
+        Score requirement matches into the summary fields of a
+        FitEvaluationResponse. ``unevaluated`` requirements (skipped after a
+        knockout or dropped to fit a budget) count as unmet, with must-have
+        weight for the ``unevaluated_mandatory`` of them, so evaluating
+        fewer requirements never raises the score. Any failed knockout caps
+        the bucket at "Poor Fit".
+        """
+        unevaluated_optional = unevaluated - unevaluated_mandatory
+        total_weight = (sum(self.weight(match) for match in matches)
+                        + unevaluated_mandatory * self.mandatory_weight
+                        + unevaluated_optional * self.optional_weight)
+        earned = sum(self.weight(match) * self.met_probability(match) for match in matches)
+        percentage = round(earned / total_weight * 100, 1) if total_weight else 0.0
+        fit_score = "Poor Fit" if failed_knockouts else self.bucket(percentage)
+
+        met = sorted((m for m in matches if m.match), key=lambda m: self.weight(m) * m.confidence, reverse=True)
+        unmet = sorted((m for m in matches if not m.match), key=lambda m: self.weight(m) * m.confidence, reverse=True)
+        mandatory_total = sum(1 for m in matches if m.mandatory) + unevaluated_mandatory
+        mandatory_met = sum(1 for m in matches if m.mandatory and m.match)
+
+        explanation = (
+            f"Meets {len(met)} of {len(matches) + unevaluated} requirements"
+            + (f" ({mandatory_met} of {mandatory_total} must-haves)" if mandatory_total else "")
+            + f", for a weighted score of {percentage:.1f}% ({fit_score})."
+        )
+        if failed_knockouts:
+            explanation += f" Fails mandatory requirement(s): {'; '.join(failed_knockouts)}."
+
+        return {
+            "fit_score": fit_score,
+            "fit_percentage": percentage,
+            "explanation": explanation,
+            "strengths": [self._label(m) for m in met[:self.max_items]],
+            "weaknesses": [self._label(m) for m in unmet[:self.max_items]],
+            "recommendations": self._recommendations(matches, failed_knockouts),
+        }
+
+    def _recommendations(self, matches: List[RequirementMatch], failed_knockouts: Sequence[str]) -> List[str]:
+        """Follow-ups for verdicts a recruiter should double-check"""
+        recommendations = []
+        for match in matches:
+            if match.requirement in failed_knockouts:
+                continue
+            if match.mandatory and not match.match:
+                recommendations.append(f"Confirm the must-have during screening: {match.requirement}")
+            elif match.confidence < 0.6:
+                recommendations.append(f"Verify during interview: {match.requirement}")
+        return recommendations[:self.max_items]
+    
+    @staticmethod
+    def _label(match: RequirementMatch) -> str:
+        return f"{match.requirement} (must-have)" if match.mandatory else match.requirement
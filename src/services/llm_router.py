@@ -0,0 +1,245 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import logging
+
+from openai import AsyncOpenAI
+
+from .metrics import LLM_ROUTE_DURATION, LLM_HEDGES, LLM_FAILOVERS
+from .rate_limiter import RateLimitScheduler
+
+logger = logging.getLogger(__name__)
+
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+LLM_HEDGE_INITIAL_DELAY = float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "2.0"))  # Until enough samples exist
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.1"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_TARGET = os.getenv("LLM_HEDGE_TARGET", "same")  # "same" route or the "fallback" route
+
+
+@dataclass
+class LLMRoute:
+    """A model on a provider: anything exposing ``chat.completions.create``"""
+    name: str
+    client: Any
+    model: str
+
+
+class LatencyTracker:
+    """
+    Rolling window of attempt latencies per (route, operation): successes,
+    failures, and attempts cancelled after losing to a hedge.
+    Shared by every LLMService in the process so the hedge delay reflects
+    recent traffic rather than a single evaluation.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, operation: str, latency: float):
+        with self._lock:
+            self._samples.setdefault((route, operation), deque(maxlen=self.window)).append(latency)
+
+    def quantile(self, route: str, operation: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Nearest-rank quantile, or None with fewer than ``min_samples`` samples"""
+        with self._lock:
+            samples = sorted(self._samples.get((route, operation), ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+LATENCY_STATS = LatencyTracker()
+
+
+def default_routes(primary_client: Any, primary_model: str) -> List[LLMRoute]:
+    """
+    The primary Groq route plus an optional fallback from the environment:
+
+        LLM_FALLBACK_MODEL     secondary model (required for a fallback)
+        LLM_FALLBACK_BASE_URL  OpenAI-compatible provider; same Groq client if unset
+        LLM_FALLBACK_API_KEY   key for that provider
+    """
+    routes = [LLMRoute(f"groq:{primary_model}", primary_client, primary_model)]
+    fallback_model = os.getenv("LLM_FALLBACK_MODEL")
+    if not fallback_model:
+        return routes
+
+    fallback_base_url = os.getenv("LLM_FALLBACK_BASE_URL")
+    if fallback_base_url:
+        # Retries are left to RateLimitScheduler, as for the primary client
+        fallback_client = AsyncOpenAI(base_url=fallback_base_url,
+                                      api_key=os.getenv("LLM_FALLBACK_API_KEY") or "unused",
+                                      max_retries=0)
+        routes.append(LLMRoute(f"fallback:{fallback_model}", fallback_client, fallback_model))
+    else:
+        routes.append(LLMRoute(f"groq:{fallback_model}", primary_client, fallback_model))
+    return routes
+
+
+class LLMRouter:
+    """
+    Sends a chat completion over one or more routes, primary first.
+
+    Hedging: if the current attempt has not answered after the route's
+    recent p95 latency (``LLM_HEDGE_QUANTILE``) for that operation, one
+    duplicate request is fired — on the same route, or on the fallback
+    with ``LLM_HEDGE_TARGET=fallback`` — and whichever succeeds first
+    wins; the other is cancelled.
+
+    Failover: when every in-flight attempt has failed, the next route is
+    tried, until the routes run out and the last error is raised.
+
+    Every attempt, hedges and failovers included, takes its own request
+    and token reservation from ``scheduler`` (which also retries 429s and
+    transient errors), so a hedged call pays for both requests. The hedge
+    clock starts once the leading attempt has left the scheduler's queue.
+    ``create``'s ``admit`` callback can refuse the extra attempts, e.g.
+    when an evaluation's call budget has no room for them.
+    """
+
+    def __init__(self, routes: List[LLMRoute], hedge: bool = LLM_HEDGE_ENABLED,
+                 hedge_quantile: float = LLM_HEDGE_QUANTILE,
+                 initial_delay: float = LLM_HEDGE_INITIAL_DELAY,
+                 min_delay: float = LLM_HEDGE_MIN_DELAY,
+                 min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+                 hedge_target: str = LLM_HEDGE_TARGET,
+                 stats: LatencyTracker = LATENCY_STATS,
+                 scheduler: Optional[RateLimitScheduler] = None):
+        if not routes:
+            raise ValueError("LLMRouter needs at least one route")
+        self.routes = routes
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.hedge_target = hedge_target
+        self.stats = stats
+        self.scheduler = scheduler
+
+    def hedge_delay(self, route: LLMRoute, operation: str) -> float:
+        """How long to wait for ``route`` before firing a hedge"""
+        observed = self.stats.quantile(route.name, operation, self.hedge_quantile, self.min_samples)
+        return max(self.min_delay, observed if observed is not None else self.initial_delay)
+
+    async def _attempt(self, route: LLMRoute, operation: str, request: Dict[str, Any],
+                       tokens: int, priority: str, sent: asyncio.Event) -> Any:
+        hedge_delay = self.hedge_delay(route, operation)
+
+        async def call() -> Any:
+            sent.set()
+            start = time.perf_counter()
+            try:
+                completion = await route.client.chat.completions.create(model=route.model, **request)
+            except asyncio.CancelledError:
+                # Lost the race to the other attempt: it would have taken at least this long, and
+                # at least the hedge delay. Dropping it would keep only winners and bias the p95 low
+                self.stats.record(route.name, operation, max(time.perf_counter() - start, hedge_delay))
+                raise
+            except Exception:
+                self.stats.record(route.name, operation, time.perf_counter() - start)
+                raise
+            latency = time.perf_counter() - start
+            self.stats.record(route.name, operation, latency)
+            LLM_ROUTE_DURATION.observe(latency, route=route.name, operation=operation)
+            return completion
+
+        if self.scheduler is None:
+            return await call()
+        return await self.scheduler.submit(
+            call, tokens=tokens, priority=priority,
+            used_tokens=lambda completion: getattr(getattr(completion, "usage", None), "total_tokens", None)
+        )
+
+    async def create(self, operation: str, tokens: int = 1, priority: str = "interactive",
+                     admit: Optional[Callable[[str], bool]] = None, **request: Any) -> Tuple[Any, LLMRoute]:
+        """
+        ``chat.completions.create(**request)`` with hedging and failover;
+        returns (completion, route). ``tokens`` (estimated prompt plus
+        completion tokens) and ``priority`` are reserved per attempt.
+        ``admit("hedge")`` / ``admit("failover")`` is asked before each
+        attempt after the first; when it returns False the hedge is not
+        fired, or the last error is raised instead of failing over.
+        """
+        fallbacks = iter(self.routes[1:])
+        pending: Dict[asyncio.Task, LLMRoute] = {}
+        hedge_task: Optional[asyncio.Task] = None
+        hedge_at: Optional[float] = None
+        last_error: Optional[BaseException] = None
+        sent = asyncio.Event()  # Set when an attempt leaves the scheduler; the hedge clock starts then
+        sent_waiter: Optional[asyncio.Task] = None
+        hedging = self.hedge
+
+        def launch(route: LLMRoute) -> asyncio.Task:
+            task = asyncio.create_task(self._attempt(route, operation, request, tokens, priority, sent))
+            pending[task] = route
+            return task
+
+        launch(self.routes[0])
+
+        try:
+            while pending:
+                waiting = set(pending)
+                timeout = None
+                if hedging and hedge_task is None:
+                    if hedge_at is None and sent.is_set():
+                        hedge_at = time.monotonic() + self.hedge_delay(next(iter(pending.values())), operation)
+                    if hedge_at is None:
+                        sent_waiter = sent_waiter or asyncio.create_task(sent.wait())
+                        waiting.add(sent_waiter)
+                    else:
+                        timeout = max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                done.discard(sent_waiter)
+
+                if not done:
+                    if hedge_at is None or time.monotonic() < hedge_at:
+                        continue  # The leader was just sent: start its hedge clock
+                    if admit is not None and not admit("hedge"):
+                        hedging = False  # Refused: wait for the leader alone
+                        continue
+                    # The leading attempt is slower than its recent p95: hedge once
+                    leader = next(iter(pending.values()))
+                    target = next(fallbacks, leader) if self.hedge_target == "fallback" else leader
+                    hedge_task = launch(target)
+                    LLM_HEDGES.inc(operation=operation, outcome="fired")
+                    logger.info(f"Hedging slow {operation} request on {leader.name} with {target.name}")
+                    continue
+
+                for task in done:
+                    route = pending.pop(task)
+                    if task.exception() is None:
+                        if task is hedge_task:
+                            LLM_HEDGES.inc(operation=operation, outcome="won")
+                        return task.result(), route
+                    last_error = task.exception()
+                    logger.warning(f"LLM route {route.name} failed for {operation}: {last_error}")
+
+                if not pending:
+                    next_route = next(fallbacks, None)
+                    if next_route is None or (admit is not None and not admit("failover")):
+                        break
+                    LLM_FAILOVERS.inc(operation=operation, route=route.name)
+                    logger.info(f"Failing over {operation} from {route.name} to {next_route.name}")
+                    if hedge_task is None:
+                        # Hedge the new route once it is sent, on its own latency
+                        hedge_at = None
+                        sent.clear()
+                        if sent_waiter is not None and sent_waiter.done():
+                            sent_waiter = None
+                    launch(next_route)
+        finally:
+            for task in pending:
+                task.cancel()
+            if sent_waiter is not None:
+                sent_waiter.cancel()
+
+        raise last_error
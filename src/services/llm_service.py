@@ -1,58 +1,155 @@
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 import json
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq
 import asyncio
+import time
+
+from .metrics import LLM_REQUEST_DURATION, LLM_REQUESTS, LLM_TOKENS
+from .llm_router import LLMRouter, default_routes
+from .rate_limiter import LLM_SCHEDULER, estimate_tokens
+from .prompt_compactor import PromptCompactor
+from .evaluation_budget import BudgetExceeded, EvaluationBudget
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Bump when a prompt changes so memoised results of the old prompt are not reused
+PROFILE_PROMPT_VERSION = "1"
+REQUIREMENT_PROMPT_VERSION = "2"
+JOB_REQUIREMENTS_PROMPT_VERSION = "1"
+
+# Key under which parsed results carry the model of the route that answered
+ANSWERED_BY = "model"
+
+# Completion tokens reserved per call until the real usage is known
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "300"))
+
 class LLMService:
     """Service for LLM-based evaluation and reasoning using Groq"""
     
     def __init__(self, groq_model: str = "meta-llama/llama-4-scout-17b-16e-instruct"):
         self.groq_model = groq_model
         self.groq_client = None
+        self.router = None
+        self.priority = "interactive"  # Rate-limit queue class: "interactive" or "batch"
+        self.compactor = PromptCompactor()  # Also tallies the prompt tokens it saves
+        self.budget: Optional[EvaluationBudget] = None  # Per-evaluation call/token limits, if any
+        # Per-instance usage counters (one LLMService per evaluation)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
         
         groq_api_key = os.getenv("CROQ_API_KEY")
         if groq_api_key:
-            self.groq_client = Groq(api_key=groq_api_key)
-            logger.info(f"Groq client initialized with model: {groq_model}")
+            # Retries (and 429 backoff) are handled per attempt by the shared LLM_SCHEDULER
+            self.groq_client = AsyncGroq(api_key=groq_api_key, max_retries=0)
+            self.router = LLMRouter(default_routes(self.groq_client, groq_model), scheduler=LLM_SCHEDULER)
+            logger.info(f"Groq client initialized with model: {groq_model} "
+                        f"(routes: {', '.join(route.name for route in self.router.routes)})")
         else:
             logger.warning("Groq API key not found.")
     
-    async def _call_groq_model(self, prompt: str, system_prompt: str = None) -> str:
-        """Call Groq model with the specified prompt"""
+    def _record_usage(self, completion: Any, operation: str):
+        """Accumulate token usage from a completion into instance and global counters (calls are counted per attempt)"""
+        usage = getattr(completion, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        
+        self.usage["prompt_tokens"] += prompt_tokens
+        self.usage["completion_tokens"] += completion_tokens
+        LLM_TOKENS.inc(prompt_tokens, operation=operation, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, operation=operation, kind="completion")
+    
+    async def _call_groq_model(self, prompt: str, system_prompt: str = None, operation: str = "completion",
+                               required: bool = False) -> str:
+        """
+        Call the LLM with the specified prompt: hedged and with failover,
+        each attempt paced by LLM_SCHEDULER's RPM/TPM budgets (see
+        LLMRouter). Raises
+        BudgetExceeded when the evaluation's budget has no room for it,
+        unless the call is ``required`` (extraction). Hedges and failovers
+        are reserved the same way and are not sent when the budget has no
+        room, except a required call's failover.
+        """
+        content, _ = await self._complete(prompt, system_prompt, operation, required)
+        return content
+    
+    async def _complete(self, prompt: str, system_prompt: str = None, operation: str = "completion",
+                        required: bool = False) -> Tuple[str, str]:
+        """``_call_groq_model`` that also returns the model of the route that answered"""
+        start = time.perf_counter()
         try:
-            if not self.groq_client:
+            if not self.router:
                 raise Exception("Groq client not initialized")
+            prompt = self.compactor.prompt(operation, prompt)
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
-            completion = self.groq_client.chat.completions.create(
-                model=self.groq_model,
+            prompt_tokens = estimate_tokens(prompt) + estimate_tokens(system_prompt or "")
+            if self.budget:
+                self.budget.reserve(prompt_tokens, operation, required=required)
+            self.usage["calls"] += 1
+            
+            def admit(attempt: str) -> bool:
+                """Hedges and failovers are further upstream requests: each takes a call and its tokens"""
+                if self.budget:
+                    try:
+                        if required and attempt == "failover":
+                            self.budget.charge(prompt_tokens)  # Extraction must still get an answer
+                        else:
+                            self.budget.reserve(prompt_tokens, f"{operation} {attempt}")
+                    except BudgetExceeded:
+                        return False
+                self.usage["calls"] += 1
+                return True
+            
+            completion, route = await self.router.create(
+                operation,
+                tokens=prompt_tokens + LLM_COMPLETION_TOKEN_ESTIMATE,
+                priority=self.priority,
+                admit=admit,
                 messages=messages,
                 temperature=0.1,
                 response_format={"type": "json_object"},
             )
             
-            return completion.choices[0].message.content
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - start, operation=operation)
+            LLM_REQUESTS.inc(operation=operation, outcome="success")
+            self._record_usage(completion, operation)
+            if self.budget:
+                used = getattr(getattr(completion, "usage", None), "prompt_tokens", None)
+                self.budget.settle(prompt_tokens, used or prompt_tokens)
+            return completion.choices[0].message.content, route.model
+        except BudgetExceeded:
+            raise  # Not an LLM failure; callers degrade
         except Exception as e:
+            LLM_REQUESTS.inc(operation=operation, outcome="error")
             logger.error(f"Error calling Groq model: {str(e)}")
             raise
     
-    async def extract_job_requirements(self, job_description: str) -> List[str]:
-        """Extract job requirements from job description"""
+    @staticmethod
+    def _answered_by(result: Any, model: str) -> Any:
+        """Tag a parsed result with the model that produced it, so memoised copies are keyed by it"""
+        if isinstance(result, dict):
+            result[ANSWERED_BY] = model
+        return result
+    
+    async def extract_job_requirements(self, job_description: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Extract job requirements from job description, classified as mandatory or nice-to-have"""
         if not self.groq_client:
             return "error : groq client is not intialized"
         
         try:
             prompt = f"""
-            Extract specific job requirements from the following job description. 
-            Return only the requirements as a JSON array of strings.
+            Extract specific job requirements from the following job description.
+            Classify each one as mandatory (a knockout criterion: work authorisation, a required
+            degree, a mandatory certification, or anything stated as required / must-have) or
+            nice-to-have (preferred, a plus, bonus).
+            Return a JSON object with a key 'requirements' holding an array of objects with these fields:
+            - requirement: string
+            - mandatory: boolean
             
             Job Description:
             {job_description}
@@ -60,14 +157,15 @@ class LLMService:
             Requirements:
             """
             
-            system_prompt = "You are a job requirements extractor. Return only valid JSON arrays with a key 'requirements'."
+            system_prompt = "You are a job requirements extractor. Return only valid JSON objects with a key 'requirements'."
            
             try:
-                content = await self._call_groq_model(prompt, system_prompt)
+                content, model = await self._complete(prompt, system_prompt, operation="extract_requirements",
+                                                      required=True)
             except:
                 raise
             
-            requirements = json.loads(content)
+            requirements = self._answered_by(json.loads(content), model)
             print(requirements)
             return requirements
             
@@ -95,12 +193,13 @@ class LLMService:
             system_prompt = "You are a resume parser. Return only valid JSON objects."
             
             try:
-                content = await self._call_groq_model(prompt, system_prompt)
+                content, model = await self._complete(prompt, system_prompt, operation="extract_profile",
+                                                      required=True)
             except:
                 raise
             
             
-            profile = json.loads(content)
+            profile = self._answered_by(json.loads(content), model)
             
             return profile
             
@@ -114,7 +213,7 @@ class LLMService:
             return "error: groq client is not intialized"
         
         try:
-            resume_context = "\n".join(resume_chunks)  # Use top 3 chunks
+            resume_context = "\n".join(resume_chunks)  # Selected and de-duplicated by the caller
             
             prompt = f"""
             Evaluate if the candidate's resume matches the following job requirement.
@@ -134,11 +233,11 @@ class LLMService:
             system_prompt = "You are a job requirement evaluator. Return only valid JSON objects."
            
             try:
-                content = await self._call_groq_model(prompt, system_prompt)
+                content, model = await self._complete(prompt, system_prompt, operation="evaluate_requirement")
             except:
                 raise
             
-            evaluation = json.loads(content)
+            evaluation = self._answered_by(json.loads(content), model)
             print(evaluation)
             return evaluation 
         
@@ -146,6 +245,47 @@ class LLMService:
             logger.error(f"Error evaluating requirement: {str(e)}")
             return e
     
+    async def evaluate_requirements_batch(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Evaluate several requirements in one call; ``items`` are
+        ``{"requirement": str, "resume_chunks": [str]}``. Returns
+        ``{"evaluations": [...]}`` with one verdict per item, in order.
+        """
+        if not self.groq_client:
+            return "error: groq client is not intialized"
+        
+        try:
+            sections = "\n\n".join(
+                f"Requirement {number}: {item['requirement']}\nResume Content:\n" + "\n".join(item['resume_chunks'])
+                for number, item in enumerate(items, 1)
+            )
+            
+            prompt = f"""
+            Evaluate if the candidate's resume matches each of the following job requirements.
+            Each requirement comes with the resume content relevant to it.
+            
+            {sections}
+            
+            Return a JSON object with a key 'evaluations' holding one object per requirement,
+            in the same order, with these fields:
+            - requirement: integer (the requirement number)
+            - match: boolean (true if requirement is met)
+            - confidence: float (0.0 to 1.0)
+            - explanation: string (short reasoning)
+            """
+            
+            system_prompt = ("You are a job requirement evaluator for several requirements at once. "
+                             "Return only valid JSON objects with a key 'evaluations'.")
+            
+            content, model = await self._complete(prompt, system_prompt, operation="evaluate_requirements_batch")
+            
+            evaluations = self._answered_by(json.loads(content), model)
+            return evaluations
+        
+        except Exception as e:
+            logger.error(f"Error evaluating requirements batch: {str(e)}")
+            return e
+    
     async def generate_fit_evaluation(self, requirements: List[str], matches: List[Dict[str, Any]], 
                                     candidate_profile: Dict[str, List[str]]) -> Dict[str, Any]:
         """Generate overall fit evaluation"""
@@ -153,8 +293,11 @@ class LLMService:
             return "error: groq client is not intialized"
         
         try:
+            # One line per requirement, explanations cut to a short budget
             match_summary = "\n".join([
-                f"Requirement: {req}\nMatch: {match['match']}\nExplanation: {match['explanation']}\n"
+                f"- {req}{' (must-have)' if match.get('mandatory') else ''} | "
+                f"match={str(match['match']).lower()} | "
+                f"{self.compactor.truncate('fit_evaluation', match['explanation'])}"
                 for req, match in zip(requirements, matches)
             ])
             
@@ -162,7 +305,7 @@ class LLMService:
             Based on the following information, provide a comprehensive fit evaluation:
             
             Candidate Profile:
-            {json.dumps(candidate_profile, indent=2)}
+            {self.compactor.json('fit_evaluation', candidate_profile)}
             
             Requirement Matches:
             {match_summary}
@@ -179,7 +322,7 @@ class LLMService:
             system_prompt = "You are a candidate fit evaluator. Return only valid JSON objects."
           
             try:
-                content = await self._call_groq_model(prompt, system_prompt)
+                content = await self._call_groq_model(prompt, system_prompt, operation="fit_evaluation")
             except:
                 raise
             
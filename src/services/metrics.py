@@ -0,0 +1,213 @@
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Tuple, Iterator, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(label_key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        """Increment the counter for the given label set"""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts..., sum, count]
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        """Record a single observation for the given label set"""
+        key = _label_key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0] * len(self.buckets) + [0.0, 0]
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the wrapped block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(state[-2])}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {state[-1]}")
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    """Process-wide collection of metrics rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        """Render every registered metric in the Prometheus exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    "evaluation_stage_duration_seconds", "Duration of each candidate evaluation stage"
+)
+LLM_REQUEST_DURATION = registry.histogram(
+    "llm_request_duration_seconds", "Latency of LLM completion requests"
+)
+LLM_REQUESTS = registry.counter(
+    "llm_requests_total", "LLM completion requests by operation and outcome"
+)
+LLM_TOKENS = registry.counter(
+    "llm_tokens_total", "LLM tokens consumed by operation and kind (prompt/completion)"
+)
+LLM_ROUTE_DURATION = registry.histogram(
+    "llm_route_request_duration_seconds", "Latency of successful LLM attempts by route and operation"
+)
+LLM_HEDGES = registry.counter(
+    "llm_hedged_requests_total", "Hedged duplicate LLM requests by operation and outcome (fired/won)"
+)
+LLM_FAILOVERS = registry.counter(
+    "llm_failovers_total", "LLM requests retried on the next route after an error, by failed route"
+)
+PROMPT_TOKENS_SAVED = registry.counter(
+    "llm_prompt_tokens_saved_total", "Estimated prompt tokens removed by prompt compaction, by operation"
+)
+CACHE_LOOKUPS = registry.counter(
+    "result_cache_lookups_total", "Memoised LLM result lookups by kind (verdict/profile) and outcome"
+)
+RESULT_STORE_WRITES = registry.counter(
+    "result_store_writes_total", "Evaluations written to the result store, by outcome"
+)
+RATE_LIMIT_WAIT = registry.histogram(
+    "rate_limit_wait_seconds", "Time spent queued for RPM/TPM budget by scheduler and priority"
+)
+ADMISSION_DECISIONS = registry.counter(
+    "admission_decisions_total", "API requests admitted, queued or rejected, by pool and outcome"
+)
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests spent queued for a slot, by pool"
+)
+RATE_LIMIT_RESPONSES = registry.counter(
+    "rate_limit_responses_total", "429 responses received by scheduler"
+)
+EMBEDDING_REQUEST_DURATION = registry.histogram(
+    "embedding_request_duration_seconds", "Latency of embedding requests"
+)
+EMBEDDING_REQUESTS = registry.counter(
+    "embedding_requests_total", "Embedding requests by operation and outcome"
+)
+EMBEDDING_INPUTS = registry.counter(
+    "embedding_inputs_total", "Texts sent for embedding by operation"
+)
+VECTOR_SEARCH_DURATION = registry.histogram(
+    "vector_search_duration_seconds", "Latency of vector similarity searches"
+)
+DOCUMENT_PARSE_DURATION = registry.histogram(
+    "document_parse_duration_seconds", "Duration of document parsing by file type"
+)
+DOCUMENT_BYTES = registry.counter(
+    "document_bytes_total", "Bytes of uploaded documents parsed by file type"
+)
+DOCUMENT_PARSE_FALLBACKS = registry.counter(
+    "document_parse_fallbacks_total", "Documents the fast extractor failed on and that were re-parsed, by file type"
+)
+
+
+class StageTimer:
+    """Per-evaluation stage timing recorder that also feeds STAGE_DURATION"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a stage; repeated stages with the same name are accumulated"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, duration: float):
+        """Record an externally measured stage duration"""
+        self.timings[name] = self.timings.get(name, 0.0) + duration
+        STAGE_DURATION.observe(duration, stage=name)
+
+    def breakdown(self) -> Dict[str, float]:
+        """Stage timings in seconds, rounded for the response payload"""
+        return {name: round(duration, 4) for name, duration in self.timings.items()}
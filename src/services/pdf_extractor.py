@@ -0,0 +1,60 @@
+import os
+import threading
+from typing import BinaryIO, Tuple
+
+try:
+    import pypdfium2
+except ImportError:  # Optional; PDFs are then always parsed with pdfplumber
+    pypdfium2 = None
+
+PDF_ENGINES = ("pdfium", "pdfplumber")  # Fast, with a pdfplumber fallback; or always pdfplumber
+PDF_ENGINE = os.getenv("PDF_ENGINE", "pdfium").lower()
+PDF_MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", "30"))
+PDF_MIN_TEXT_RATIO = float(os.getenv("PDF_MIN_TEXT_RATIO", "0.7"))
+
+if PDF_ENGINE not in PDF_ENGINES:
+    raise ValueError(f"Unknown PDF_ENGINE '{PDF_ENGINE}' (expected one of: {', '.join(PDF_ENGINES)})")
+
+_PDFIUM_LOCK = threading.Lock()  # PDFium is not thread-safe; parses run in worker threads
+_PUNCTUATION = set(".,;:!?-()'\"/&%+@#*")
+
+
+def pdfium_available() -> bool:
+    return pypdfium2 is not None
+
+
+def extract_pdf_text(file: BinaryIO) -> Tuple[str, int]:
+    """
+    Text of every page read straight from PDFium's text layer, without
+    the per-character objects and layout analysis of pdfplumber (only
+    line breaks survive ``_clean_text`` anyway). Returns the text and the page
+    count. Raises on anything PDFium cannot open.
+    """
+    with _PDFIUM_LOCK:
+        document = pypdfium2.PdfDocument(file)
+        try:
+            parts = []
+            for index in range(len(document)):
+                page = document[index]
+                text_page = page.get_textpage()
+                parts.append(text_page.get_text_range())
+                text_page.close()
+                page.close()
+            return "\n".join(parts), len(document)
+        finally:
+            document.close()
+
+
+def text_is_usable(text: str, page_count: int,
+                   min_chars_per_page: int = PDF_MIN_CHARS_PER_PAGE,
+                   min_text_ratio: float = PDF_MIN_TEXT_RATIO) -> bool:
+    """
+    Whether fast-path text is worth keeping: enough characters per page,
+    and mostly letters, digits and common punctuation. Fonts without a
+    usable encoding come out as control or replacement characters instead.
+    """
+    characters = [char for char in text if not char.isspace()]
+    if len(characters) < min_chars_per_page * max(page_count, 1):
+        return False
+    readable = sum(1 for char in characters if char.isalnum() or char in _PUNCTUATION)
+    return readable / len(characters) >= min_text_ratio
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from .metrics import StageTimer
+
+logger = logging.getLogger(__name__)
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+CompletionCallback = Callable[[str, Any], Optional[Awaitable[None]]]
+
+
+@dataclass
+class Stage:
+    """A pipeline stage: an async function of its dependencies' results"""
+    name: str
+    func: StageFunc
+    depends_on: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageSpan:
+    """Start/end offsets (seconds since pipeline start) of an executed stage"""
+    start: float
+    end: float
+    depends_on: Tuple[str, ...] = field(default_factory=tuple)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class PipelineScheduler:
+    """
+    Executes a DAG of async stages with maximal overlap: every stage starts
+    as soon as all of its dependencies have finished. Each stage function
+    receives a dict of the results of the stages it depends on.
+
+    After ``run`` the recorded spans give the critical path — the chain of
+    stages that determined the total wall time.
+    """
+
+    def __init__(self, stages: Sequence[Stage], stage_timer: Optional[StageTimer] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Duplicate stage names in pipeline")
+        self.order = self._topological_order()
+        self.stage_timer = stage_timer or StageTimer()
+        self.spans: Dict[str, StageSpan] = {}
+
+    def _topological_order(self) -> List[str]:
+        """Validate dependencies and return stages in a dependency-respecting order"""
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.depends_on if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+        order, visiting, done = [], set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at stage '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self, on_complete: Optional[CompletionCallback] = None) -> Dict[str, Any]:
+        """
+        Run every stage and return ``{stage name: result}``.
+
+        ``on_complete(name, result)`` is invoked as each stage finishes. If
+        any stage fails, the remaining stages are cancelled and the error
+        propagates.
+        """
+        results: Dict[str, Any] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        origin = time.perf_counter()
+
+        async def run_stage(stage: Stage):
+            if stage.depends_on:
+                await asyncio.gather(*(tasks[dep] for dep in stage.depends_on))
+            start = time.perf_counter()
+            result = await stage.func({dep: results[dep] for dep in stage.depends_on})
+            end = time.perf_counter()
+
+            results[stage.name] = result
+            self.spans[stage.name] = StageSpan(start - origin, end - origin, stage.depends_on)
+            self.stage_timer.record(stage.name, end - start)
+            if on_complete:
+                callback_result = on_complete(stage.name, result)
+                if asyncio.iscoroutine(callback_result):
+                    await callback_result
+            return result
+
+        # Tasks are created in topological order so dependencies always exist
+        for name in self.order:
+            tasks[name] = asyncio.create_task(run_stage(self.stages[name]), name=f"stage:{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return results
+
+    def critical_path(self) -> List[str]:
+        """Stages on the longest dependency chain, from first to last"""
+        if not self.spans:
+            return []
+        name = max(self.spans, key=lambda stage: self.spans[stage].end)
+        path = [name]
+        while self.spans[name].depends_on:
+            # The dependency that finished last is the one that gated this stage
+            name = max(self.spans[name].depends_on, key=lambda dep: self.spans[dep].end)
+            path.append(name)
+        return list(reversed(path))
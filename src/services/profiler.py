@@ -0,0 +1,131 @@
+import os
+import sys
+import time
+import cProfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "./profiles"))
+
+# Profiles cover the whole process, so only one runs at a time
+_ACTIVE_PROFILE = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another request is already being profiled"""
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the Python stack of every thread and aggregates
+    the samples as collapsed stacks (``thread;root;caller;callee count``),
+    the input format of flamegraph.pl / speedscope / inferno.
+
+    Each stack starts with its thread name, so the event loop's awaits can
+    be told apart from the PDF/DOCX parsing and embedding that run in
+    ``asyncio.to_thread`` workers. Concurrent requests on the same loop
+    show up in the profile too.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._stop_event.clear()
+        self._sampler = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._sampler:
+            self._sampler.join()
+
+    def _run(self):
+        own_thread = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack format, one stack per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class RequestProfiler:
+    """
+    Opt-in profiler for a single evaluation.
+
+    ``sample`` mode writes a ``.folded`` collapsed-stack file (flamegraph
+    ready) covering every thread; ``cprofile`` mode writes deterministic
+    ``.pstats`` output for the thread that calls ``start`` only (the event
+    loop), so work handed to ``asyncio.to_thread`` shows up there as a
+    wait. One profile runs at a time; ``start`` raises ProfilerBusy while
+    another is active. Artefacts are tagged with the document hash so a slow resume can be
+    matched to its profile. Nothing is installed unless a profiler is
+    created, so disabled profiling costs nothing.
+    """
+
+    def __init__(self, mode: str = "sample", output_dir: Optional[Path] = None, interval: float = 0.005):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: {mode} (expected one of {', '.join(PROFILE_MODES)})")
+        self.mode = mode
+        self.output_dir = Path(output_dir or PROFILE_DIR)
+        self._profiler = SamplingProfiler(interval) if mode == "sample" else cProfile.Profile()
+        self._started_at = None
+        self.duration = 0.0
+
+    def start(self):
+        if not _ACTIVE_PROFILE.acquire(blocking=False):
+            raise ProfilerBusy("Another request is being profiled; retry once it finishes")
+        self._started_at = time.perf_counter()
+        try:
+            if self.mode == "sample":
+                self._profiler.start()
+            else:
+                self._profiler.enable()
+        except BaseException:
+            _ACTIVE_PROFILE.release()
+            raise
+
+    def stop(self):
+        try:
+            if self.mode == "sample":
+                self._profiler.stop()
+            else:
+                self._profiler.disable()
+        finally:
+            _ACTIVE_PROFILE.release()
+        self.duration = time.perf_counter() - self._started_at
+
+    def save(self, tag: str) -> Path:
+        """Write the artefact as ``<tag>-<timestamp>.<ext>`` and return its path"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = f"{tag or 'unknown'}-{time.strftime('%Y%m%dT%H%M%S')}-{int(self.duration * 1000)}ms"
+
+        if self.mode == "sample":
+            path = self.output_dir / f"{stem}.folded"
+            path.write_text(self._profiler.collapsed(), encoding="utf-8")
+        else:
+            path = self.output_dir / f"{stem}.pstats"
+            self._profiler.dump_stats(str(path))
+
+        logger.info(f"Saved {self.mode} profile to {path}")
+        return path
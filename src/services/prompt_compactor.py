@@ -0,0 +1,98 @@
+import os
+import re
+import json
+from typing import Any, Dict, List, Sequence, Tuple
+import logging
+
+from .metrics import PROMPT_TOKENS_SAVED
+from .rate_limiter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Resume context selection for requirement matching
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "8"))
+RETRIEVAL_MAX_CHUNKS = int(os.getenv("RETRIEVAL_MAX_CHUNKS", "3"))
+RETRIEVAL_MIN_SIMILARITY = float(os.getenv("RETRIEVAL_MIN_SIMILARITY", "0.2"))
+RETRIEVAL_DIVERSITY = float(os.getenv("RETRIEVAL_DIVERSITY", "0.3"))  # MMR weight on novelty
+# Summary prompt
+PROMPT_EXPLANATION_CHARS = int(os.getenv("PROMPT_EXPLANATION_CHARS", "160"))
+
+
+class PromptCompactor:
+    """
+    Shrinks LLM prompts without changing what they ask, and keeps count of
+    the (estimated) prompt tokens each step saves for one evaluation.
+
+    Every method takes the ``operation`` it compacts for, records
+    ``before -> after`` and returns the compact form.
+    """
+
+    def __init__(self, max_explanation_chars: int = PROMPT_EXPLANATION_CHARS):
+        self.max_explanation_chars = max_explanation_chars
+        self.saved: Dict[str, int] = {}
+
+    def _record(self, operation: str, before: str, after: str):
+        saved = estimate_tokens(before) - estimate_tokens(after)
+        if saved > 0:
+            self.saved[operation] = self.saved.get(operation, 0) + saved
+            PROMPT_TOKENS_SAVED.inc(saved, operation=operation)
+
+    @property
+    def total_saved(self) -> int:
+        return sum(self.saved.values())
+
+    def prompt(self, operation: str, text: str) -> str:
+        """Strip template indentation and blank-line runs"""
+        compact = re.sub(r"\n{3,}", "\n\n", "\n".join(line.strip() for line in text.strip().splitlines()))
+        self._record(operation, text, compact)
+        return compact
+
+    def context(self, operation: str, baseline: Sequence[str], selected: Sequence[Tuple[int, str]]) -> List[str]:
+        """
+        Resume context for a prompt: ``selected`` ``(position, text)``
+        chunks in document order with the text they share with the
+        previous chunk (the chunker's overlap) removed, and chunks already
+        covered dropped. ``baseline`` is what would have been sent
+        otherwise, for the savings report.
+        """
+        merged: List[str] = []
+        seen_words: List[str] = []
+        for _, text in sorted(selected):
+            words = text.split()
+            if " ".join(words) in " ".join(seen_words):
+                continue
+            overlap = self._overlap(seen_words, words)
+            remainder = words[overlap:]
+            if remainder:
+                merged.append(("… " if overlap else "") + " ".join(remainder))
+                seen_words.extend(remainder)
+        self._record(operation, "\n".join(baseline), "\n".join(merged))
+        return merged
+
+    @staticmethod
+    def _overlap(previous: List[str], words: List[str]) -> int:
+        """Length of the longest suffix of ``previous`` that is a prefix of ``words``"""
+        for size in range(min(len(previous), len(words)), 0, -1):
+            if previous[-size:] == words[:size]:
+                return size
+        return 0
+
+    def json(self, operation: str, value: Any) -> str:
+        """Minified JSON instead of indented JSON"""
+        compact = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        self._record(operation, json.dumps(value, indent=2), compact)
+        return compact
+
+    def truncate(self, operation: str, text: str) -> str:
+        """Cut ``text`` to the explanation budget at a word boundary"""
+        text = str(text or "")
+        if len(text) <= self.max_explanation_chars:
+            return text
+        compact = text[:self.max_explanation_chars].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+        self._record(operation, text, compact)
+        return compact
+
+    def report(self) -> Dict[str, int]:
+        """Estimated prompt tokens saved, per operation and in total"""
+        return {**{f"saved_{operation}": saved for operation, saved in sorted(self.saved.items())},
+                "prompt_tokens_saved": self.total_saved}
@@ -0,0 +1,223 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import itertools
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+import logging
+
+from .metrics import RATE_LIMIT_WAIT, RATE_LIMIT_RESPONSES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PRIORITIES = {"interactive": 0, "batch": 1}  # Lower is served first
+RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "1"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "2"))
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used to reserve TPM budget"""
+    return len(text or "") // 4 + 1
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Delay requested by a 429 response (retry-after-ms, then retry-after seconds or HTTP date)"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Server errors and dropped connections / timeouts are worth retrying"""
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status == 408
+    return any(cls.__name__ == "APIConnectionError" for cls in type(error).__mro__)
+
+
+class TokenBucket:
+    """
+    Continuously refilled budget of ``per_minute`` units holding at most
+    ``burst_seconds`` worth. ``per_minute <= 0`` means unlimited.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = RATE_LIMIT_BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken; an oversized amount only needs a full bucket"""
+        if self.unlimited:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def consume(self, amount: float):
+        if not self.unlimited:
+            self.level -= amount  # May go negative; later callers wait it off
+
+    def credit(self, amount: float):
+        if not self.unlimited:
+            self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimitScheduler:
+    """
+    Shared pacing for one upstream's requests-per-minute and
+    tokens-per-minute budgets.
+
+    Callers queue by priority class (``interactive`` before ``batch``, FIFO
+    within a class) and are released only when both buckets allow, so a
+    burst of evaluations is spread out instead of tripping 429s. A 429
+    that still happens pauses the whole queue for the server's Retry-After
+    rather than having every caller retry on its own.
+
+    Waiters are futures on the event loop, so one scheduler serves one
+    loop at a time (the API runs a single loop).
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 burst_seconds: float = RATE_LIMIT_BURST_SECONDS, max_retries: int = RATE_LIMIT_MAX_RETRIES):
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_retries = max_retries
+        self.paused_until = 0.0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        return max(self.paused_until - now,
+                   self.requests.wait_time(1, now),
+                   self.tokens.wait_time(tokens, now))
+
+    def _take(self, tokens: int):
+        self.requests.consume(1)
+        self.tokens.consume(tokens)
+
+    def _pump(self):
+        """Release waiters in priority order while the budgets allow, then re-arm the timer"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():  # Cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._wait_time(tokens, time.monotonic())
+            if wait > 0:
+                self._timer = future.get_loop().call_later(wait, self._pump)
+                return
+            heapq.heappop(self._waiters)
+            self._take(tokens)
+            future.set_result(None)
+
+    async def acquire(self, tokens: int = 1, priority: str = "interactive"):
+        """Wait for one request and ``tokens`` tokens of budget"""
+        start = time.monotonic()
+        if not self._waiters and self._wait_time(tokens, start) <= 0:
+            self._take(tokens)
+            RATE_LIMIT_WAIT.observe(0.0, scheduler=self.name, priority=priority)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITIES.get(priority, PRIORITIES["batch"]),
+                                       next(self._sequence), tokens, future))
+        self._pump()
+        try:
+            await future
+        finally:
+            if future.cancelled():
+                self._pump()  # Let the next waiter through
+        RATE_LIMIT_WAIT.observe(time.monotonic() - start, scheduler=self.name, priority=priority)
+
+    def settle(self, reserved: int, used: int):
+        """Correct the token bucket once the real usage of a request is known"""
+        if used < reserved:
+            self.tokens.credit(reserved - used)
+        else:
+            self.tokens.consume(used - reserved)
+
+    def backoff(self, seconds: float):
+        """Pause every queued and future request for ``seconds``"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        logger.warning(f"{self.name} rate limited; pausing requests for {seconds:.2f}s")
+        if self._waiters:
+            self._pump()
+
+    async def submit(self, call: Callable[[], Awaitable[T]], tokens: int = 1, priority: str = "interactive",
+                     used_tokens: Optional[Callable[[T], Optional[int]]] = None) -> T:
+        """
+        Run ``call()`` within the budgets. 429s pause the queue for their
+        Retry-After and are retried; transient errors are retried with
+        jittered exponential backoff; both up to ``max_retries`` times.
+        ``used_tokens(result)`` reports real usage to settle the estimate.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(tokens, priority)
+            try:
+                result = await call()
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                if _status_code(e) == 429:
+                    RATE_LIMIT_RESPONSES.inc(scheduler=self.name)
+                    self.backoff(retry_after_seconds(e) or DEFAULT_RETRY_AFTER)
+                elif _is_transient(e):
+                    await asyncio.sleep(min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+                else:
+                    raise
+                logger.info(f"Retrying {self.name} request (attempt {attempt + 2}) after: {e}")
+                continue
+
+            used = used_tokens(result) if used_tokens else None
+            if used:
+                self.settle(tokens, used)
+            return result
+
+
+LLM_SCHEDULER = RateLimitScheduler(
+    "groq",
+    requests_per_minute=float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "0")),
+    tokens_per_minute=float(os.getenv("GROQ_TOKENS_PER_MINUTE", "0")),
+)
+EMBEDDING_SCHEDULER = RateLimitScheduler(
+    "azure_embeddings",
+    requests_per_minute=float(os.getenv("EMBEDDING_REQUESTS_PER_MINUTE", "0")),
+    tokens_per_minute=float(os.getenv("EMBEDDING_TOKENS_PER_MINUTE", "0")),
+)
@@ -0,0 +1,70 @@
+import os
+import re
+import time
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+import logging
+
+from .metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "10000"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", str(7 * 24 * 3600)))  # Seconds; 0 disables expiry
+
+
+def normalize_requirement(text: str) -> str:
+    """Requirement text reduced to what changes its meaning: case, spacing, bullets and trailing punctuation go"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.strip(" -•*·.;,:")
+
+
+class ResultCache:
+    """
+    In-process LRU cache with expiry for memoised LLM results (requirement
+    verdicts, candidate profiles), shared by all evaluations. Keys are
+    hashes of everything the result depends on — see ``key``.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_SIZE, ttl: float = RESULT_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, *parts: str) -> str:
+        return kind + ":" + hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        kind = key.split(":", 1)[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and self.ttl and time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry:
+                self._entries.move_to_end(key)
+        CACHE_LOOKUPS.inc(kind=kind, outcome="hit" if entry else "miss")
+        return entry[1] if entry else None
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+RESULT_CACHE = ResultCache()
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from .metrics import RESULT_STORE_WRITES
+
+logger = logging.getLogger(__name__)
+
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", "data/evaluations.db")  # Empty disables the store
+RESULT_STORE_MAX_PAGE = 200
+
+SORT_ORDERS = {
+    "fit": "fit_percentage DESC, created_at DESC",
+    "recent": "created_at DESC",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    evaluation_id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    candidate_name TEXT,
+    resume_hash TEXT NOT NULL,
+    fit_score TEXT NOT NULL,
+    fit_percentage REAL NOT NULL,
+    scoring_mode TEXT NOT NULL,
+    early_terminated INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    result TEXT NOT NULL,
+    superseded INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS evaluations_job_fit ON evaluations (job_id, fit_percentage DESC, created_at DESC, superseded);
+CREATE INDEX IF NOT EXISTS evaluations_job_recent ON evaluations (job_id, created_at DESC, superseded);
+CREATE INDEX IF NOT EXISTS evaluations_candidate ON evaluations (candidate_name, created_at DESC, superseded);
+CREATE INDEX IF NOT EXISTS evaluations_fit ON evaluations (fit_percentage DESC, created_at DESC, superseded);
+CREATE INDEX IF NOT EXISTS evaluations_recent ON evaluations (created_at DESC, superseded);
+CREATE INDEX IF NOT EXISTS evaluations_job_resume ON evaluations (job_id, resume_hash) WHERE superseded = 0;
+"""
+
+SUMMARY_COLUMNS = ("evaluation_id, job_id, candidate_name, resume_hash, fit_score, fit_percentage, "
+                   "scoring_mode, early_terminated, created_at")
+
+
+class ResultStore:
+    """
+    SQLite store of completed evaluations, indexed for ranked listings per
+    job and lookups per candidate.
+
+    Writes go through a single background thread, so saving never delays
+    an evaluation and the database sees one writer. Reads open their own
+    connection in a worker thread (WAL mode lets them run while a write
+    is in progress).
+    """
+
+    def __init__(self, path: str = RESULT_STORE_PATH):
+        self.path = path
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-store")
+        self._connection: Optional[sqlite3.Connection] = None  # Owned by the writer thread
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _insert(self, row: Tuple[Any, ...]):
+        try:
+            if self._connection is None:
+                self._connection = self._connect()
+            with self._connection:
+                # A re-evaluation of the same resume for the same job supersedes the earlier ones
+                self._connection.execute(
+                    "UPDATE evaluations SET superseded = 1 WHERE job_id = ? AND resume_hash = ? AND superseded = 0",
+                    (row[1], row[3])
+                )
+                self._connection.execute(
+                    f"INSERT INTO evaluations ({SUMMARY_COLUMNS}, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row
+                )
+            RESULT_STORE_WRITES.inc(outcome="ok")
+        except Exception as e:
+            RESULT_STORE_WRITES.inc(outcome="error")
+            logger.error(f"Failed to store evaluation {row[0]}: {str(e)}")
+
+    def save(self, job_id: str, resume_hash: str, candidate_name: Optional[str], result: Dict[str, Any]) -> Optional[str]:
+        """Queue a finished evaluation (FitEvaluationResponse dict) for writing; returns its id"""
+        if not self.enabled:
+            return None
+        evaluation_id = uuid.uuid4().hex
+        row = (
+            evaluation_id, job_id, candidate_name, resume_hash,
+            result["fit_score"], float(result["fit_percentage"]), result["scoring_mode"],
+            int(result["early_terminated"]), time.time(),
+            json.dumps({**result, "evaluation_id": evaluation_id, "job_id": job_id}, default=str)
+        )
+        self._writer.submit(self._insert, row)
+        return evaluation_id
+
+    def flush(self):
+        """Wait for queued writes (the CLI calls this before exiting)"""
+        self._writer.submit(lambda: None).result()
+
+    def _query(self, sql: str, parameters: Tuple[Any, ...]) -> List[sqlite3.Row]:
+        if not self.enabled or not Path(self.path).exists():
+            return []
+        connection = sqlite3.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True)
+        connection.row_factory = sqlite3.Row
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def _list(self, job_id: Optional[str], candidate_name: Optional[str], min_fit_percentage: Optional[float],
+              sort: str, limit: int, offset: int, latest_only: bool) -> Dict[str, Any]:
+        conditions, parameters = [], []
+        for column, operator, value in (("job_id", "=", job_id), ("candidate_name", "=", candidate_name),
+                                        ("fit_percentage", ">=", min_fit_percentage)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        if latest_only:
+            conditions.append("superseded = 0")
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        total = self._query(f"SELECT COUNT(*) AS total FROM evaluations {where}", tuple(parameters))
+        rows = self._query(
+            f"SELECT {SUMMARY_COLUMNS} FROM evaluations {where} ORDER BY {SORT_ORDERS[sort]} LIMIT ? OFFSET ?",
+            (*parameters, limit, offset)
+        )
+        return {
+            "total": total[0]["total"] if total else 0,
+            "limit": limit,
+            "offset": offset,
+            "items": [{**dict(row), "early_terminated": bool(row["early_terminated"])} for row in rows],
+        }
+
+    async def list_evaluations(self, job_id: Optional[str] = None, candidate_name: Optional[str] = None,
+                               min_fit_percentage: Optional[float] = None, sort: str = "fit",
+                               limit: int = 20, offset: int = 0, latest_only: bool = True) -> Dict[str, Any]:
+        """
+        One page of stored evaluation summaries, best fit (``sort="fit"``)
+        or most recent first. With ``latest_only`` a resume re-evaluated for
+        the same job appears once, with its latest result.
+        """
+        return await asyncio.to_thread(self._list, job_id, candidate_name, min_fit_percentage,
+                                       sort, min(limit, RESULT_STORE_MAX_PAGE), offset, latest_only)
+
+    async def get_evaluation(self, evaluation_id: str) -> Optional[Dict[str, Any]]:
+        """The full stored FitEvaluationResponse, or None"""
+        rows = await asyncio.to_thread(
+            self._query, "SELECT result FROM evaluations WHERE evaluation_id = ?", (evaluation_id,)
+        )
+        return json.loads(rows[0]["result"]) if rows else None
+
+
+RESULT_STORE = ResultStore()
@@ -1,26 +1,45 @@
 import re
+import unicodedata
 from typing import List, Dict, Any, Tuple
 import logging
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Common CV section headings in English and French; matched accent- and case-insensitively
+SECTION_HEADINGS = (
+    "experience", "experiences", "work experience", "professional experience", "work history",
+    "employment history", "expérience professionnelle", "expériences professionnelles",
+    "education", "education and training", "formation académique", "formation", "formations", "diplômes",
+    "skills", "technical skills", "soft skills", "compétences techniques", "compétences",
+    "projects", "projets", "publications",
+    "languages", "langues", "certifications", "certificates",
+    "interests", "hobbies", "centres d'intérêt", "loisirs",
+    "summary", "profile", "profil", "about me", "à propos", "résumé", "objective", "objectif",
+    "connaissances", "awards", "distinctions", "volunteering", "bénévolat", "references", "références"
+)
+MAX_HEADING_LENGTH = 60  # Longer lines are never headings and are not normalised
+_NON_WORD = re.compile(r"[\W_]+")  # A single character class: no backtracking
+
+
+def normalize_heading(line: str) -> str:
+    """Casefolded, accent-free words of a line without numbering or punctuation ("2. Expérience :" -> "experience")"""
+    # Apostrophes are dropped, as _clean_text does ("d'intérêt" -> "dinteret")
+    text = line.casefold().replace("'", "").replace("\u2019", "")
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    words = _NON_WORD.sub(" ", text).split()
+    if words and words[0].isdigit():
+        words = words[1:]
+    return " ".join(words)
+
 class TextChunker:
     """Service for chunking text into semantic segments with CV support (English/French)"""
     
     def __init__(self, chunk_size: int = 500, overlap: int = 50):
         self.chunk_size = chunk_size
         self.overlap = overlap
-        # Common CV section headings in English and French
-        self.section_headings = [
-            "experience", "work experience", "professional experience", 
-            "education", "formation académique", "formation",
-            "skills", "compétences techniques", "compétences", 
-            "projects", "projets", "publications",
-            "languages", "langues", "certifications", 
-            "interests", "centres d'intérêt", "summary",
-            "rèsumè", "objective", "connaissances"
-        ]
+        self.section_headings = frozenset(normalize_heading(heading) for heading in SECTION_HEADINGS)
     
     def chunk_text(self, text: str) -> List[str]:
         """Split text into semantic chunks preserving CV structure"""
@@ -52,25 +71,23 @@ class TextChunker:
         return text.strip()
 
     def _split_into_sections(self, text: str) -> List[str]:
-        """Split text using common CV section headings"""
-        # Build regex pattern for headings (case-insensitive)
-        pattern = r'(?:\n|^)\s*([\w\s]+)\s*\n'
+        """
+        Split text before each line that is a CV section heading. One pass
+        over the lines with a set lookup, so the cost stays linear however
+        malformed the document is.
+        """
         sections = []
-        last_idx = 0
-        
-        for match in re.finditer(pattern, text, re.IGNORECASE):
-            header = match.group(1).strip().lower()
-            if header in self.section_headings:
-                # Add content before header as section
-                if match.start() > last_idx:
-                    sections.append(text[last_idx:match.start()])
-                # Start new section with header
-                sections.append(match.group().strip() + '\n')  # Preserve header
-                last_idx = match.end()
-        
-        # Add remaining text
-        if last_idx < len(text):
-            sections.append(text[last_idx:])
+        current: List[str] = []
+        for line in text.split('\n'):
+            stripped = line.strip()
+            if (stripped and len(stripped) <= MAX_HEADING_LENGTH
+                    and normalize_heading(stripped) in self.section_headings):
+                if current:
+                    sections.append('\n'.join(current))
+                current = []  # The heading starts the new section
+            current.append(line)
+        if current:
+            sections.append('\n'.join(current))
         return sections
 
     def _split_into_sentences(self, text: str) -> List[str]:
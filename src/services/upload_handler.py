@@ -0,0 +1,256 @@
+import os
+import codecs
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Optional
+from fastapi import HTTPException, UploadFile
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MEMORY_BYTES", str(1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+SNIFF_BYTES = 1024  # PDF readers accept the header anywhere in the first 1 KiB
+
+EXTENSION_TYPES = {".pdf": "pdf", ".docx": "docx", ".txt": "txt"}
+
+
+class UploadError(Exception):
+    """An upload rejected before parsing; ``status_code`` is the HTTP status to report"""
+    status_code = 400
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+class UnsupportedFileType(UploadError):
+    status_code = 415
+
+
+@dataclass
+class SpooledUpload:
+    """A validated upload, positioned at its first byte"""
+    file: BinaryIO
+    file_type: str
+    size: int
+    owned: bool = True  # False when reusing the framework's own spool file
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+
+
+def file_type_from_name(filename: str) -> str:
+    """Document type declared by the file extension"""
+    extension = os.path.splitext((filename or "").lower())[1]
+    if extension not in EXTENSION_TYPES:
+        raise UnsupportedFileType(f"Unsupported file type: {filename}")
+    return EXTENSION_TYPES[extension]
+
+
+def sniff_file_type(head: bytes) -> Optional[str]:
+    """Identify pdf / docx / txt from the first bytes of a file"""
+    if b"%PDF-" in head[:SNIFF_BYTES]:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        return "docx"  # A zip container; python-docx validates the parts
+    if b"\x00" in head:
+        return None
+    try:
+        # Incremental decoding tolerates a multi-byte character cut at the end
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return None
+    return "txt"
+
+
+def _check_type(filename: str, expected: str, head: bytes):
+    detected = sniff_file_type(head)
+    if detected != expected:
+        raise UnsupportedFileType(
+            f"{filename} does not look like a {expected.upper()} file"
+            + (f" (detected {detected.upper()})" if detected else "")
+        )
+
+
+async def spool_upload(file: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """
+    Validate an upload and return it as a seekable file without holding it
+    in memory.
+
+    The first bytes are sniffed against the type the extension claims.
+    API uploads were already sniffed by UploadLimitMiddleware as they
+    streamed in; this check covers other callers (the CLI). If
+    the framework already spooled the upload (Starlette's UploadFile does,
+    in a SpooledTemporaryFile) that file is used in place. Otherwise the
+    upload is streamed in chunks into a SpooledTemporaryFile that stays in
+    memory only up to UPLOAD_SPOOL_MEMORY_BYTES. Anything over
+    ``max_bytes`` (MAX_UPLOAD_BYTES) raises UploadTooLarge.
+    """
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    file_type = file_type_from_name(file.filename)
+    source = getattr(file, "file", None)
+
+    if source is not None and source.seekable():
+        source.seek(0)
+        _check_type(file.filename, file_type, source.read(SNIFF_BYTES))
+        size = source.seek(0, os.SEEK_END)
+        if size > max_bytes:
+            raise UploadTooLarge(f"{file.filename} is {size} bytes; the limit is {max_bytes} bytes")
+        source.seek(0)
+        return SpooledUpload(source, file_type, size, owned=False)
+
+    head = await file.read(SNIFF_BYTES)
+    _check_type(file.filename, file_type, head)
+
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+    try:
+        spool.write(head)
+        size = len(head)
+        while size <= max_bytes and (chunk := await file.read(UPLOAD_CHUNK_BYTES)):
+            size += len(chunk)
+            spool.write(chunk)
+        if size > max_bytes:
+            raise UploadTooLarge(f"{file.filename} exceeds the {max_bytes} byte upload limit")
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return SpooledUpload(spool, file_type, size)
+
+
+class _PartInspector:
+    """
+    Follows a multipart body as it streams in. Each part's size is counted
+    against ``max_bytes``, and the first bytes of each file part with a
+    known extension are sniffed against it (see ``sniff_file_type``). The
+    first problem is kept in ``error``.
+    """
+
+    def __init__(self, content_type: Optional[str], max_bytes: int):
+        self.max_bytes = max_bytes
+        self.error: Optional[UploadError] = None
+        self.parser = None
+        self._on_part_begin()
+        media_type, params = parse_options_header(content_type or "")
+        if media_type == b"multipart/form-data" and b"boundary" in params:
+            self.parser = MultipartParser(params[b"boundary"], {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            })
+
+    def _on_part_begin(self):
+        self.part_bytes = 0
+        self.filename: Optional[str] = None  # Set while the part's head is still being collected
+        self.head = b""
+        self._header_field = self._header_value = self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = self._header_value = b""
+
+    def _on_headers_finished(self):
+        filename = parse_options_header(self._disposition)[1].get(b"filename")
+        if filename is not None:
+            name = filename.decode("utf-8", "replace")
+            # Other extensions are left to the endpoint's own checks
+            if os.path.splitext(name.lower())[1] in EXTENSION_TYPES:
+                self.filename = name
+
+    def _on_part_data(self, data: bytes, start: int, end: int):
+        self.part_bytes += end - start
+        if self.part_bytes > self.max_bytes and self.error is None:
+            self.error = UploadTooLarge(f"An uploaded file exceeds the {self.max_bytes} byte upload limit")
+        if self.filename is not None:
+            self.head += data[start:min(end, start + SNIFF_BYTES - len(self.head))]
+            if len(self.head) >= SNIFF_BYTES:
+                self._sniff()
+
+    def _on_part_end(self):
+        if self.filename is not None:
+            self._sniff()
+
+    def _sniff(self):
+        filename, self.filename = self.filename, None
+        try:
+            _check_type(filename, file_type_from_name(filename), self.head)
+        except UploadError as e:
+            self.error = self.error or e
+
+    def feed(self, chunk: bytes) -> Optional[UploadError]:
+        """The first size or type problem found so far, if any"""
+        if self.parser is not None and chunk and self.error is None:
+            try:
+                self.parser.write(chunk)
+            except Exception:
+                self.parser = None  # Malformed; the form parser reports it
+        return self.error
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware checking uploads while the body streams in, before the
+    form parser spools it to disk: at most ``max_request_bytes`` per
+    request (``path_limits`` overrides it per path) and ``max_file_bytes``
+    per multipart part, and file parts whose first bytes don't match their
+    extension. A declared Content-Length over the limit is rejected before
+    anything is read. Chunked or mis-declared bodies are counted as they
+    arrive, and so are the parts. Size rejections are ``413``, type
+    mismatches ``415``.
+    """
+
+    def __init__(self, app, max_request_bytes: int, path_limits: Optional[Dict[str, int]] = None,
+                 max_file_bytes: int = MAX_UPLOAD_BYTES):
+        self.app = app
+        self.max_request_bytes = max_request_bytes
+        self.path_limits = path_limits or {}
+        self.max_file_bytes = max_file_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.max_request_bytes)
+        headers = Headers(scope=scope)
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(status_code=413, content={"detail": f"Request body exceeds {limit} bytes"})
+            await response(scope, receive, send)
+            return
+
+        parts = _PartInspector(headers.get("content-type"), self.max_file_bytes)
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                received += len(chunk)
+                # Raised inside the form parser, which passes HTTPExceptions through
+                if received > limit:
+                    raise HTTPException(status_code=413, detail=f"Request body exceeds {limit} bytes")
+                error = parts.feed(chunk)
+                if error is not None:
+                    raise HTTPException(status_code=error.status_code, detail=str(error))
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -1,15 +1,68 @@
 import faiss
 import numpy as np
+import asyncio
 from typing import List, Dict, Any, Optional
 import logging
 import pickle
 from pathlib import Path
 import re
 import os
+import time
 from openai import AzureOpenAI
 
+from .metrics import (
+    EMBEDDING_REQUEST_DURATION,
+    EMBEDDING_REQUESTS,
+    EMBEDDING_INPUTS,
+    VECTOR_SEARCH_DURATION
+)
+from .rate_limiter import EMBEDDING_SCHEDULER, estimate_tokens
+
 logger = logging.getLogger(__name__)
 
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "384"))  # Requested from the API (truncated vectors)
+# Index storage: "flat" (float32), "fp16", "sq8" (8-bit scalar quantiser) or "pq" (product quantiser)
+VECTOR_INDEX_TYPE = os.getenv("VECTOR_INDEX_TYPE", "flat")
+VECTOR_INDEX_TRAIN_SIZE = int(os.getenv("VECTOR_INDEX_TRAIN_SIZE", "10000"))  # Kept flat until sq8/pq is trained
+VECTOR_PQ_SUBQUANTIZERS = int(os.getenv("VECTOR_PQ_SUBQUANTIZERS", "0"))  # 0: dimension / 8 (one byte per 8 dims)
+INDEX_TYPES = ("flat", "fp16", "sq8", "pq")
+TRAINED_INDEX_TYPES = ("sq8", "pq")
+
+if VECTOR_INDEX_TYPE == "pq":
+    logger.warning("VECTOR_INDEX_TYPE=pq: recall@10 was about 0.3 in benchmarks/vector_index.py; "
+                   "check it on your own embeddings (--embeddings) before relying on it")
+if VECTOR_INDEX_TYPE in TRAINED_INDEX_TYPES:
+    # Evaluations clear their store, so only indexes kept with save_index/load_index grow this large
+    logger.info(f"VECTOR_INDEX_TYPE={VECTOR_INDEX_TYPE} applies to long-lived indexes once they hold "
+                f"{VECTOR_INDEX_TRAIN_SIZE} vectors; per-evaluation stores stay flat")
+
+
+def create_index(index_type: str, dimension: int) -> faiss.Index:
+    """Empty inner-product index with the given vector storage; sq8 and pq must be trained before use"""
+    if index_type == "flat":
+        return faiss.IndexFlatIP(dimension)
+    if index_type == "fp16":
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    if index_type == "sq8":
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    if index_type == "pq":
+        subquantizers = VECTOR_PQ_SUBQUANTIZERS or max(1, dimension // 8)
+        if dimension % subquantizers:
+            raise ValueError(f"PQ needs a dimension divisible by {subquantizers} subquantizers, got {dimension}")
+        return faiss.IndexPQ(dimension, subquantizers, 8, faiss.METRIC_INNER_PRODUCT)
+    raise ValueError(f"Unknown vector index type '{index_type}' (expected one of: {', '.join(INDEX_TYPES)})")
+
+
+def truncate_embeddings(embeddings: np.ndarray, dimension: int) -> np.ndarray:
+    """
+    Keep the first ``dimension`` components and re-normalise. text-embedding-3
+    vectors are trained so that this is equivalent to requesting fewer
+    ``dimensions`` from the API.
+    """
+    truncated = np.ascontiguousarray(embeddings[:, :dimension], dtype='float32')
+    faiss.normalize_L2(truncated)
+    return truncated
+
 
 # Azure OpenAI and Search Index Clients
 openai_client = AzureOpenAI(
@@ -17,16 +70,24 @@ openai_client = AzureOpenAI(
     api_key=os.getenv("azure_openai_api_key"),
     api_version="2024-06-01"
 )
+# For the async path, where EMBEDDING_SCHEDULER owns retries and 429 backoff
+scheduled_openai_client = openai_client.with_options(max_retries=0)
+
 class VectorStore:
     """FAISS vector store for resume and job requirement matching"""
     
-    def __init__(self, model_name: str = "text-embedding-3-large", dimension: int = 384):
+    def __init__(self, model_name: str = "text-embedding-3-large", dimension: int = EMBEDDING_DIMENSIONS,
+                 index_type: str = VECTOR_INDEX_TYPE, train_size: int = VECTOR_INDEX_TRAIN_SIZE):
         self.model_name = model_name
         self.dimension = dimension
         self.embedding_model = model_name
+        self.priority = "interactive"  # Rate-limit queue class: "interactive" or "batch"
+        self.index_type = index_type
+        self.train_size = train_size
         
         # Initialize FAISS index
-        self.index = faiss.IndexFlatIP(dimension)
+        create_index(index_type, dimension)  # Fail fast on a bad configuration
+        self.index = self._new_index()
         
         # Document storage with type tracking
         self.documents = []
@@ -37,7 +98,38 @@ class VectorStore:
         self.storage_dir = Path("./faiss_storage")
         self.storage_dir.mkdir(exist_ok=True)
         
-        logger.info(f"Initialized VectorStore with {model_name} (dim={dimension})")
+        logger.info(f"Initialized VectorStore with {model_name} (dim={dimension}, index={index_type})")
+
+    def _new_index(self) -> faiss.Index:
+        """
+        Empty index for ``index_type``. sq8 and pq need training data, so
+        they start as a flat index and are built by ``_maybe_compress``
+        once ``train_size`` vectors are stored; small per-evaluation stores
+        therefore stay exact.
+        """
+        if self.index_type in TRAINED_INDEX_TYPES:
+            return faiss.IndexFlatIP(self.dimension)
+        return create_index(self.index_type, self.dimension)
+
+    def _maybe_compress(self):
+        """Train the configured sq8/pq index on the stored vectors and move them into it"""
+        if (self.index_type not in TRAINED_INDEX_TYPES or not isinstance(self.index, faiss.IndexFlat)
+                or self.index.ntotal < self.train_size):
+            return
+        start = time.perf_counter()
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        index = create_index(self.index_type, self.dimension)
+        index.train(vectors)
+        index.add(vectors)
+        before = self.memory_bytes
+        self.index = index
+        logger.info(f"Compressed {index.ntotal} vectors to {self.index_type} in {time.perf_counter() - start:.2f}s "
+                    f"({before / 2**20:.1f} -> {self.memory_bytes / 2**20:.1f} MiB)")
+
+    @property
+    def memory_bytes(self) -> int:
+        """Bytes of vector storage held by the index"""
+        return self.index.code_size * self.index.ntotal
 
     def _preprocess_text(self, text: str) -> str:
         """Clean and normalize text before embedding"""
@@ -45,6 +137,58 @@ class VectorStore:
         text = re.sub(r'\s+', ' ', text).strip()
         return text
 
+    def _create_embeddings(self, inputs: Any, operation: str, client: AzureOpenAI = openai_client):
+        """Call the embeddings API, recording latency and request counters"""
+        start = time.perf_counter()
+        try:
+            response = client.embeddings.create(
+                input=inputs,
+                model=self.embedding_model,
+                dimensions=self.dimension
+            )
+        except Exception:
+            EMBEDDING_REQUESTS.inc(operation=operation, outcome="error")
+            raise
+        EMBEDDING_REQUEST_DURATION.observe(time.perf_counter() - start, operation=operation)
+        EMBEDDING_REQUESTS.inc(operation=operation, outcome="success")
+        EMBEDDING_INPUTS.inc(len(inputs) if isinstance(inputs, list) else 1, operation=operation)
+        return response
+
+    def embed_texts(self, texts: List[str], operation: str = "embed",
+                    client: AzureOpenAI = openai_client) -> np.ndarray:
+        """Embed texts into an (n, dimension) float32 matrix of unit vectors"""
+        cleaned = [self._preprocess_text(text) for text in texts]
+        response = self._create_embeddings(cleaned, operation, client)
+        embeddings = np.array(
+            [item.embedding for item in sorted(response.data, key=lambda item: item.index)],
+            dtype='float32'
+        )
+        # Normalise so inner product == cosine similarity
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    async def aembed_texts(self, texts: List[str], operation: str = "embed") -> np.ndarray:
+        """Embed texts without blocking the event loop, paced by EMBEDDING_SCHEDULER"""
+        return await EMBEDDING_SCHEDULER.submit(
+            lambda: asyncio.to_thread(self.embed_texts, texts, operation, scheduled_openai_client),
+            tokens=sum(estimate_tokens(text) for text in texts),
+            priority=self.priority
+        )
+
+    def add_embeddings(self, texts: List[str], embeddings: np.ndarray, doc_type: str,
+                       metadata: Optional[Dict[str, Any]] = None):
+        """Add pre-computed embeddings for texts of the given type to the index"""
+        if len(texts) != len(embeddings):
+            raise ValueError(f"Got {len(texts)} texts but {len(embeddings)} embeddings")
+        if embeddings.shape[1] > self.dimension:
+            embeddings = truncate_embeddings(embeddings, self.dimension)
+        self.index.add(np.ascontiguousarray(embeddings, dtype='float32'))
+        self.documents.extend(self._preprocess_text(text) for text in texts)
+        self.metadata.extend([metadata or {}] * len(texts))
+        self.document_types.extend([doc_type] * len(texts))
+        logger.info(f"Added {len(texts)} {doc_type} documents")
+        self._maybe_compress()
+
     def add_resume_chunks(self, chunks: List[str], metadata: Optional[Dict[str, Any]] = None):
         """Add resume chunks to the vector store"""
         if not chunks:
@@ -52,22 +196,8 @@ class VectorStore:
             return
 
         try:
-            cleaned_chunks = [self._preprocess_text(chunk) for chunk in chunks]
-            response = openai_client.embeddings.create(
-                input=cleaned_chunks,
-                model=self.embedding_model
-            )
-            embeddings = response.data[0].embedding
-            
-            if len(embeddings) > 0:
-                
-                self.documents.extend(cleaned_chunks)
-                self.metadata.extend([metadata or {}] * len(cleaned_chunks))
-                self.document_types.extend(['resume'] * len(cleaned_chunks))
-                logger.info(f"Added {len(cleaned_chunks)} resume chunks")
-            else:
-                logger.warning("No valid embeddings generated for resume chunks")
-
+            embeddings = self.embed_texts(chunks, "resume_chunks")
+            self.add_embeddings(chunks, embeddings, 'resume', metadata)
         except Exception as e:
             logger.error(f"Error adding resume chunks: {str(e)}")
             raise ValueError("Failed to add resume chunks") from e
@@ -79,27 +209,14 @@ class VectorStore:
             return
 
         try:
-            cleaned_reqs = [self._preprocess_text(req) for req in requirements]
-            response = openai_client.embeddings.create(
-                input=cleaned_reqs,
-                model=self.embedding_model
-            )
-            embeddings = response.data[0].embedding
-            
-            if len(embeddings) > 0:
-                
-                self.documents.extend(cleaned_reqs)
-                self.metadata.extend([metadata or {}] * len(cleaned_reqs))
-                self.document_types.extend(['job'] * len(cleaned_reqs))
-                logger.info(f"Added {len(cleaned_reqs)} job requirements")
-            else:
-                logger.warning("No valid embeddings generated for job requirements")
-
+            embeddings = self.embed_texts(requirements, "job_requirements")
+            self.add_embeddings(requirements, embeddings, 'job', metadata)
         except Exception as e:
             logger.error(f"Error adding job requirements: {str(e)}")
             raise ValueError("Failed to add job requirements") from e
 
-    def find_similar_chunks(self, query: str, n_results: int = 5, doc_type: str = "resume") -> List[Dict[str, Any]]:
+    def find_similar_chunks(self, query: str, n_results: int = 5, doc_type: str = "resume",
+                            query_embedding: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
         """
         Find similar chunks (keeping your original function name)
         
@@ -107,6 +224,7 @@ class VectorStore:
             query: Search query text
             n_results: Number of results to return
             doc_type: Type of documents to search ('resume' or 'job')
+            query_embedding: Pre-computed query embedding; skips the embedding call
             
         Returns:
             List of results with text, metadata, and similarity score
@@ -115,36 +233,35 @@ class VectorStore:
             logger.warning("No documents available for search")
             return []
 
+        search_start = time.perf_counter()
         try:
-            clean_query = self._preprocess_text(query)
-            response = openai_client.embeddings.create(
-                input=clean_query,
-                model=self.embedding_model
-            )
-            query_embedding = response.data[0].embedding
+            if query_embedding is None:
+                query_embedding = self.embed_texts([query], "query")[0]
+            query_vector = np.asarray(query_embedding, dtype='float32').reshape(1, -1)
+            if query_vector.shape[1] > self.dimension:
+                query_vector = truncate_embeddings(query_vector, self.dimension)
             
             # Get indices of documents of the requested type
             if doc_type:
-                type_indices = [i for i, t in enumerate(self.document_types) if t == doc_type]
+                type_indices = {i for i, t in enumerate(self.document_types) if t == doc_type}
                 if not type_indices:
                     logger.warning(f"No documents of type '{doc_type}' available")
                     return []
                 k = min(n_results, len(type_indices))
             else:
-                type_indices = range(len(self.documents))
+                type_indices = set(range(len(self.documents)))
                 k = min(n_results, len(self.documents))
             
-            # Search the full index
-            distances, indices = self.index.search(
-                query_embedding.astype('float32'), 
-                len(self.documents)
-            )
+            # Search the full index when results have to be filtered by type
+            search_k = k if len(type_indices) == len(self.documents) else len(self.documents)
+            distances, indices = self.index.search(query_vector, search_k)
             
             # Filter results by document type and get top k
             results = []
             for i, distance in zip(indices[0], distances[0]):
                 if i in type_indices and 0 <= i < len(self.documents):
                     results.append({
+                        'id': int(i),
                         'document': self.documents[i],
                         'metadata': self.metadata[i],
                         'distance': float(distance),
@@ -153,26 +270,45 @@ class VectorStore:
                     if len(results) >= k:
                         break
             
+            VECTOR_SEARCH_DURATION.observe(time.perf_counter() - search_start, doc_type=doc_type or "all")
             return sorted(results, key=lambda x: x['distance'], reverse=True)
 
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
             return []
 
+    def select_diverse(self, query_embedding: np.ndarray, candidates: List[Dict[str, Any]],
+                       max_results: int = 3, min_similarity: float = 0.0,
+                       diversity: float = 0.3) -> List[Dict[str, Any]]:
+        """
+        Maximal marginal relevance over ``find_similar_chunks`` results:
+        repeatedly pick the candidate with the best trade-off between
+        similarity to the query and novelty against the chunks already
+        picked (``diversity`` weighs novelty). Candidates below
+        ``min_similarity`` are dropped, but the best one is always kept.
+        """
+        if not candidates:
+            return []
+        ranked = sorted(candidates, key=lambda c: c['distance'], reverse=True)
+        pool = [ranked[0]] + [c for c in ranked[1:] if c['distance'] >= min_similarity]
+        vectors = np.vstack([self.index.reconstruct(c['id']) for c in pool])
+        query_similarity = np.array([c['distance'] for c in pool], dtype='float32')
+        
+        selected = [0]
+        redundancy = vectors @ vectors[0]  # max similarity of each candidate to the selection
+        while len(selected) < min(max_results, len(pool)):
+            scores = (1 - diversity) * query_similarity - diversity * redundancy
+            scores[selected] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            redundancy = np.maximum(redundancy, vectors @ vectors[best])
+        return [pool[i] for i in selected]
+
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """Calculate cosine similarity between two texts"""
         try:
-            clean_text1 = self._preprocess_text(text1)
-            clean_text2 = self._preprocess_text(text2)
-            response = openai_client.embeddings.create(
-                input=clean_text1 + clean_text2,
-                model=self.embedding_model
-            )
-            embeddings = response.data[0].embedding
-            
-            similarity = np.dot(embeddings[0], embeddings[1]) / (
-                np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-            )
+            embeddings = self.embed_texts([text1, text2], "similarity")
+            similarity = float(np.dot(embeddings[0], embeddings[1]))
             
             return float(max(0, min(1, similarity)))
             
@@ -194,7 +330,8 @@ class VectorStore:
                     'document_types': self.document_types,
                     'config': {
                         'model_name': self.model_name,
-                        'dimension': self.dimension
+                        'dimension': self.dimension,
+                        'index_type': self.index_type
                     }
                 }, f)
             
@@ -228,6 +365,10 @@ class VectorStore:
                     logger.warning(f"Loaded model {config.get('model_name')} doesn't match current {self.model_name}")
                 if config.get('dimension') != self.dimension:
                     raise ValueError(f"Dimension mismatch: loaded {config.get('dimension')} vs current {self.dimension}")
+                if config.get('index_type', 'flat') != self.index_type:
+                    logger.warning(f"Loaded {config.get('index_type', 'flat')} index; configured for {self.index_type}")
+            
+            self._maybe_compress()
             
             logger.info(f"Loaded index from {self.storage_dir}/{filename}.*")
             return True
@@ -238,7 +379,7 @@ class VectorStore:
 
     def clear_collections(self):
         """Reset the vector store to empty state"""
-        self.index = faiss.IndexFlatIP(self.dimension)
+        self.index = self._new_index()
         self.documents = []
         self.metadata = []
         self.document_types = []
@@ -0,0 +1,106 @@
+"""
+End-to-end fixtures: the app runs against the local Groq and Azure
+stand-ins from ``benchmarks.fake_servers``, started once per session.
+Environment variables are set before any application module is imported.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+LLM_PORT, EMBEDDING_PORT = _free_port(), _free_port()
+os.environ.update({
+    "CROQ_API_KEY": "test",
+    "GROQ_BASE_URL": f"http://127.0.0.1:{LLM_PORT}",
+    "AZURE_OPENAI_ENDPOINT": f"http://127.0.0.1:{EMBEDDING_PORT}",
+    "azure_openai_api_key": "test",
+    "RESULT_STORE_PATH": "",
+})
+
+RESUME = """Jane Doe
+Backend engineer
+
+Experience
+Senior Python developer at Acme, 2018-2024. Built Docker based deployment pipelines.
+Python developer at Initech, 2015-2018.
+
+Education
+Masters degree in Computer Science, 2015
+
+Languages
+English (fluent), French
+"""
+
+JOB_DESCRIPTION = b"""Senior Backend Engineer.
+Requirements:
+- 3+ years of professional experience with Python
+- Experience deploying Docker in production
+- Masters degree in Computer Science or equivalent
+- Fluent English
+"""
+
+
+@pytest.fixture(scope="session")
+def fake_servers():
+    from benchmarks.fake_servers import LatencyProfile, create_embedding_app, create_llm_app, serve
+
+    started = threading.Event()
+
+    def run():
+        loop = asyncio.new_event_loop()
+
+        async def main():
+            await serve(create_llm_app(LatencyProfile(base=0.01, jitter=0.0)), LLM_PORT)
+            await serve(create_embedding_app(LatencyProfile(base=0.0, jitter=0.0)), EMBEDDING_PORT)
+            started.set()
+            await asyncio.Event().wait()
+
+        loop.run_until_complete(main())
+
+    threading.Thread(target=run, daemon=True).start()
+    assert started.wait(10), "fake servers did not start"
+
+
+@pytest.fixture(scope="session")
+def client(fake_servers):
+    from fastapi.testclient import TestClient
+
+    import app
+
+    with TestClient(app.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def resume_docx(tmp_path_factory) -> bytes:
+    from benchmarks.corpus import write_docx
+
+    path = tmp_path_factory.mktemp("documents") / "resume.docx"
+    write_docx(path, [block.splitlines() for block in RESUME.split("\n\n")])
+    return path.read_bytes()
+
+
+@pytest.fixture
+def documents(resume_docx):
+    """Multipart ``files`` for a resume (DOCX) and job description (TXT)"""
+    def build(resume: bytes = resume_docx, job_description: bytes = JOB_DESCRIPTION):
+        return {
+            "resume_file": ("resume.docx", resume),
+            "job_description_file": ("job.txt", job_description, "text/plain"),
+        }
+    return build
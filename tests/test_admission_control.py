@@ -0,0 +1,12 @@
+from src.services.admission_control import NARRATIVE_ADMISSION
+
+
+def test_fit_narrative_is_shed_when_its_pool_is_full(client, monkeypatch):
+    monkeypatch.setattr(NARRATIVE_ADMISSION, "in_flight", NARRATIVE_ADMISSION.max_in_flight)
+    monkeypatch.setattr(NARRATIVE_ADMISSION, "max_queued", 0)
+
+    response = client.post("/fit-narrative", json={"candidate_profile": {}, "requirement_matches": []})
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert client.get("/health").json()["admission"]["narratives"]["in_flight"] == NARRATIVE_ADMISSION.max_in_flight
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from src.models.request_models import EvaluationOptions
+from src.services.candidate_evaluator import CandidateEvaluator
+from src.services.evaluation_budget import EvaluationBudget, MATCH_BATCH_MAX
+
+
+@pytest.fixture(scope="module")
+def evaluator():
+    return CandidateEvaluator()
+
+
+def plan(evaluator, mandatory, max_llm_calls, scoring_mode="local", embeddings=None):
+    """``_plan_matching`` over requirements with the given must-have flags and orthogonal embeddings"""
+    requirements = [{"requirement": f"Requirement {i}", "mandatory": flag} for i, flag in enumerate(mandatory)]
+    embeddings = np.eye(len(mandatory), dtype="float32") if embeddings is None else embeddings
+    budget = EvaluationBudget(max_llm_calls=max_llm_calls)
+    groups, merged = evaluator._plan_matching(list(range(len(mandatory))), requirements, embeddings,
+                                              EvaluationOptions(scoring_mode=scoring_mode), budget)
+    return groups, merged, budget
+
+
+def test_plan_within_budget_is_not_degraded(evaluator):
+    groups, merged, budget = plan(evaluator, [False, True, False], max_llm_calls=4, scoring_mode="llm")
+
+    assert groups == [[1], [0], [2]]  # Must-haves first
+    assert merged == {}
+    assert budget.llm_summary and budget.degradations == []
+
+
+def test_summary_call_is_given_up_first(evaluator):
+    groups, _, budget = plan(evaluator, [True, False, False], max_llm_calls=3, scoring_mode="llm")
+
+    assert groups == [[0], [1], [2]]
+    assert not budget.llm_summary
+    assert len(budget.degradations) == 1 and "Scored locally" in budget.degradations[0]
+
+
+def test_near_duplicates_are_merged_before_batching(evaluator):
+    embeddings = np.array([[1, 0, 0], [0, 1, 0], [0.99, 0.01, 0]], dtype="float32")
+
+    groups, merged, budget = plan(evaluator, [True, False, False], max_llm_calls=2, embeddings=embeddings)
+
+    assert merged == {2: 0}
+    assert groups == [[0], [1]]
+    assert [degradation.split()[0] for degradation in budget.degradations] == ["Merged"]
+
+
+def test_batches_keep_must_haves_apart_while_they_fit(evaluator):
+    groups, _, budget = plan(evaluator, [True, True, False, False, False], max_llm_calls=2)
+    assert groups == [[0, 1], [2, 3, 4]]
+    assert budget.degradations == ["Evaluated up to 3 requirements per LLM call"]
+
+    groups, _, _ = plan(evaluator, [True, True, False, False, False], max_llm_calls=1)
+    assert groups == [[0, 1, 2, 3, 4]]
+
+
+def test_nice_to_haves_are_dropped_before_must_haves(evaluator):
+    mandatory = [True] + [False] * MATCH_BATCH_MAX
+
+    groups, _, budget = plan(evaluator, mandatory, max_llm_calls=1)
+
+    assert groups == [list(range(MATCH_BATCH_MAX))]
+    assert budget.degradations[-1] == "Skipped 1 requirement(s) (0 mandatory) beyond the 1 LLM call budget"
+
+
+def test_nothing_is_planned_when_extraction_used_the_budget(evaluator):
+    requirements = [{"requirement": "Python", "mandatory": True}, {"requirement": "Go", "mandatory": False}]
+    budget = EvaluationBudget(max_llm_calls=2)
+    budget.set_aside(2)
+
+    groups, _ = evaluator._plan_matching([0, 1], requirements, np.eye(2, dtype="float32"),
+                                         EvaluationOptions(scoring_mode="local"), budget)
+
+    assert groups == []
+    assert budget.degradations == ["Skipped 2 requirement(s) (1 mandatory): extraction used the 2 LLM call budget"]
+
+
+def test_failed_knockout_stops_before_nice_to_haves(client, documents):
+    job_description = b"""Security Engineer.
+Requirements:
+- Must have a security clearance
+- Experience with GraphQL APIs
+- Familiarity with Kafka streaming
+"""
+    response = client.post("/evaluate-fit", files=documents(job_description=job_description),
+                           data={"scoring_mode": "local", "early_exit": "true", "knockout_confidence": "0.5",
+                                 "use_cache": "false"})
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["early_terminated"]
+    assert result["failed_knockouts"] == ["Must have a security clearance"]
+    assert [match["requirement"] for match in result["requirement_matches"]] == ["Must have a security clearance"]
+    assert "Experience with GraphQL APIs" in result["skipped_requirements"]
+    assert result["fit_score"] == "Poor Fit"
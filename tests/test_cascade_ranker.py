@@ -0,0 +1,33 @@
+import numpy as np
+
+from src.services.cascade_ranker import requirement_coverage
+
+REQUIREMENTS = np.eye(2, dtype="float32")  # Two orthogonal requirement directions
+
+
+def chunks(*similarities):
+    """Chunk embeddings whose dot products with the two requirements are ``similarities``"""
+    return np.array(similarities, dtype="float32").reshape(-1, 2)
+
+
+def test_coverage_takes_each_applicants_best_chunk():
+    embeddings = chunks((0.2, 0.5), (0.6, 0.3),  # Applicant 0
+                        (0.4, 0.1))  # Applicant 1
+
+    coverage = requirement_coverage(REQUIREMENTS, embeddings, [2, 1], floor=0.2, ceiling=0.6)
+
+    np.testing.assert_allclose(coverage, [[1.0, 0.75], [0.5, 0.0]], atol=1e-6)
+
+
+def test_applicants_without_chunks_keep_their_neighbours_offsets():
+    embeddings = chunks((0.6, 0.2),  # Applicant 1
+                        (0.2, 0.2), (0.2, 0.6))  # Applicant 3
+
+    coverage = requirement_coverage(REQUIREMENTS, embeddings, [0, 1, 0, 2, 0], floor=0.2, ceiling=0.6)
+
+    np.testing.assert_allclose(coverage, [[0, 0], [1, 0], [0, 0], [0, 1], [0, 0]], atol=1e-6)
+
+
+def test_no_chunks_or_requirements_gives_zero_coverage():
+    assert not requirement_coverage(REQUIREMENTS, chunks(), [0, 0]).any()
+    assert requirement_coverage(np.empty((0, 2), dtype="float32"), chunks((0.5, 0.5)), [1]).shape == (1, 0)
@@ -0,0 +1,17 @@
+import asyncio
+import io
+
+from fastapi import UploadFile
+
+from src.services.document_parser import DocumentParser
+from src.services.text_chunker import TextChunker
+
+
+def test_parsed_resume_keeps_the_lines_section_detection_needs(resume_docx):
+    upload = UploadFile(file=io.BytesIO(resume_docx), filename="resume.docx")
+
+    text = asyncio.run(DocumentParser.parse_document(upload))
+    sections = TextChunker()._split_into_sections(text)
+
+    assert "\nExperience\n" in text
+    assert [section.split("\n", 1)[0] for section in sections] == ["Jane Doe", "Experience", "Education", "Languages"]
@@ -0,0 +1,46 @@
+import io
+import zipfile
+
+from docx import Document
+from docx.shared import Inches
+
+from src.services.docx_extractor import extract_docx_text
+from src.services.document_parser import DocumentParser
+
+
+def saved(document: Document) -> io.BytesIO:
+    buffer = io.BytesIO()
+    document.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_tab_stops_are_not_extracted_as_tabs():
+    document = Document()
+    paragraph = document.add_paragraph()
+    for position in (1, 2, 3):
+        paragraph.paragraph_format.tab_stops.add_tab_stop(Inches(position))
+    paragraph.add_run("Python\t5 years")
+    document.add_paragraph("Docker")
+    buffer = saved(document)
+
+    with zipfile.ZipFile(buffer) as archive:
+        assert b"<w:tabs>" in archive.read("word/document.xml")
+    buffer.seek(0)
+    assert extract_docx_text(buffer) == "Python\t5 years\nDocker\n"
+
+
+def test_table_rows_stay_on_one_line():
+    document = Document()
+    table = document.add_table(rows=2, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"r{r}c{c}"
+    table.rows[1].cells[2].add_paragraph("more")
+    buffer = saved(document)
+
+    text = extract_docx_text(buffer)
+    buffer.seek(0)
+
+    assert text == "r0c0 r0c1 r0c2 \nr1c0 r1c1 r1c2 more \n"
+    assert text == DocumentParser._extract_docx_text_python_docx(buffer)
@@ -0,0 +1,40 @@
+import pytest
+
+from src.models.response_models import RequirementMatch
+from src.services.fit_scorer import FitScorer
+
+
+@pytest.mark.parametrize("budget", [{"max_llm_calls": "1"}, {"max_prompt_tokens": "300"}])
+@pytest.mark.parametrize("scoring_mode", ["llm", "local"])
+def test_budget_below_extraction_still_returns_a_result(client, documents, budget, scoring_mode):
+    response = client.post("/evaluate-fit", files=documents(),
+                           data={**budget, "scoring_mode": scoring_mode, "use_cache": "false"})
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["candidate_profile"]["skills"] or result["candidate_profile"]["experience"]
+    assert result["requirement_matches"] == []
+    assert len(result["skipped_requirements"]) == 4
+    assert result["degradations"]
+    assert result["fit_percentage"] == 0.0
+    assert result["fit_score"] == "Poor Fit"
+
+
+def test_dropped_requirements_never_raise_the_score():
+    scorer = FitScorer()
+    matches = [
+        RequirementMatch(requirement="Python", match=True, confidence=0.9, explanation="", mandatory=True),
+        RequirementMatch(requirement="Degree", match=True, confidence=0.8, explanation="", mandatory=True),
+        RequirementMatch(requirement="Docker", match=False, confidence=0.7, explanation="", mandatory=False),
+        RequirementMatch(requirement="English", match=True, confidence=0.6, explanation="", mandatory=False),
+    ]
+    full = scorer.score(matches)
+
+    for kept in range(len(matches)):
+        dropped = matches[kept:]
+        partial = scorer.score(matches[:kept], unevaluated=len(dropped),
+                               unevaluated_mandatory=sum(match.mandatory for match in dropped))
+        assert partial["fit_percentage"] <= full["fit_percentage"]
+    nothing_evaluated = scorer.score([], unevaluated=4, unevaluated_mandatory=2)
+    assert nothing_evaluated["fit_percentage"] == 0.0
+    assert "0 of 2 must-haves" in nothing_evaluated["explanation"]
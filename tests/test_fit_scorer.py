@@ -0,0 +1,40 @@
+import pytest
+
+from src.models.response_models import RequirementMatch
+from src.services.fit_scorer import FitScorer
+
+
+def match(met, confidence, mandatory=False, requirement="Python"):
+    return RequirementMatch(requirement=requirement, match=met, confidence=confidence, explanation="",
+                            mandatory=mandatory)
+
+
+@pytest.mark.parametrize("percentage, bucket", [
+    (100.0, "Strong Fit"), (80.0, "Strong Fit"), (79.9, "Moderate Fit"), (60.0, "Moderate Fit"),
+    (59.9, "Weak Fit"), (40.0, "Weak Fit"), (39.9, "Poor Fit"), (0.0, "Poor Fit"),
+])
+def test_bucket_lower_bounds_are_inclusive(percentage, bucket):
+    assert FitScorer().bucket(percentage) == bucket
+
+
+def test_custom_thresholds_are_ordered_best_first():
+    scorer = FitScorer(thresholds=[("Weak Fit", 30.0), ("Strong Fit", 90.0), ("Moderate Fit", 50.0)])
+
+    assert [scorer.bucket(value) for value in (95.0, 60.0, 35.0, 10.0)] == [
+        "Strong Fit", "Moderate Fit", "Weak Fit", "Poor Fit"]
+
+
+def test_score_weighs_must_haves_and_confidence():
+    # Must-have met at 0.9 (2 x 0.9) and nice-to-have missed at 0.7 (1 x 0.3): 2.1 of 3
+    result = FitScorer().score([match(True, 0.9, mandatory=True), match(False, 0.7, requirement="Docker")])
+
+    assert result["fit_percentage"] == 70.0
+    assert result["fit_score"] == "Moderate Fit"
+
+
+def test_failed_knockout_caps_the_bucket():
+    result = FitScorer().score([match(True, 1.0)] * 9 + [match(False, 0.9, mandatory=True)],
+                               failed_knockouts=["Python"])
+
+    assert result["fit_percentage"] > 80.0
+    assert result["fit_score"] == "Poor Fit"
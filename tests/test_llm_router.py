@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services.evaluation_budget import EvaluationBudget
+from src.services.llm_router import LatencyTracker, LLMRoute, LLMRouter
+from src.services.llm_service import LLMService
+from src.services.rate_limiter import RateLimitScheduler
+
+
+class ScriptedCompletions:
+    """``chat.completions`` whose n-th call answers after ``delays[n]`` seconds"""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = 0
+
+    async def create(self, model, **request):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        usage = SimpleNamespace(total_tokens=10, prompt_tokens=5, completion_tokens=5)
+        message = SimpleNamespace(content="{}")
+        return SimpleNamespace(delay=delay, usage=usage, choices=[SimpleNamespace(message=message)])
+
+
+class CountingScheduler(RateLimitScheduler):
+    def __init__(self):
+        super().__init__("test")
+        self.acquired = 0
+
+    async def acquire(self, tokens=1, priority="interactive"):
+        self.acquired += 1
+        await super().acquire(tokens, priority)
+
+
+def router_for(completions, scheduler, stats):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return LLMRouter([LLMRoute("primary", client, "model")], hedge=True, initial_delay=0.05, min_delay=0.01,
+                     min_samples=1000, stats=stats, scheduler=scheduler)
+
+
+def test_hedge_pays_for_its_own_request():
+    completions, scheduler, stats = ScriptedCompletions([1.0, 0.01]), CountingScheduler(), LatencyTracker()
+
+    completion, _ = asyncio.run(router_for(completions, scheduler, stats).create("op", tokens=10))
+
+    assert completion.delay == 0.01  # The hedge won
+    assert completions.calls == 2
+    assert scheduler.acquired == 2
+
+
+def test_losing_attempts_are_recorded():
+    completions, scheduler, stats = ScriptedCompletions([1.0, 0.01]), CountingScheduler(), LatencyTracker()
+
+    asyncio.run(router_for(completions, scheduler, stats).create("op", tokens=10))
+
+    samples = sorted(stats._samples[("primary", "op")])
+    assert len(samples) == 2  # The winning hedge and the cancelled straggler
+    assert samples[1] >= 0.05  # The straggler counts for at least the hedge delay
+
+
+def test_no_hedge_while_queued_in_the_scheduler():
+    completions, stats = ScriptedCompletions([0.01]), LatencyTracker()
+    scheduler = CountingScheduler()
+    scheduler.backoff(0.2)  # Longer than the hedge delay
+
+    asyncio.run(router_for(completions, scheduler, stats).create("op", tokens=10))
+
+    assert completions.calls == 1
+    assert scheduler.acquired == 1
+
+
+@pytest.mark.parametrize("max_llm_calls, upstream_calls", [(1, 1), (2, 2)])
+def test_hedges_are_reserved_against_the_evaluation_budget(max_llm_calls, upstream_calls):
+    completions, scheduler, stats = ScriptedCompletions([0.3, 0.01]), CountingScheduler(), LatencyTracker()
+    service = LLMService()
+    service.router = router_for(completions, scheduler, stats)
+    service.budget = EvaluationBudget(max_llm_calls=max_llm_calls)
+
+    asyncio.run(service._call_groq_model("prompt", operation="op"))
+
+    assert completions.calls == upstream_calls  # No hedge when the budget has no room for it
+    assert service.budget.calls == upstream_calls
+    assert service.usage["calls"] == upstream_calls
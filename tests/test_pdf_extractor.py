@@ -0,0 +1,15 @@
+import importlib
+
+import pytest
+
+from src.services import pdf_extractor
+
+
+def test_unknown_pdf_engine_is_rejected_at_import(monkeypatch):
+    monkeypatch.setenv("PDF_ENGINE", "pdfminer")
+
+    with pytest.raises(ValueError, match="pdfium, pdfplumber"):
+        importlib.reload(pdf_extractor)
+
+    monkeypatch.undo()
+    importlib.reload(pdf_extractor)
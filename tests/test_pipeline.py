@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from src.services.pipeline import PipelineScheduler, Stage
+
+
+def sleeper(seconds):
+    async def run(deps):
+        await asyncio.sleep(seconds)
+        return seconds
+    return run
+
+
+def test_critical_path_follows_the_dependency_that_finished_last():
+    scheduler = PipelineScheduler([
+        Stage("parse", sleeper(0.01)),
+        Stage("profile", sleeper(0.01), ("parse",)),
+        Stage("requirements", sleeper(0.08), ("parse",)),
+        Stage("embed", sleeper(0.01), ("parse",)),
+        Stage("match", sleeper(0.01), ("embed", "requirements")),
+        Stage("summarize", sleeper(0.01), ("match", "profile")),
+    ])
+
+    results = asyncio.run(scheduler.run())
+
+    assert results["requirements"] == 0.08
+    assert scheduler.critical_path() == ["parse", "requirements", "match", "summarize"]
+
+
+def test_independent_stages_overlap():
+    scheduler = PipelineScheduler([Stage("a", sleeper(0.05)), Stage("b", sleeper(0.05))])
+
+    asyncio.run(scheduler.run())
+
+    assert scheduler.spans["b"].start < scheduler.spans["a"].end
+    assert len(scheduler.critical_path()) == 1
+
+
+def test_critical_path_is_empty_before_run():
+    assert PipelineScheduler([Stage("a", sleeper(0))]).critical_path() == []
+
+
+@pytest.mark.parametrize("stages, message", [
+    ([Stage("a", sleeper(0), ("missing",))], "unknown stages"),
+    ([Stage("a", sleeper(0), ("b",)), Stage("b", sleeper(0), ("a",))], "cycle"),
+])
+def test_invalid_graphs_are_rejected(stages, message):
+    with pytest.raises(ValueError, match=message):
+        PipelineScheduler(stages)
@@ -0,0 +1,43 @@
+import threading
+import time
+
+import app
+from src.services.profiler import RequestProfiler
+
+
+def test_request_profiling_is_off_by_default(client, documents):
+    response = client.post("/evaluate-fit", files=documents(), headers={"X-Profile": "sample"})
+
+    assert response.status_code == 403
+    assert client.get("/profiles/anything.folded").status_code == 404
+
+
+def test_sampling_covers_worker_threads(tmp_path):
+    def parse_in_worker(stop):
+        while not stop.is_set():
+            sum(range(1000))
+
+    stop = threading.Event()
+    worker = threading.Thread(target=parse_in_worker, args=(stop,), name="parse-worker")
+    profiler = RequestProfiler("sample", output_dir=tmp_path, interval=0.001)
+    profiler.start()
+    worker.start()
+    time.sleep(0.05)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    stacks = profiler.save("worker").read_text().splitlines()
+    assert any(stack.startswith("parse-worker;") and "parse_in_worker" in stack for stack in stacks)
+
+
+def test_concurrent_profiled_request_is_rejected(client, documents, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "ALLOW_REQUEST_PROFILING", True)
+    active = RequestProfiler("cprofile", output_dir=tmp_path)
+    active.start()
+    try:
+        response = client.post("/evaluate-fit", files=documents(), headers={"X-Profile": "cprofile"})
+    finally:
+        active.stop()
+
+    assert response.status_code == 409
@@ -0,0 +1,75 @@
+from src.services.llm_service import LLMService
+
+
+JOB_DESCRIPTION = b"""Platform Engineer.
+Requirements:
+- Experience operating Kubernetes clusters
+- Infrastructure as code with Terraform
+- On-call experience for production services
+"""
+
+
+def test_batched_verdicts_are_reused(client, documents):
+    def evaluate(**data):
+        response = client.post("/evaluate-fit", files=documents(job_description=JOB_DESCRIPTION),
+                               data={"scoring_mode": "local", **data})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    # Two extraction calls leave one call: every requirement goes into a single batch
+    batched = evaluate(max_llm_calls="3")
+    assert any("per LLM call" in degradation for degradation in batched["degradations"])
+    assert batched["cache_stats"]["verdict_hits"] == 0
+
+    reused = evaluate()
+    assert reused["cache_stats"]["verdict_misses"] == 0
+    assert reused["cache_stats"]["verdict_hits"] == len(batched["requirement_matches"])
+    assert all(match["cached"] for match in reused["requirement_matches"])
+
+
+def test_requirement_extraction_is_reused_per_job_description(client, documents):
+    job_description = b"""Data Engineer.
+Requirements:
+- Experience building Spark pipelines
+- SQL and data modelling
+"""
+
+    def evaluate():
+        response = client.post("/evaluate-fit", files=documents(job_description=job_description),
+                               data={"scoring_mode": "local"})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    first, second = evaluate(), evaluate()
+
+    assert (first["cache_stats"]["requirements_hits"], first["cache_stats"]["requirements_misses"]) == (0, 1)
+    assert (second["cache_stats"]["requirements_hits"], second["cache_stats"]["requirements_misses"]) == (1, 0)
+    assert ([match["requirement"] for match in second["comparison_matrix"]]
+            == [match["requirement"] for match in first["comparison_matrix"]])
+
+
+def test_results_from_a_fallback_route_are_not_reused_for_the_primary_model(client, documents, monkeypatch):
+    job_description = b"""Site Reliability Engineer.
+Requirements:
+- Experience running Prometheus monitoring
+- Incident management
+"""
+    complete = LLMService._complete
+
+    async def answered_by_fallback(self, *args, **kwargs):
+        content, _ = await complete(self, *args, **kwargs)
+        return content, "fallback-model"
+
+    def evaluate():
+        response = client.post("/evaluate-fit", files=documents(job_description=job_description),
+                               data={"scoring_mode": "local"})
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    monkeypatch.setattr(LLMService, "_complete", answered_by_fallback)
+    evaluate()
+    monkeypatch.undo()
+    primary = evaluate()
+
+    assert primary["cache_stats"]["requirements_hits"] == 0
+    assert primary["cache_stats"]["verdict_hits"] == 0
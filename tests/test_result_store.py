@@ -0,0 +1,30 @@
+import asyncio
+
+from src.services.result_store import ResultStore
+
+
+def result(fit_percentage):
+    return {"fit_score": "Moderate Fit", "fit_percentage": fit_percentage, "scoring_mode": "local",
+            "early_terminated": False}
+
+
+def test_listing_keeps_the_latest_evaluation_per_resume(tmp_path):
+    store = ResultStore(str(tmp_path / "evaluations.db"))
+    store.save("job-1", "resume-a", "Ada", result(90.0))
+    latest_a = store.save("job-1", "resume-a", "Ada", result(55.0))  # Re-evaluated, lower
+    latest_b = store.save("job-1", "resume-b", "Bob", result(70.0))
+    other_job = store.save("job-2", "resume-a", "Ada", result(80.0))
+    store.flush()
+
+    page = asyncio.run(store.list_evaluations(job_id="job-1"))
+    assert page["total"] == 2
+    assert [item["evaluation_id"] for item in page["items"]] == [latest_b, latest_a]
+
+    # The superseded 90% run does not resurface through a fit filter
+    assert asyncio.run(store.list_evaluations(job_id="job-1", min_fit_percentage=80))["total"] == 0
+    assert asyncio.run(store.list_evaluations(candidate_name="Ada"))["total"] == 2
+    assert other_job in [item["evaluation_id"] for item in asyncio.run(store.list_evaluations())["items"]]
+
+    every_run = asyncio.run(store.list_evaluations(job_id="job-1", latest_only=False))
+    assert every_run["total"] == 3
+    assert every_run["items"][0]["fit_percentage"] == 90.0
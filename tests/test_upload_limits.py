@@ -0,0 +1,61 @@
+import pytest
+
+import app
+from src.services.upload_handler import UploadLimitMiddleware, _PartInspector
+
+
+@pytest.fixture
+def small_limits(monkeypatch):
+    """Rebuild the app's middleware stack with an 8 KiB per-file and 32 KiB ranking limit"""
+    for middleware in app.app.user_middleware:
+        if middleware.cls is UploadLimitMiddleware:
+            monkeypatch.setitem(middleware.kwargs, "max_file_bytes", 8 * 1024)
+            monkeypatch.setitem(middleware.kwargs, "path_limits", {"/rank-candidates": 32 * 1024})
+    monkeypatch.setattr(app.app, "middleware_stack", None)
+    yield
+    app.app.middleware_stack = None
+
+
+def test_ranking_request_over_the_total_cap_is_rejected(client, small_limits, documents):
+    resumes = [("resume_files", (f"resume{i}.docx", b"PK\x03\x04" + b"x" * 6000)) for i in range(8)]
+
+    response = client.post("/rank-candidates", files=resumes + [("job_description_file", documents()["job_description_file"])])
+
+    assert response.status_code == 413
+
+
+def test_file_over_the_upload_limit_is_cut_off_while_streaming(client, small_limits, documents):
+    def chunked(body: bytes):
+        for start in range(0, len(body), 4096):
+            yield body[start:start + 4096]
+
+    request = client.build_request("POST", "/evaluate-fit", files=documents(resume=b"PK\x03\x04" + b"x" * 20000))
+    body = request.read()
+    headers = {key: value for key, value in request.headers.items() if key.lower() != "content-length"}
+
+    # No Content-Length: only the streaming check can see the oversized part
+    response = client.post("/evaluate-fit", content=chunked(body), headers=headers)
+
+    assert response.status_code == 413
+    assert response.json()["detail"] == "An uploaded file exceeds the 8192 byte upload limit"
+
+
+def test_mislabelled_file_is_rejected_while_streaming(client, documents):
+    request = client.build_request("POST", "/evaluate-fit", files=documents(resume=b"%PDF-1.4\n" + b"x" * 20000))
+    body = request.read()
+    headers = {key: value for key, value in request.headers.items() if key.lower() != "content-length"}
+
+    response = client.post("/evaluate-fit", content=iter([body[:4096], body[4096:]]), headers=headers)
+
+    assert response.status_code == 415
+    assert response.json()["detail"] == "resume.docx does not look like a DOCX file (detected PDF)"
+
+
+def test_file_type_is_checked_from_the_first_chunk(client, documents):
+    request = client.build_request("POST", "/evaluate-fit", files=documents(resume=b"%PDF-1.4\n" + b"x" * 20000))
+    body = request.read()
+    inspector = _PartInspector(request.headers["content-type"], max_bytes=1024 * 1024)
+
+    error = inspector.feed(body[:4096])
+
+    assert error is not None and error.status_code == 415